@@ -0,0 +1,65 @@
+"""
+Cold start time of a large config: the json parse against the binary sidecar cache.
+
+    python benchmarks/bench_binary_cache.py [sizes in MB, ex: 1,10,50] [repeat]
+
+json / orjson: MocaConfig(..., json_codec=...) parses the json file with the codec.
+sidecar: MocaConfig(..., binary_cache=True) loads the fresh ".mcache" sidecar instead of parsing.
+the times are the median of the repeats, every repeat creates a new instance. (Nx): the speedup of the sidecar.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig, MocaJsonCodec, get_json_codec
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_json_codec import make_config
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def start(path: Path, repeat: int, **kwargs) -> tuple:
+    times = []
+    config = None
+    for _ in range(repeat):
+        begin = perf_counter()
+        config = MocaConfig(uuid4().hex, path, reload_interval=-1, **kwargs)
+        times.append(perf_counter() - begin)
+    return median(times), config.get_reload_stats()
+
+
+def main() -> None:
+    sizes = [float(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 10, 50]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    codecs = ['json']
+    for name in ('orjson', 'simdjson', 'ujson'):
+        try:
+            get_json_codec(name)
+            codecs.append(name)
+        except ImportError:
+            pass
+    with TemporaryDirectory() as directory:
+        for size in sizes:
+            path = Path(directory) / f'config_{size}.json'
+            path.write_text(MocaJsonCodec.dumps_file(make_config(int(size * 1024 * 1024))), encoding='utf-8')
+            MocaConfig(uuid4().hex, path, reload_interval=-1, binary_cache=True)  # write the sidecar.
+            cache_time, stats = start(path, repeat, binary_cache=True)
+            assert stats['cache_loads'] == 1
+            line = f'{path.stat().st_size / 1024 / 1024:6.1f} MB  sidecar: {cache_time * 1000:8.1f} ms'
+            for codec in codecs:
+                json_time, _ = start(path, repeat, json_codec=codec)
+                line += f'  {codec}: {json_time * 1000:8.1f} ms ({json_time / cache_time:.1f}x)'
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+The cost of the nested config access: a dotted path against the manual traversal.
+
+    python benchmarks/bench_dotted_path.py [reads] [writes]
+
+get: get('db.pool.size', int) against get('db')['pool']['size'] with the same type check.
+set: set('db.pool.size', n) against copying the top-level dictionary and set('db', new_db). (write_behind=True)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from copy import deepcopy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def manual_get(config: MocaConfig) -> int:
+    db = config.get('db', dict, {})
+    try:
+        value = db['pool']['size']
+    except (KeyError, TypeError):
+        return 0
+    return value if isinstance(value, int) else 0
+
+
+def manual_set(config: MocaConfig, value: int) -> None:
+    db = deepcopy(config.get('db', dict, {}))
+    db.setdefault('pool', {})['size'] = value
+    config.set('db', db)
+
+
+def main() -> None:
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    with TemporaryDirectory() as directory:
+        config = MocaConfig(uuid4().hex, Path(directory) / 'config.json', reload_interval=-1, write_behind=True)
+        config.set('db', {'host': 'localhost', 'pool': {'size': 20, 'timeout': 3}, 'replicas': ['a', 'b']})
+        assert config.get('db.pool.size', int, 0) == manual_get(config) == 20
+        path = timeit(lambda: config.get('db.pool.size', int, 0), number=reads)
+        manual = timeit(lambda: manual_get(config), number=reads)
+        handle = config.handle('db.pool.size', int, 0)
+        cached = timeit(lambda: handle.value, number=reads)
+        print(f'get  path: {path / reads * 1e9:7.1f} ns  manual: {manual / reads * 1e9:7.1f} ns  '
+              f'handle: {cached / reads * 1e9:7.1f} ns')
+        path = timeit(lambda: config.set('db.pool.size', 21), number=writes)
+        manual = timeit(lambda: manual_set(config, 22), number=writes)
+        print(f'set  path: {path / writes * 1e6:7.2f} us  manual: {manual / writes * 1e6:7.2f} us')
+        config.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+The cost of a hot-path read: get() against handle().value.
+
+    python benchmarks/bench_handle.py [reads]
+
+Every read is measured with the type check (res_type=int, auto_convert=True),
+for a public key and a private key read with the access token. (with a root password)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import timeit
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def main() -> None:
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    MocaConfig.set_root_pass(uuid4().hex)
+    with TemporaryDirectory() as directory:
+        config = MocaConfig(uuid4().hex, Path(directory) / 'config.json', reload_interval=-1)
+        config.set_many({'port': '8080', '_port': '8080'})
+        config.set_access_token('token', root_pass=MocaConfig._ROOT_PASS)
+        for key, token in (('port', ''), ('_port', 'token')):
+            handle = config.handle(key, int, 0, auto_convert=True, access_token=token)
+            assert handle.value == config.get(key, int, 0, auto_convert=True, access_token=token) == 8080
+            get = timeit(lambda: config.get(key, int, 0, auto_convert=True, access_token=token), number=reads)
+            value = timeit(lambda: handle.value, number=reads)
+            print(f'{key:6} get(): {get / reads * 1e9:7.1f} ns  handle.value: {value / reads * 1e9:7.1f} ns  '
+                  f'({get / value:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Parse and dump times of the json codecs on large configs.
+
+    python benchmarks/bench_json_codec.py [sizes in MB, ex: 1,10,100] [repeat]
+
+loads: parse the config file data. (bytes)
+dumps: the compact serialization used by set() to check the values.
+file: the serialization of the config file, (MocaJsonCodec.dumps_file, the same for all codecs)
+the times are the best of the repeats.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaJsonCodec, get_json_codec
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def make_config(size: int) -> dict:
+    """Return a config with nested records, about the size in bytes as the config file."""
+    data = {}
+    index = 0
+    written = 0
+    while written < size:
+        record = {'host': f'db{index}.example.com', 'port': 5432 + index % 100, 'enabled': index % 2 == 0,
+                  'weight': index / 7, 'tags': ['primary', 'ssd', f'zone-{index % 8}'],
+                  'pool': {'size': 20, 'timeout': 3.5, 'name': f'プール{index}'}}
+        data[f'server_{index}'] = record
+        if index == 0:
+            record_size = len(MocaJsonCodec.dumps_file({f'server_{index}': record}).encode('utf-8'))
+        written += record_size
+        index += 1
+    return data
+
+
+def best(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    sizes = [float(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 10, 100]
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    codecs = [MocaJsonCodec()]
+    for name in ('orjson', 'simdjson', 'ujson'):
+        try:
+            codecs.append(get_json_codec(name))
+        except ImportError:
+            print(f'{name} is not installed.')
+    for size in sizes:
+        config = make_config(int(size * 1024 * 1024))
+        data = MocaJsonCodec.dumps_file(config).encode('utf-8')
+        file_time = best(lambda: MocaJsonCodec.dumps_file(config), repeat)
+        print(f'-- {len(data) / 1024 / 1024:.1f} MB ({len(config)} keys), file: {file_time * 1000:.1f} ms')
+        for codec in codecs:
+            assert codec.loads(data) == config
+            loads = best(lambda: codec.loads(data), repeat)
+            dumps = best(lambda: codec.dumps(config), repeat)
+            print(f'{codec.name:9} loads: {loads * 1000:9.1f} ms  dumps: {dumps * 1000:9.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Worker processes reading one config: every worker watches the file against MocaConfigSubscriber.
+
+    python benchmarks/bench_shared_snapshot.py [workers] [config size in MB]
+
+file: every worker creates its own MocaConfig, parses the file and polls it. (reload_interval=0.1)
+shared: one MocaConfigPublisher in the parent, the workers read the snapshot with MocaConfigSubscriber.
+rss: the median resident set size of the workers after the config was read.
+fan-out: the time from a change published in the parent (the file is already written) until every worker has seen it.
+         (median of 5 changes)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from multiprocessing import get_context
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter, sleep
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig, MocaConfigPublisher, MocaConfigSubscriber, MocaJsonCodec
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from bench_json_codec import make_config
+
+# -------------------------------------------------------------------------- Imports --
+
+CHANGES = 5
+
+
+def get_rss() -> int:
+    """Return the resident set size of this process in bytes."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    from resource import getrusage, RUSAGE_SELF
+    return getrusage(RUSAGE_SELF).ru_maxrss * 1024
+
+
+def worker(mode: str, target: str, ready, seen) -> None:
+    if mode == 'file':
+        config = MocaConfig(uuid4().hex, target, reload_interval=0.1)
+        read = lambda: config.get('v', save_unknown_config=False)
+    else:
+        subscriber = MocaConfigSubscriber(target)
+        read = lambda: subscriber.get('v')
+    ready.put(get_rss())
+    for change in range(1, CHANGES + 1):
+        while read() != change:
+            sleep(0.0005)
+        seen.put((change, perf_counter()))
+
+
+def run(mode: str, workers: int, path: Path) -> tuple:
+    context = get_context('spawn')
+    ready = context.Queue()
+    seen = context.Queue()
+    config = MocaConfig(uuid4().hex, path, reload_interval=-1)
+    config.set('v', 0)
+    publisher = None
+    target = str(path)
+    if mode == 'shared':
+        target = f'moca_bench_{uuid4().hex[:12]}'
+        publisher = MocaConfigPublisher(config, target)
+    processes = [context.Process(target=worker, args=(mode, target, ready, seen)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    rss = [ready.get() for _ in processes]
+    published = []
+    config.add_snapshot_listener(lambda version, data: published.append(perf_counter()))
+    latencies = []
+    for change in range(1, CHANGES + 1):
+        config.set('v', change)
+        times = [seen.get() for _ in processes]
+        assert all(item[0] == change for item in times)
+        latencies.append(max(item[1] for item in times) - published[-1])
+    for process in processes:
+        process.join()
+    if publisher is not None:
+        publisher.close()
+    return median(rss), median(latencies)
+
+
+def main() -> None:
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    size = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    if MocaConfigPublisher is None:
+        print('multiprocessing.shared_memory is not available.')
+        return
+    with TemporaryDirectory() as directory:
+        path = Path(directory) / 'config.json'
+        path.write_text(MocaJsonCodec.dumps_file(make_config(int(size * 1024 * 1024))), encoding='utf-8')
+        for mode in ('file', 'shared'):
+            rss, latency = run(mode, workers, path)
+            print(f'{mode:6} {workers} workers: rss {rss / 1024 / 1024:7.1f} MB/worker  '
+                  f'fan-out {latency * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
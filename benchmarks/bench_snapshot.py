@@ -0,0 +1,84 @@
+"""
+Multi-threaded read throughput of snapshot() against get(), while a writer keeps changing the config.
+
+    python benchmarks/bench_snapshot.py [reader threads] [seconds]
+
+Every read is a group of 10 keys, the writer sets all keys to the same value with set_many().
+mixed: the groups read with get() that contained values of two versions, (never with snapshot())
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event, Thread
+from time import sleep
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+KEYS = [f'key{index}' for index in range(10)]
+
+
+def read_with_get(config: MocaConfig, stop: Event, result: list) -> None:
+    reads = mixed = 0
+    while not stop.is_set():
+        values = [config.get(key, save_unknown_config=False) for key in KEYS]
+        reads += 1
+        mixed += len(set(values)) > 1
+    result.append((reads, mixed))
+
+
+def read_with_snapshot(config: MocaConfig, stop: Event, result: list) -> None:
+    reads = mixed = 0
+    while not stop.is_set():
+        snapshot = config.snapshot()
+        values = [snapshot[key] for key in KEYS]
+        reads += 1
+        mixed += len(set(values)) > 1
+    result.append((reads, mixed))
+
+
+def run(config: MocaConfig, reader, threads: int, seconds: float) -> tuple:
+    stop = Event()
+    result = []
+    writes = [0]
+
+    def write():
+        value = 0
+        while not stop.is_set():
+            value += 1
+            config.set_many({key: value for key in KEYS})
+            writes[0] += 1
+
+    workers = [Thread(target=reader, args=(config, stop, result)) for _ in range(threads)]
+    workers.append(Thread(target=write))
+    for worker in workers:
+        worker.start()
+    sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(item[0] for item in result), sum(item[1] for item in result), writes[0]
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    with TemporaryDirectory() as directory:
+        config = MocaConfig(uuid4().hex, Path(directory) / 'config.json', reload_interval=-1, write_behind=True)
+        config.set_many({key: 0 for key in KEYS})
+        for name, reader in (('get()', read_with_get), ('snapshot()', read_with_snapshot)):
+            reads, mixed, writes = run(config, reader, threads, seconds)
+            print(f'{name:10} {threads} readers: {reads / seconds:10.0f} groups/s  mixed: {mixed:6}  '
+                  f'writes: {writes / seconds:8.0f}/s')
+        config.flush()
+
+
+if __name__ == '__main__':
+    main()
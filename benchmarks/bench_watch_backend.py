@@ -0,0 +1,80 @@
+"""
+Change detection latency and idle cost of the 'poll' and 'inotify' watch backends.
+
+    python benchmarks/bench_watch_backend.py [instances] [idle seconds]
+
+latency: the time from a write of the config file to the reloaded value, (median of 20 writes)
+idle: the cpu time and the wakeups (stat calls) of the process while nothing is changed.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from json import dump
+from pathlib import Path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter, process_time, sleep
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig
+from moca_config.MocaConfigWatcher import MocaConfigInotifyWatcher
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def write(path: Path, value: int) -> None:
+    with open(str(path), mode='w') as config_file:
+        dump({'v': value}, config_file)
+
+
+def measure_latency(directory: Path, backend: str, interval: float) -> float:
+    path = directory / f'latency_{backend}.json'
+    write(path, 0)
+    config = MocaConfig(uuid4().hex, path, reload_interval=interval, watch_backend=backend)
+    samples = []
+    for value in range(1, 21):
+        write(path, value)
+        start = perf_counter()
+        while config.get('v') != value:
+            sleep(0.0005)
+        samples.append(perf_counter() - start)
+    config.stop_auto_reload()
+    return median(samples)
+
+
+def measure_idle(directory: Path, backend: str, instances: int, interval: float, seconds: float) -> tuple:
+    configs = []
+    for index in range(instances):
+        path = directory / f'idle_{backend}_{index}.json'
+        write(path, index)
+        configs.append(MocaConfig(uuid4().hex, path, reload_interval=interval, watch_backend=backend))
+    sleep(interval)  # the first polls are spread in the interval.
+    checks = sum(config.get_reload_stats()['checks'] for config in configs)
+    start = process_time()
+    sleep(seconds)
+    cpu = process_time() - start
+    checks = sum(config.get_reload_stats()['checks'] for config in configs) - checks
+    for config in configs:
+        config.stop_auto_reload()
+    return cpu, checks
+
+
+def main() -> None:
+    instances = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    backends = ['poll'] + (['inotify'] if MocaConfigInotifyWatcher.default() is not None else [])
+    with TemporaryDirectory() as directory:
+        for backend in backends:
+            for interval in (1.0, 0.1):
+                latency = measure_latency(Path(directory), backend, interval)
+                cpu, checks = measure_idle(Path(directory), backend, instances, interval, seconds)
+                print(f'{backend:8} interval={interval:<4} latency={latency * 1000:8.2f} ms  '
+                      f'idle cpu={cpu / seconds * 100:6.2f} %  stat calls={checks / seconds:8.1f}/s  '
+                      f'({instances} instances)')
+
+
+if __name__ == '__main__':
+    main()
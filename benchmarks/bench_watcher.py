@@ -0,0 +1,55 @@
+"""
+Thread count and idle cpu of the shared watcher thread with many instances.
+
+    python benchmarks/bench_watcher.py [instances] [idle seconds]
+
+threads: the number of threads of the process after the instances were created. (one watcher thread for all)
+idle: the cpu time and the stat calls of the process while nothing is changed. (reload_interval=1)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import sys
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import active_count
+from time import perf_counter, process_time, sleep
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from moca_config import MocaConfig
+from moca_config.MocaConfigWatcher import MocaConfigWatcher
+
+# -------------------------------------------------------------------------- Imports --
+
+
+def main() -> None:
+    instances = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    with TemporaryDirectory() as directory:
+        for index in range(instances):
+            with open(str(Path(directory) / f'{index}.json'), mode='w') as config_file:
+                dump({'__config_instance_name__': f'bench_{uuid4().hex}', 'v': index}, config_file)
+        threads = active_count()
+        start = perf_counter()
+        report = MocaConfig.load_config_files(directory, reload_interval=1.0)
+        elapsed = perf_counter() - start
+        configs = [MocaConfig.get_instance(result.name) for result in report.loaded]
+        print(f'loaded {len(configs)} instances in {elapsed * 1000:.1f} ms')
+        print(f'threads: {threads} -> {active_count()}')
+        sleep(1.0)  # the first polls are spread in the interval.
+        checks = sum(config.get_reload_stats()['checks'] for config in configs)
+        start = process_time()
+        sleep(seconds)
+        cpu = process_time() - start
+        checks = sum(config.get_reload_stats()['checks'] for config in configs) - checks
+        print(f'idle cpu: {cpu / seconds * 100:.2f} %  stat calls: {checks / seconds:.1f}/s')
+        for config in configs:
+            config.stop_auto_reload()
+        print(f'watched after stop_auto_reload: {MocaConfigWatcher.default().get_target_count()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -27,8 +27,7 @@ https://www.el-ideal-ideas.com/MocaLog/LICENSE/
 
 from typing import *
 from pathlib import Path
-from json import load, dump, JSONDecodeError, dumps, loads
-from time import sleep
+from json import JSONDecodeError
 from datetime import datetime
 from random import choice, randint
 from string import ascii_letters, digits
@@ -36,12 +35,52 @@ from uuid import uuid1, uuid4
 from multiprocessing import current_process, cpu_count
 from base64 import b64encode, b64decode
 from traceback import print_exc
-from os import stat
-from threading import Thread
+from threading import RLock, Timer
+from weakref import WeakSet, ref as weak_ref
+from collections import OrderedDict
+from hmac import compare_digest
+from fnmatch import fnmatchcase
+from functools import partial, lru_cache
+from hashlib import blake2b, sha256
+from marshal import dumps as marshal_dumps, loads as marshal_loads, version as marshal_version
+from sys import version_info
+from gc import disable as gc_disable, enable as gc_enable, isenabled as gc_isenabled
+from time import time_ns, perf_counter, monotonic
+from re import compile as re_compile
+from mmap import mmap, ACCESS_READ
+from json import loads as json_loads
+from json import dumps as json_dumps
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from asyncio import AbstractEventLoop, Queue, get_running_loop, iscoroutinefunction
+from atexit import register as atexit_register
+from contextlib import contextmanager
+from os import stat, fstat, fsync, replace, chmod, umask, unlink, close, O_RDONLY, environ, urandom, stat_result
+try:
+    from os import chown, geteuid, getegid
+except ImportError:  # windows
+    chown = geteuid = getegid = None
+from os import open as os_open
+from os.path import realpath
+from tempfile import mkstemp
+try:
+    from os import register_at_fork
+except ImportError:  # windows
+    register_at_fork = None
+from struct import Struct
 from Crypto.Cipher import AES
 from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2
 from Crypto import Random
 from typing import Optional
+from .MocaConfigWatcher import MocaConfigWatcher, MocaConfigInotifyWatcher, get_watcher, reset_watchers_after_fork
+from .MocaConfigHandle import MocaConfigHandle
+from .MocaConfigSnapshot import MocaConfigSnapshot
+from .MocaKeyTrie import MocaKeyTrie
+from .MocaHandlerPool import MocaHandlerPool
+from .MocaConfigChange import MocaConfigChange
+from .MocaJsonCodec import MocaJsonCodec, get_json_codec
+from .MocaConfigForkNotifier import MocaConfigForkNotifier
+from .MocaConfigLoadReport import MocaConfigLoadResult, MocaConfigLoadReport
 
 # -------------------------------------------------------------------------- Imports --
 
@@ -95,7 +134,20 @@ class MocaConfig(object):
         the reload interval
 
     _config_cache: dict
-        config cache
+        config cache, a new dictionary is published every time the config was changed.
+        (only the working copy in a batch is changed in place)
+
+    _generation: int
+        the generation of the config, increased every time the config cache or the root password was changed.
+
+    _snapshot: MocaConfigSnapshot
+        the latest published snapshot.
+
+    _privilege_cache: OrderedDict
+        the access decisions, {keyed digest of the credentials: (generation, decision)}.
+
+    _snapshot_listeners: List[list]
+        the functions called every time a new snapshot was published, [[listener, privileged], ...]
 
     _status: int
         the status of config module, 0 is correct
@@ -106,14 +158,101 @@ class MocaConfig(object):
     _handled_keys: Dict[str, List[str]]
         the keys handled by handlers.
 
-    _timestamp: Optional[int]
-        the timestamp of the config file.
+    _handled_prefixes: MocaKeyTrie
+        the prefixes handled by handlers, like "db_*".
+
+    _handled_patterns: Dict[str, List[str]]
+        the other wildcard patterns handled by handlers.
+
+    _handler_pool: Optional[MocaHandlerPool]
+        the thread pool to run the handlers, None means the handlers are run inline.
+
+    _fingerprint: Optional[Tuple[int, int, int]]
+        the (size, mtime_ns, inode) of the config file.
+
+    _content_hash: Optional[bytes]
+        the hash of the config file content.
+
+    _racy: bool
+        the config file was modified just before the fingerprint was recorded, check the content hash next time.
+
+    _reload_stats: Dict[str, int]
+        the reload counters.
+
+    _binary_cache: bool
+        use the binary sidecar cache file (config file path + ".mcache") instead of parsing the json file.
         
     _name: str
         the name of this instance.
 
     _debug_mode: bool
         debug mode
+
+    _json_codec: Optional[MocaJsonCodec]
+        the json codec of this instance, None means the default codec.
+
+    _watcher: Union[MocaConfigWatcher, MocaConfigInotifyWatcher]
+        the change detection backend.
+
+    _lock: RLock
+        the lock to serialize the writers and the reloads.
+
+    _batch_depth: int
+        the depth of the nested batch() blocks.
+
+    _batch_cache: Optional[dict]
+        the private working copy of the current batch, published when committed. None if not in a batch.
+
+    _batch_changes: Dict[str, list]
+        the [old_value, new_value] of every key changed in the current batch.
+
+    _write_behind: bool
+        write-behind mode
+
+    _write_behind_delay: float
+        the debounce window of the write-behind mode.
+
+    _flush_error_handler: Optional[Callable]
+        the function called when a background write failed.
+
+    _dirty: bool
+        the config cache has changes that are not written to the config file.
+
+    _flush_timer: Optional[Timer]
+        the timer of the next background write.
+
+    _flush_retry_delay: float
+        the delay of the next retry after a failed background write, 0 means the last write succeeded.
+
+    _env_prefix: Optional[str]
+        the prefix of the environment variables that override the configs, like "MYAPP__".
+
+    _env_overlay: Dict[str, List[tuple]]
+        the environment variables, {top-level name: [(nested path, text), ...]}, the names are not lower-cased.
+
+    _env_targets: Dict[str, List[tuple]]
+        the environment variables grouped by the top-level key they override,
+        the names are matched case-insensitively against the keys of the config file.
+
+    _env_shadowed: Dict[str, Any]
+        the values in the config file of the keys overridden by the environment variables,
+        MocaConfig._MISSING if the key is not in the file. a new dictionary is created every time it was changed.
+
+    _decrypt_cache: OrderedDict
+        the decrypted configs, {(key, encrypted string, derived key): (value, plain json string)}.
+        the entries are removed when the encrypted string of the key was changed.
+
+    _file_password: Optional[str]
+        the password of the encrypted config file, None means the config file is plain json.
+
+    _file_salt: Optional[bytes]
+        the salt of the encrypted config file, a new salt is created if the file was not encrypted yet.
+
+    _plain_hash: Optional[bytes]
+        the hash of the plain json of the encrypted config file, used to skip writing the same config.
+
+    _decrypt_failed: bool
+        the encrypted config file couldn't be decrypted, never overwrite it until it was decrypted.
     """
 
     _INIT_MSG = {
@@ -126,6 +265,80 @@ class MocaConfig(object):
 
     _instance_list: dict = {}
 
+    _default_json_codec: MocaJsonCodec = get_json_codec('auto')
+
+    _write_behind_instances: WeakSet = WeakSet()
+
+    # all instances, reset in the child process after fork.
+    _live_instances: WeakSet = WeakSet()
+
+    # the notifier of the forked children, None means the children watch the files by themselves.
+    _fork_notifier: Optional[MocaConfigForkNotifier] = None
+
+    # the config files indexed by load_config_files(lazy=True),
+    # {name: [path, arguments, idle timeout, weak reference of the evicted instance]}
+    _lazy_instances: Dict[str, list] = {}
+
+    # the last access time of the created lazy instances, {name: monotonic time}
+    _lazy_access: Dict[str, float] = {}
+
+    # the last time of the idle instance sweep.
+    _last_sweep: float = 0.0
+
+    # the lock to create the lazy instances.
+    _registry_lock: RLock = RLock()
+
+    # the idle lazy instances are swept at most once in this interval, when get_instance() was called.
+    IDLE_SWEEP_INTERVAL: float = 1.0
+
+    # find the instance name in the config file without parsing it.
+    _INSTANCE_NAME_PATTERN = re_compile(rb'"__config_instance_name__"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+    # the strings and the brackets of json, to find the nesting depth of a match without parsing the file.
+    _JSON_TOKEN_PATTERN = re_compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+
+    # the marker of the missing config value.
+    _MISSING: object = object()
+
+    # if the config file was modified in this window before the check, the content hash is checked next time.
+    RACY_WINDOW_NS: int = 2_000_000_000
+
+    # the max delay of the retries after a failed background write of write-behind mode.
+    FLUSH_RETRY_MAX_DELAY: float = 60.0
+
+    # the max size of the access decision cache.
+    PRIVILEGE_CACHE_SIZE: int = 128
+
+    # the random key of the access decision cache digests, never leaves this process.
+    _PRIVILEGE_CACHE_KEY: bytes = urandom(32)
+
+    # the max size of the decrypted config cache of every instance.
+    DECRYPT_CACHE_SIZE: int = 256
+
+    # the derived keys of the encrypted config files, keyed by the keyed digest of the password, not the password.
+    # {(digest, salt, iterations): key}
+    _file_key_cache: OrderedDict = OrderedDict()
+
+    # the max size of the derived key cache of the encrypted config files.
+    FILE_KEY_CACHE_SIZE: int = 16
+
+    # the suffix of the binary sidecar cache file.
+    BINARY_CACHE_SUFFIX: str = '.mcache'
+
+    # the suffix of the temporary files of the atomic writes, (".<file name>.<random>.tmp")
+    _ATOMIC_TMP_SUFFIX: str = '.tmp'
+
+    # the header of the binary sidecar cache file, the marshal format depends on the python version.
+    _BINARY_CACHE_HEADER: bytes = b'MOCA' + bytes([marshal_version, version_info[0], version_info[1]])
+
+    # the header of the encrypted config file, (magic, version, pbkdf2 iterations, salt, nonce, tag)
+    _ENCRYPTED_FILE_HEADER: Struct = Struct('=7sBI16s12s16s')
+    _ENCRYPTED_FILE_MAGIC: bytes = b'MOCAENC'
+    _ENCRYPTED_FILE_VERSION: int = 1
+
+    # the pbkdf2 iterations to derive the key of the encrypted config file.
+    FILE_KDF_ITERATIONS: int = 200_000
+
     # status code
     CORRECT = 0
     DECODE_ERROR = 1
@@ -133,6 +346,7 @@ class MocaConfig(object):
     PERMISSION_ERROR = 3
     OS_ERROR = 4
     UNKNOWN_ERROR = 5
+    DECRYPT_ERROR = 6
 
     # el command
     NOW: str = '[el]#moca_now#'  # current time
@@ -158,6 +372,16 @@ class MocaConfig(object):
                  reload_interval: float = 1.0,
                  access_token: str = '',
                  debug_mode: bool = False,
+                 watch_backend: str = 'poll',
+                 write_behind: bool = False,
+                 write_behind_delay: float = 0.5,
+                 flush_error_handler: Optional[Callable] = None,
+                 handler_workers: int = 0,
+                 handler_timeout: Optional[float] = None,
+                 json_codec: Union[str, MocaJsonCodec, None] = None,
+                 binary_cache: bool = False,
+                 env_prefix: Optional[str] = None,
+                 file_password: Optional[str] = None,
                  **kwargs):
         """
         The initializer of MocaConfig class.
@@ -167,21 +391,85 @@ class MocaConfig(object):
         :param reload_interval: the interval to reload config file. if the value is -1, never reload config file
         :param access_token: the access token of config file.
         :param debug_mode: turn on debug mode.
+        :param watch_backend: the change detection backend, 'poll', 'auto' or 'inotify'.
+                              'poll' checks the file every reload_interval seconds.
+                              'auto' and 'inotify' use inotify on linux, and fall back to 'poll' on other platforms.
+                              inotify doesn't see the changes made by other hosts on network file systems (nfs, cifs),
+                              and the reload_interval is only used to turn watching on (-1 means off).
+        :param write_behind: if true, set() and remove_config() only update the config cache and return,
+                             the config file is written in the background once per write_behind_delay seconds.
+                             flush() and the exit of the interpreter write the pending changes.
+        :param write_behind_delay: the debounce window of the write-behind mode.
+        :param flush_error_handler: the function called when a background write failed. arguments(config, status)
+                                    the failed write is retried with a exponential backoff.
+        :param handler_workers: if the value is positive, the handlers are run in a thread pool with this many workers,
+                                instead of the thread that reloaded or changed the config.
+                                the handlers of the same key are still run in order.
+        :param handler_timeout: the timeout of every handler call in the thread pool (seconds).
+                                the next handlers of the key don't wait for a handler that timed out.
+        :param json_codec: the json codec of this instance, a codec name ('auto', 'orjson', 'simdjson', 'ujson', 'json')
+                           or a MocaJsonCodec. None means the default codec. (see set_default_json_codec)
+        :param binary_cache: if true, a binary copy of the config is saved to a sidecar file (config file path + ".mcache")
+                             every time the config file was parsed or saved, and loaded instead of parsing the json file
+                             when the size, mtime and content hash of the json file are the same.
+        :param env_prefix: if the prefix is specified, the environment variables starts with "<prefix>__" override the configs.
+                           "MYAPP__DB__POOL_SIZE=20" overrides "db" -> "pool_size" with 20. (see refresh_env)
+                           the names are matched case-insensitively against the existing keys,
+                           and the values are converted to the type of the file value. (strings are kept as strings)
+        :param file_password: if the password is specified, the whole config file is encrypted with AES-GCM,
+                              it is decrypted once when the file was loaded, and encrypted when the file was saved.
+                              a plain json config file is encrypted when it was loaded.
+                              the binary sidecar cache is not used in this mode.
 
         Raise
         -----
             TypeError: if the arguments type is incorrect.
+            ValueError: if the watch backend or the json codec is unknown.
+            ImportError: if the library of the json codec is not installed.
         """
         # set name
         self._name: str = name
         # set debug mode
         self._debug_mode = debug_mode
+        # set json codec
+        self._json_codec: Optional[MocaJsonCodec] = get_json_codec(json_codec) if isinstance(json_codec, str) \
+            else json_codec
         # initialize timestamp variable
-        self._timestamp: Optional[float] = None
+        self._fingerprint: Optional[Tuple[int, int, int]] = None
+        self._content_hash: Optional[bytes] = None
+        self._racy: bool = True
+        self._reload_stats: Dict[str, int] = {'checks': 0, 'unchanged': 0, 'skipped_parses': 0, 'parses': 0,
+                                              'cache_loads': 0}
+        self._file_password: Optional[str] = file_password
+        self._file_salt: Optional[bytes] = None
+        self._plain_hash: Optional[bytes] = None
+        self._decrypt_failed: bool = False
+        self._binary_cache: bool = binary_cache and (file_password is None)  # never save the plain config.
         # initialize handlers dictionary
         self._handlers: Dict[str, List] = {}
         # initialize handled keys list
         self._handled_keys: Dict[str, List[str]] = {}
+        self._handled_prefixes: MocaKeyTrie = MocaKeyTrie()
+        self._handled_patterns: Dict[str, List[str]] = {}
+        # initialize the handler pool
+        self._handler_pool: Optional[MocaHandlerPool] = MocaHandlerPool(handler_workers, handler_timeout, debug_mode) \
+            if handler_workers > 0 else None
+        # initialize the writer lock and batch state
+        self._lock: RLock = RLock()
+        self._batch_depth: int = 0
+        self._batch_cache: Optional[dict] = None
+        self._batch_changes: Dict[str, list] = {}
+        # initialize the write-behind state
+        self._write_behind: bool = write_behind
+        self._write_behind_delay: float = write_behind_delay
+        self._flush_error_handler: Optional[Callable] = flush_error_handler
+        self._dirty: bool = False
+        self._flush_timer: Optional[Timer] = None
+        self._flush_retry_delay: float = 0.0
+        if write_behind:
+            MocaConfig._write_behind_instances.add(self)
+        # select the change detection backend
+        self._watcher: Union[MocaConfigWatcher, MocaConfigInotifyWatcher] = get_watcher(watch_backend)
         #############################
         if kwargs.get('mochi', False):
             MocaConfig._INIT_MSG['__mochi__'] = 'もっちもっちにゃんにゃん'
@@ -213,23 +501,46 @@ class MocaConfig(object):
                       f'But received reload_interval: {type(reload_interval)}')
         # initialize cache variable
         self._config_cache: dict = {}
+        self._generation: int = 0
+        self._snapshot: MocaConfigSnapshot = MocaConfigSnapshot(0, self._config_cache)
+        # read the environment variables once, they are applied every time the config file was loaded.
+        self._env_prefix: Optional[str] = None if env_prefix is None else env_prefix.rstrip('_') + '__'
+        self._env_overlay: Dict[str, List[tuple]] = {} if env_prefix is None \
+            else MocaConfig._read_env_overlay(self._env_prefix)
+        self._env_targets: Dict[str, List[tuple]] = {}
+        self._env_shadowed: Dict[str, Any] = {}
+        # initialize the access decision cache
+        self._privilege_cache: OrderedDict = OrderedDict()
+        # initialize the decrypted config cache
+        self._decrypt_cache: OrderedDict = OrderedDict()
+        # initialize the snapshot listeners
+        self._snapshot_listeners: List[list] = []
         # set current status
         self._status: int = MocaConfig.CORRECT
         # load config file
-        self.reload_config()
+        preloaded = kwargs.get('_preloaded')
+        if (preloaded is None) or (preloaded[1] is None):  # not preloaded, or a plain file to be encrypted.
+            self.reload_config()
+        else:  # already read and parsed by load_config_files, (data, fingerprint, content hash)
+            with self._lock:
+                self._publish(self._apply_env_overlay(preloaded[0]))
+                self._set_fingerprint(preloaded[1], preloaded[2])
+            self._reload_stats['parses'] += 1
         if self._debug_mode:
             print('-- current configs ---------------------')
             print(self._config_cache)
-        # start reload-config-loop on other thread
-        Thread(target=self._reload_config_loop, name='reload_config_loop', daemon=True).start()
-        # initialize access token
-        self.get('__moca_config_access_token__', str, access_token, root_pass=MocaConfig._ROOT_PASS)
-        # initialize config name
-        self.get('__config_instance_name__', str, name, root_pass=MocaConfig._ROOT_PASS)
-        # write version
-        self.set('__MocaConfig_version__', VERSION, root_pass=MocaConfig._ROOT_PASS)
+        # register self to the process-wide watcher
+        self._watcher.register(self)
+        with self.batch():  # write the config file only once.
+            # initialize access token
+            self.get('__moca_config_access_token__', str, access_token, root_pass=MocaConfig._ROOT_PASS)
+            # initialize config name
+            self.get('__config_instance_name__', str, name, root_pass=MocaConfig._ROOT_PASS)
+            # write version
+            self.set('__MocaConfig_version__', VERSION, root_pass=MocaConfig._ROOT_PASS)
         # add self to instance list
         MocaConfig._instance_list[name] = self
+        MocaConfig._live_instances.add(self)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -260,6 +571,7 @@ class MocaConfig(object):
         """
         if cls._ROOT_PASS == '':
             cls._ROOT_PASS = password
+            cls._invalidate_all()
             return True
         else:
             return False
@@ -277,8 +589,9 @@ class MocaConfig(object):
         :param old_password: the old root password.
         :return: status, [success] or [failed]
         """
-        if cls._ROOT_PASS == old_password:
+        if cls._compare_secret(cls._ROOT_PASS, old_password):
             cls._ROOT_PASS = new_password
+            cls._invalidate_all()
             return True
         else:
             return False
@@ -286,6 +599,71 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    @classmethod
+    def _invalidate_all(cls) -> None:
+        """Increase the generation of all live instances, include the replaced ones. (the root password was changed)"""
+        for instance in list(cls._live_instances):
+            instance._generation += 1
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def set_default_json_codec(cls,
+                               codec: Union[str, MocaJsonCodec]) -> None:
+        """
+        Change the default json codec of all instances.
+        :param codec: a codec name ('auto', 'orjson', 'simdjson', 'ujson', 'json') or a MocaJsonCodec.
+        :return: None
+
+        Raise
+        -----
+            ValueError: if the codec name is unknown.
+            ImportError: if the library of the codec is not installed.
+        """
+        cls._default_json_codec = get_json_codec(codec) if isinstance(codec, str) else codec
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def set_fork_mode(cls,
+                      mode: str) -> None:
+        """
+        Change how the forked child processes detect the changes of the config files.
+        In both modes, the children keep the config cache of the parent, and don't parse the unchanged files again.
+        :param mode: 'watch' or 'notify'.
+                     'watch': every child watches the config files by itself. (default)
+                     'notify': only the parent watches the config files, and notifies the children through pipes.
+                               the children forked after this call reload the configs when notified,
+                               and start watching by themselves if the parent exited.
+        :return: None
+
+        Raise
+        -----
+            ValueError: if the mode is unknown.
+        """
+        if mode == 'watch':
+            if cls._fork_notifier is not None:
+                cls._fork_notifier.close()
+                cls._fork_notifier = None
+        elif mode == 'notify':
+            if cls._fork_notifier is None:
+                cls._fork_notifier = MocaConfigForkNotifier()
+        else:
+            raise ValueError(f'Unknown fork mode: {mode}')
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def json_codec(self) -> MocaJsonCodec:
+        """Return the json codec of this instance."""
+        return self._json_codec or MocaConfig._default_json_codec
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     @property
     def path(self) -> Path:
         """Return the self._path"""
@@ -304,8 +682,8 @@ class MocaConfig(object):
 
     @classmethod
     def get_instance_list(cls) -> List[str]:
-        """Return a list of instance names"""
-        return list(cls._instance_list.keys())
+        """Return a list of instance names, including the instances indexed by load_config_files(lazy=True)."""
+        return list(dict.fromkeys([*cls._instance_list, *cls._lazy_instances]))
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -314,6 +692,7 @@ class MocaConfig(object):
                                interval: float) -> None:
         """Change the reload interval"""
         self._reload_interval = interval
+        self._watcher.register(self)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -321,6 +700,7 @@ class MocaConfig(object):
     def stop_auto_reload(self) -> None:
         """Stop auto reload"""
         self._reload_interval = -1
+        self._watcher.unregister(self)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -340,37 +720,301 @@ class MocaConfig(object):
         # try create parent directory.
         config_file_path.parent.mkdir(parents=True, exist_ok=True)
         if not config_file_path.is_file():  # if file is not exists, create new file.
-            with open(str(config_file_path), mode='w', encoding='utf-8') as config_file:
-                dump(MocaConfig._INIT_MSG,
-                     config_file,
-                     ensure_ascii=False,
-                     indent=4,
-                     sort_keys=False,
-                     separators=(',', ': '))
+            json_string = MocaJsonCodec.dumps_file(MocaConfig._INIT_MSG, sort_keys=False)
+            self._write_file_atomic(config_file_path, json_string.encode('utf-8'))
             if self._debug_mode:
                 print('Created a new config file.')
         self._path = config_file_path
+        if hasattr(self, '_reload_interval'):  # already initialized, watch the new file.
+            self._watcher.register(self)
         return config_file_path
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    def _set_fingerprint(self,
+                         fingerprint: Tuple[int, int, int],
+                         content_hash: bytes) -> None:
+        """
+        Record the fingerprint and the content hash of the config file. the lock should be held by the caller.
+        If the file was modified just now, an other write in the same timestamp tick can't be detected by the fingerprint,
+        so the content hash is checked again in the next reload.
+        """
+        self._fingerprint = fingerprint
+        self._content_hash = content_hash
+        self._racy = time_ns() - fingerprint[1] < MocaConfig.RACY_WINDOW_NS
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_reload_stats(self) -> Dict[str, int]:
+        """
+        Return the reload counters.
+        :return: {'checks': the number of the checks,
+                  'unchanged': the file was not changed (size, mtime and inode),
+                  'skipped_parses': the file was touched or rewritten with the same content, the parse was skipped,
+                  'parses': the file was parsed,
+                  'cache_loads': the binary sidecar cache was loaded instead of parsing the file}
+        """
+        return dict(self._reload_stats)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _read_env_overlay(prefix: str) -> Dict[str, List[tuple]]:
+        """
+        Read the environment variables starts with the prefix.
+        The name is split by "__", "MYAPP__DB__POOL_SIZE" -> ("DB", "POOL_SIZE").
+        The names are matched against the keys when applied, and the values are converted to the type of the file value.
+        The variables with a empty segment (ex: "MYAPP____X") are ignored.
+        :param prefix: the prefix, ends with "__".
+        :return: {top-level name: [(nested path, text), ...]}, the shorter paths first.
+        """
+        overlay: Dict[str, List[tuple]] = {}
+        for name, text in environ.items():
+            if (not name.startswith(prefix)) or (len(name) == len(prefix)):
+                continue
+            path = tuple(name[len(prefix):].split('__'))
+            if '' in path:
+                continue
+            overlay.setdefault(path[0], []).append((path[1:], text))
+        for items in overlay.values():
+            items.sort(key=lambda item: len(item[0]))
+        return overlay
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _match_env_name(node: dict,
+                        name: str) -> str:
+        """
+        Return the key of the dictionary matched with the name of the environment variable, case-insensitively.
+        If no key was matched, return the lower-cased name. (a new key)
+        """
+        if name in node:
+            return name
+        folded = name.casefold()
+        for key in node:
+            if isinstance(key, str) and (key.casefold() == folded):
+                return key
+        return name.lower()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _convert_env_value(text: str,
+                           file_value: Any) -> Any:
+        """
+        Convert the text of the environment variable to the type of the file value.
+        "20" -> 20 if the file value is a int, "1.10" and "007" are kept as they are if the file value is a string.
+        If the file value is missing, or the text can't be converted, return the text.
+        """
+        if isinstance(file_value, bool):
+            lowered = text.strip().lower()
+            if lowered in ('true', '1', 'yes', 'on'):
+                return True
+            elif lowered in ('false', '0', 'no', 'off'):
+                return False
+        elif isinstance(file_value, int):
+            try:
+                return int(text)
+            except ValueError:
+                pass
+        elif isinstance(file_value, float):
+            try:
+                return float(text)
+            except ValueError:
+                pass
+        elif isinstance(file_value, (list, dict)):
+            try:
+                value = json_loads(text)
+            except ValueError:
+                pass
+            else:
+                if isinstance(value, type(file_value)):
+                    return value
+        return text
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _apply_env_value(self,
+                         key: str,
+                         file_value: Any) -> Any:
+        """
+        Return the effective value of the key overridden by the environment variables.
+        :param key: the top-level key.
+        :param file_value: the value in the config file, or MocaConfig._MISSING.
+        :return: the effective value.
+        """
+        missing = MocaConfig._MISSING
+        value = file_value
+        for names, text in self._env_targets[key]:
+            node = value
+            path = []
+            for name in names:  # match the nested names against the current keys.
+                if isinstance(node, dict):
+                    name = MocaConfig._match_env_name(node, name)
+                    node = node.get(name, missing)
+                elif isinstance(node, list) and name.isdigit() and (int(name) < len(node)):
+                    node = node[int(name)]
+                else:
+                    name = name.lower()
+                    node = missing
+                path.append(name)
+            path = tuple(path)
+            env_value = MocaConfig._convert_env_value(text, node)
+            new_value = MocaConfig._set_by_path(value, path, env_value)
+            if new_value is MocaConfig._MISSING:  # the file value is not a dictionary, override it.
+                new_value = MocaConfig._set_by_path(MocaConfig._MISSING, path, env_value)
+            value = new_value
+        return value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _apply_env_overlay(self,
+                           cache: dict) -> dict:
+        """
+        Override the configs loaded from the config file with the environment variables, and remember the file values.
+        The cache is changed in place, so it must not be published yet. the lock should be held by the caller.
+        :param cache: the config loaded from the config file.
+        :return: the cache.
+        """
+        if self._env_overlay:
+            missing = MocaConfig._MISSING
+            targets: Dict[str, List[tuple]] = {}
+            for name, items in self._env_overlay.items():
+                targets.setdefault(MocaConfig._match_env_name(cache, name), []).extend(items)
+            for items in targets.values():
+                items.sort(key=lambda item: len(item[0]))
+            self._env_targets = targets
+            self._env_shadowed = {key: cache.get(key, missing) for key in targets}
+            for key, file_value in self._env_shadowed.items():
+                cache[key] = self._apply_env_value(key, file_value)
+        return cache
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _get_file_data(self,
+                       cache: Optional[dict] = None) -> dict:
+        """
+        Return the config cache with the file values of the keys overridden by the environment variables.
+        :param cache: the config cache to be saved, None means the current config cache.
+        """
+        if cache is None:
+            cache = self._config_cache
+        if not self._env_shadowed:
+            return cache
+        data = dict(cache)
+        for key, file_value in self._env_shadowed.items():
+            if file_value is MocaConfig._MISSING:
+                data.pop(key, None)
+            else:
+                data[key] = file_value
+        return data
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def refresh_env(self) -> bool:
+        """
+        Read the environment variables again, and override the configs with the new values.
+        The environment variables are only read when the instance was created and when this method was called.
+        Precedence: environment variables > set() and the config file > default value of get().
+        The values of the environment variables are never written to the config file.
+        :return: status, [success] or [failed]. If env_prefix is not specified or in a batch, return False.
+        """
+        if self._env_prefix is None:
+            return False
+        overlay = MocaConfig._read_env_overlay(self._env_prefix)
+        with self._lock:
+            if self._batch_depth > 0:
+                return False
+            if overlay == self._env_overlay:
+                return True
+            old_cache = self._config_cache
+            new_cache = self._get_file_data()
+            if new_cache is old_cache:
+                new_cache = dict(old_cache)
+            self._env_overlay = overlay
+            self._env_shadowed = {}
+            self._publish(self._apply_env_overlay(new_cache))
+        self._run_handler_total(old_cache, new_cache)
+        return True
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     def reload_config(self) -> None:
-        """Reload json config file."""
+        """
+        Reload json config file.
+        The file is read only when the (size, mtime, inode) of the file was changed,
+        and parsed only when the content hash was changed.
+        """
         try:
-            time = stat(str(self._path)).st_mtime
-            if (self._timestamp is None) or (time != self._timestamp):
-                with open(str(self._path), mode='r', encoding='utf-8') as config_file:
-                    new_cache = load(config_file)
-                    old_cache = self._config_cache
-                    self._config_cache = new_cache
+            if (self._batch_depth > 0) or self._dirty:  # don't overwrite the uncommitted changes.
+                return
+            fingerprint = self._fingerprint
+            file_stat = stat(str(self._path))
+            new_fingerprint = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+            self._reload_stats['checks'] += 1
+            if (new_fingerprint == fingerprint) and (not self._racy):
+                self._reload_stats['unchanged'] += 1
+            else:
+                with open(str(self._path), mode='rb') as config_file:
+                    data = config_file.read()
+                content_hash = blake2b(data, digest_size=16).digest()
+                if content_hash == self._content_hash:  # touched or rewritten with the same content.
+                    with self._lock:
+                        if self._fingerprint == fingerprint:
+                            self._set_fingerprint(new_fingerprint, content_hash)
+                    self._reload_stats['skipped_parses'] += 1
+                else:
+                    # parse the file without the lock, the writers and readers are never blocked by it.
+                    new_cache = self._load_binary_cache(new_fingerprint, content_hash) if self._binary_cache else None
+                    salt = None
+                    if new_cache is None:
+                        if self._file_password is not None:
+                            try:
+                                data, salt = MocaConfig._decrypt_file_data(data, self._file_password)
+                            except ValueError:  # the password is incorrect, or the encrypted file was broken.
+                                if self._debug_mode:
+                                    print_exc()
+                                self._decrypt_failed = True
+                                self._status = MocaConfig.DECRYPT_ERROR
+                                return
+                        new_cache = MocaConfig._decode_without_gc(self.json_codec.loads, data)
+                        self._reload_stats['parses'] += 1
+                        if self._binary_cache:
+                            self._save_binary_cache(new_fingerprint, content_hash, new_cache)
+                    else:
+                        self._reload_stats['cache_loads'] += 1
+                    with self._lock:
+                        if (self._batch_depth > 0) or self._dirty or (self._fingerprint != fingerprint):
+                            return  # the config was changed while parsing, the parsed data is out of date.
+                        old_cache = self._config_cache
+                        self._publish(self._apply_env_overlay(new_cache))
+                        self._set_fingerprint(new_fingerprint, content_hash)
+                        if self._file_password is not None:
+                            self._decrypt_failed = False
+                            self._plain_hash = blake2b(data, digest_size=16).digest()
+                            if salt is None:  # a plain json file, encrypt it now.
+                                self._plain_hash = None
+                                self._save_config_to_file()
+                            else:
+                                self._file_salt = salt
+                    MocaConfig._notify_children()
+                    if self._debug_mode:
+                        print('-- reloaded config file ---------------------')
+                        print(new_cache)
                     self._run_handler_total(old_cache, new_cache)
-                    self._timestamp = time
-                if self._debug_mode:
-                    print('-- reloaded config file ---------------------')
-                    print(new_cache)
             self._status = MocaConfig.CORRECT
-        except JSONDecodeError:
+        except (JSONDecodeError, UnicodeDecodeError):
             if self._debug_mode:
                 print_exc()
             self._status = MocaConfig.DECODE_ERROR
@@ -419,49 +1063,113 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
-    def _reload_config_loop(self) -> None:
-        """the reload-config-loop."""
-        while True:
-            if self.reload_interval == -1:
-                sleep(5)
-            elif self.reload_interval <= 0:
-                sleep(5)
-                self.reload_config()
-            else:
-                sleep(self.reload_interval)
-                self.reload_config()
+    def get_config_size(self) -> int:
+        """Return config cache size"""
+        return len(self._config_cache)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
-    def get_config_size(self) -> int:
-        """Return config cache size"""
-        return len(self._config_cache)
+    def _publish(self,
+                 cache: dict) -> None:
+        """
+        Publish a new config cache and a new snapshot. the lock should be held by the caller.
+        The published dictionary must not be changed after this.
+        """
+        self._config_cache = cache
+        self._generation += 1
+        self._snapshot = MocaConfigSnapshot(self._generation, cache)
+        if self._decrypt_cache:
+            self._purge_decrypt_cache(cache)
+        for listener, privileged in self._snapshot_listeners:
+            self._call_snapshot_listener(listener, privileged)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def snapshot(self,
+                 access_token: str = '',
+                 root_pass: str = '') -> Optional[MocaConfigSnapshot]:
+        """
+        Return the latest published snapshot of the config, without any lock.
+        All reads from one snapshot are consistent, even if the config is reloaded or changed at the same time.
+        If the access token or root password is incorrect, the snapshot doesn't contain the private configs.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the snapshot. if can't access to the config file, return None.
+        """
+        snapshot = self._snapshot
+        if self._has_privilege(root_pass, access_token):
+            return snapshot
+        elif self.is_private():
+            return None
+        else:
+            return snapshot.public()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _call_snapshot_listener(self,
+                                listener: Callable[[int, dict], Any],
+                                privileged: bool) -> None:
+        """Call the snapshot listener with the latest snapshot. the lock should be held by the caller."""
+        snapshot = self._snapshot if privileged else self._snapshot.public()
+        try:
+            listener(snapshot.version, snapshot.data)
+        except Exception:
+            if self._debug_mode:
+                print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def add_snapshot_listener(self,
+                              listener: Callable[[int, Mapping], Any],
+                              access_token: str = '',
+                              root_pass: str = '') -> Optional[bool]:
+        """
+        Add a function called with (version, read-only config data) every time a new snapshot was published.
+        The listener is called with the current snapshot immediately, and then called in order with the writer lock held,
+        so it must be fast and must not change the config.
+        If the access token or root password is incorrect, the listener doesn't receive the private configs.
+        :param listener: the function.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: status, [success]. If can't access to this config file. return None.
+        """
+        privileged = self._has_privilege(root_pass, access_token)
+        if (not privileged) and self.is_private():
+            return None
+        with self._lock:
+            self._snapshot_listeners.append([listener, privileged])
+            self._call_snapshot_listener(listener, privileged)
+        return True
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def remove_snapshot_listener(self,
+                                 listener: Callable[[int, Mapping], Any]) -> None:
+        """Remove the snapshot listener."""
+        with self._lock:
+            self._snapshot_listeners = [item for item in self._snapshot_listeners if item[0] is not listener]
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
     def get_all_config(self,
                        access_token: str = '',
-                       root_pass: str = '') -> Optional[dict]:
+                       root_pass: str = '') -> Optional[Mapping]:
         """
-        Return all config.
+        Return all config as a deep read-only mapping, the nested dictionaries and lists are read-only views too.
+        The mapping is the data of the latest snapshot, it is never changed, so polling it is cheap.
+        (use copy() of the mapping to get a mutable deep copy)
         :param access_token: the access token of config file.
         :param root_pass: the root password.
         :return: if can't access to the config file, return None
         """
-        if self.is_private():
-            if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                    MocaConfig._ROOT_PASS)):
-                return self._config_cache
-            else:
-                return None
-        else:
-            if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                    MocaConfig._ROOT_PASS)):
-                return self._config_cache
-            else:
-                return {key: value for key, value in self._config_cache.items() if not key.startswith('_')}
+        snapshot = self.snapshot(access_token, root_pass)
+        return None if snapshot is None else snapshot.data
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -476,18 +1184,8 @@ class MocaConfig(object):
         :param root_pass: the root password.
         :return: if can't access to the config file, return None
         """
-        if self.is_private():
-            if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                    MocaConfig._ROOT_PASS)):
-                return tuple(self._config_cache.keys())
-            else:
-                return None
-        else:
-            if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                    MocaConfig._ROOT_PASS)):
-                return tuple(self._config_cache.keys())
-            else:
-                return tuple([key for key in self._config_cache.keys() if not key.startswith('_')])
+        snapshot = self.snapshot(access_token, root_pass)
+        return None if snapshot is None else snapshot.get_keys()
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -548,6 +1246,51 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    @staticmethod
+    def _compare_secret(secret: Any,
+                        value: Any) -> bool:
+        """Compare the secret and the value in constant time."""
+        if isinstance(secret, str) and isinstance(value, str):
+            return compare_digest(secret.encode('utf-8'), value.encode('utf-8'))
+        else:
+            return secret == value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _has_privilege(self,
+                       root_pass: str,
+                       access_token: str) -> bool:
+        """
+        Check is the root password or the access token correct.
+        The decision is cached in a LRU cache until the config is changed.
+        The cache is keyed by the blake2b digest of the credentials keyed with a random per-process key,
+        not the raw secrets, and a 256-bit digest leaves no practical collision that allows a wrong credential.
+        """
+        digest = blake2b(repr((root_pass, access_token)).encode('utf-8', 'surrogatepass'),
+                         key=MocaConfig._PRIVILEGE_CACHE_KEY, digest_size=32).digest()
+        generation = self._generation
+        cache = self._privilege_cache
+        cached = cache.get(digest)
+        if (cached is not None) and (cached[0] == generation):
+            try:
+                cache.move_to_end(digest)
+            except KeyError:
+                pass  # evicted by other thread.
+            return cached[1]
+        allow = MocaConfig._compare_secret(MocaConfig._ROOT_PASS, root_pass) or \
+            bool(self.check_access_token(access_token, MocaConfig._ROOT_PASS))
+        cache[digest] = (generation, allow)
+        if len(cache) > MocaConfig.PRIVILEGE_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+        return allow
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     def _is_allowed(self,
                     key: str,
                     root_pass: str,
@@ -555,18 +1298,10 @@ class MocaConfig(object):
         """Check is access allowed."""
         allow: bool
         if self.is_private():
-            if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                    MocaConfig._ROOT_PASS)):
-                allow = True
-            else:
-                allow = False
+            allow = self._has_privilege(root_pass, access_token)
         else:
-            if key.startswith('_'):
-                if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                        MocaConfig._ROOT_PASS)):
-                    allow = True
-                else:
-                    allow = False
+            if key.startswith('_') or ((('.' in key) or ('\\' in key)) and MocaConfig._is_private_path(key)):
+                allow = self._has_privilege(root_pass, access_token)
             else:
                 allow = True
         return allow
@@ -574,21 +1309,208 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
-    def get(self,
-            key: str,
-            res_type: Any = any,
-            default: Any = None,
-            auto_convert: bool = False,
-            allow_el_command: bool = False,
-            save_unknown_config: bool = True,
-            access_token: str = '',
-            root_pass: str = '') -> Any:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_path(key: str) -> Tuple[str, ...]:
         """
-        return the config value.
-        :param key: the config name.
-        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
-        :param default: if can't found the config value, return default value.
-        :param auto_convert: if the response type is incorrect, try convert the value.
+        Split the dotted path of nested config, "db.pool.size" -> ("db", "pool", "size").
+        "\\." is a dot in the key, and "\\\\" is a backslash. The parsed paths are cached.
+        If the key has a empty segment (ex: ".db", "db..size"), it is not a path, return (key,)
+        """
+        if '\\' not in key:
+            segments = key.split('.')
+        else:
+            segments = []
+            current = []
+            escaped = False
+            for char in key:
+                if escaped:
+                    current.append(char)
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '.':
+                    segments.append(''.join(current))
+                    current = []
+                else:
+                    current.append(char)
+            if escaped:
+                current.append('\\')
+            segments.append(''.join(current))
+        if '' in segments:
+            return key,
+        return tuple(segments)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _is_private_path(key: str) -> bool:
+        """Check is any segment of the dotted path private (starts with "_"). the results are cached."""
+        return any(segment.startswith('_') for segment in MocaConfig._parse_path(key))
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _get_by_path(cache: dict,
+                     key: str) -> Any:
+        """
+        Return the nested config value of the dotted path. the digit segments are the indexes of the lists.
+        :param cache: the config cache.
+        :param key: the dotted path.
+        :return: the config value, or MocaConfig._MISSING if the key is not a path or can't found the value.
+                 if the key is a escaped top-level key (ex: "a\\.b"), return the value of the unescaped key.
+        """
+        path = MocaConfig._parse_path(key)
+        if len(path) == 1:  # not a path.
+            return MocaConfig._MISSING if path[0] == key else cache.get(path[0], MocaConfig._MISSING)
+        missing = MocaConfig._MISSING
+        value = cache
+        for segment in path:
+            if isinstance(value, dict):
+                value = value.get(segment, missing)
+                if value is missing:
+                    return missing
+            elif isinstance(value, list) and segment.isdigit() and (int(segment) < len(value)):
+                value = value[int(segment)]
+            else:
+                return missing
+        return value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _set_by_path(node: Any,
+                     path: Tuple[str, ...],
+                     value: Any) -> Any:
+        """
+        Return a copy of the node with the nested value changed, the missing dictionaries are created.
+        Only the containers on the path are copied, the published config is never changed.
+        :param node: the dictionary or list, or MocaConfig._MISSING.
+        :param path: the path under the node.
+        :param value: the new value.
+        :return: the new node, or MocaConfig._MISSING if a segment is not a dictionary key or a list index.
+        """
+        if not path:
+            return value
+        segment = path[0]
+        if node is MocaConfig._MISSING:
+            node = {}
+        if isinstance(node, dict):
+            child = MocaConfig._set_by_path(node.get(segment, MocaConfig._MISSING), path[1:], value)
+            if child is MocaConfig._MISSING:
+                return child
+            new_node = dict(node)
+            new_node[segment] = child
+            return new_node
+        elif isinstance(node, list) and segment.isdigit() and (int(segment) < len(node)):
+            child = MocaConfig._set_by_path(node[int(segment)], path[1:], value)
+            if child is MocaConfig._MISSING:
+                return child
+            new_node = list(node)
+            new_node[int(segment)] = child
+            return new_node
+        else:
+            return MocaConfig._MISSING
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _convert_value(value: Any,
+                       res_type: Any,
+                       default: Any,
+                       auto_convert: bool) -> Any:
+        """
+        Check the type of the config value, and convert it if needed.
+        :param value: the config value.
+        :param res_type: the response type. if the value is <any>, don't check the response type.
+        :param default: the default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :return: the value, or the default value if the type is incorrect and can't convert the value.
+        """
+        if res_type is any:  # check response type
+            return value
+        elif isinstance(value, res_type):
+            return value
+        elif auto_convert:
+            if res_type is str:
+                return str(value)
+            elif res_type is int:
+                try:
+                    return int(value)
+                except (TypeError, ValueError, Exception):
+                    return default
+            elif res_type is float:
+                try:
+                    return float(value)
+                except (TypeError, ValueError, Exception):
+                    return default
+            elif res_type is bool:
+                return bool(value)
+            elif res_type is tuple:
+                try:
+                    return tuple([item for item in value])
+                except (TypeError, Exception):
+                    return default
+            elif res_type is list:
+                try:
+                    return [item for item in value]
+                except (TypeError, Exception):
+                    return default
+            elif res_type is dict:
+                try:
+                    index = 0
+                    res = {}
+                    for item in value:
+                        res[index] = item
+                        index += 1
+                except (TypeError, Exception):
+                    return default
+            elif res_type is set:
+                try:
+                    return {item for item in value}
+                except (TypeError, Exception):
+                    return default
+            else:
+                return default
+        else:
+            return default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _read_cache(self) -> dict:
+        """
+        Return the config cache to read.
+        The thread in a batch reads the private working copy of the batch, the other threads read the published cache.
+        """
+        batch_cache = self._batch_cache
+        if (batch_cache is not None) and self._lock._is_owned():
+            return batch_cache
+        return self._config_cache
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get(self,
+            key: str,
+            res_type: Any = any,
+            default: Any = None,
+            auto_convert: bool = False,
+            allow_el_command: bool = False,
+            save_unknown_config: bool = True,
+            access_token: str = '',
+            root_pass: str = '') -> Any:
+        """
+        return the config value.
+        :param key: the config name.
+        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
+        :param default: if can't found the config value, return default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
         :param allow_el_command: use el command.
         :param save_unknown_config: save the config value with default value when can't found the config value.
         :param access_token: the access token of config file.
@@ -601,84 +1523,315 @@ class MocaConfig(object):
             try:
                 if allow_el_command:
                     if key == MocaConfig.GET_ALL_CONFIG:
-                        return self._config_cache
+                        return self._snapshot.data
                     status, response = self.el_command_parser(key)
                     if status:
                         value = response
                     else:
-                        value = self._config_cache[key]
+                        value = self._read_cache()[key]
                 else:
-                    value = self._config_cache[key]
+                    value = self._read_cache()[key]
             except (KeyError, Exception):
-                if save_unknown_config:
-                    self.set(key, default, root_pass=root_pass)
-                return default
-            if res_type is any:  # check response type
-                return value
-            elif isinstance(value, res_type):
-                return value
-            elif auto_convert:
-                if res_type is str:
-                    return str(value)
-                elif res_type is int:
-                    try:
-                        return int(value)
-                    except (TypeError, ValueError, Exception):
-                        return default
-                elif res_type is float:
-                    try:
-                        return float(value)
-                    except (TypeError, ValueError, Exception):
-                        return default
-                elif res_type is bool:
-                    return bool(value)
-                elif res_type is tuple:
-                    try:
-                        return tuple([item for item in value])
-                    except (TypeError, Exception):
-                        return default
-                elif res_type is list:
-                    try:
-                        return [item for item in value]
-                    except (TypeError, Exception):
-                        return default
-                elif res_type is dict:
-                    try:
-                        index = 0
-                        res = {}
-                        for item in value:
-                            res[index] = item
-                            index += 1
-                    except (TypeError, Exception):
-                        return default
-                elif res_type is set:
-                    try:
-                        return {item for item in value}
-                    except (TypeError, Exception):
-                        return default
-                else:
+                value = MocaConfig._get_by_path(self._read_cache(), key)
+                if value is MocaConfig._MISSING:
+                    if save_unknown_config:
+                        self.set(key, default, root_pass=root_pass)
                     return default
-            else:
-                return default
+            return MocaConfig._convert_value(value, res_type, default, auto_convert)
         else:
             return default
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
-    def _save_config_to_file(self) -> bool:
+    def get_many(self,
+                 keys: Dict[str, Tuple[Any, Any]],
+                 auto_convert: bool = False,
+                 save_unknown_config: bool = True,
+                 access_token: str = '',
+                 root_pass: str = '') -> Dict[str, Any]:
+        """
+        return some config values, same as calling get() for every key, but faster.
+        The access token and root password are checked once, all values are read from the same config,
+        and the default values of the missing configs are saved to the config file at once.
+        :param keys: {the config name: (the response type, the default value)}
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :param save_unknown_config: save the config values with default value when can't found the config values.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: {the config name: the config value}. if can't found the config value, the value is default value.
+                 if the response type is incorrect and can't convert the value, the value is default value.
+                 if can't access to the config, the value is default value.
+        """
+        privileged = self._has_privilege(root_pass, access_token)
+        if (not privileged) and self.is_private():
+            return {key: default for key, (res_type, default) in keys.items()}
+        missing = MocaConfig._MISSING
+        cache = self._read_cache()
+        values = {}
+        unknown = {}
+        for key, (res_type, default) in keys.items():
+            if (not privileged) and \
+                    (key.startswith('_') or ((('.' in key) or ('\\' in key)) and MocaConfig._is_private_path(key))):
+                values[key] = default
+                continue
+            value = cache.get(key, missing)
+            if value is missing:
+                value = MocaConfig._get_by_path(cache, key)
+                if value is missing:
+                    values[key] = default
+                    unknown[key] = default
+                    continue
+            values[key] = MocaConfig._convert_value(value, res_type, default, auto_convert)
+        if unknown and save_unknown_config:
+            self._set_many(unknown, access_token, root_pass)
+        return values
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def handle(self,
+               key: str,
+               res_type: Any = any,
+               default: Any = None,
+               auto_convert: bool = True,
+               access_token: str = '',
+               root_pass: str = '') -> MocaConfigHandle:
+        """
+        Return a handle of the config value for hot-path reads.
+        handle.value returns the same value as get(key, res_type, default, auto_convert),
+        but the access check and the type conversion only run again after the config was changed.
+        :param key: the config name.
+        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
+        :param default: if can't found the config value, return default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the handle.
+        """
+        return MocaConfigHandle(self, key, res_type, default, auto_convert, access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _write_file_atomic(path: Path,
+                           data: bytes,
+                           sync: bool = True,
+                           mode: Optional[int] = None) -> stat_result:
+        """
+        Write the data to a temporary file in the same directory, fsync it, and replace the target file with it.
+        The readers never see a half-written file.
+        If the path is a symbolic link, the target of the link is replaced, the link is kept.
+        The permission, owner and group of the old file are kept. (the owner and group only if this process can)
+        If the temporary file can't be created (the directory is not writable), the file is overwritten in place.
+        :param path: the target file path.
+        :param data: the data to write.
+        :param sync: fsync the file and the directory.
+        :param mode: the permission of the file, None means the permission of the old file or the default permission.
+        :return: the stat of the written file.
+        """
+        path = Path(realpath(str(path)))
+        try:
+            old_stat = stat(str(path))
+        except FileNotFoundError:
+            old_stat = None
+        try:
+            fd, tmp_path = mkstemp(prefix=f'.{path.name}.', suffix=MocaConfig._ATOMIC_TMP_SUFFIX, dir=str(path.parent))
+        except PermissionError:
+            if old_stat is None:
+                raise
+            return MocaConfig._write_file_in_place(path, data, sync)
+        try:
+            with open(fd, mode='wb', closefd=True) as tmp_file:
+                if old_stat is not None:
+                    chmod(tmp_path, old_stat.st_mode & 0o7777 if mode is None else mode)  # keep the permission.
+                    if (chown is not None) and ((old_stat.st_uid, old_stat.st_gid) != (geteuid(), getegid())):
+                        try:
+                            chown(tmp_path, old_stat.st_uid, old_stat.st_gid)
+                        except OSError:
+                            pass  # only root can give the file to an other user.
+                else:
+                    mask = umask(0)
+                    umask(mask)
+                    chmod(tmp_path, 0o666 & ~mask if mode is None else mode)
+                tmp_file.write(data)
+                tmp_file.flush()
+                if sync:
+                    fsync(tmp_file.fileno())
+                file_stat = fstat(tmp_file.fileno())
+            replace(tmp_path, str(path))
+        except BaseException:
+            try:
+                unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        if not sync:
+            return file_stat
+        try:  # make the rename durable.
+            dir_fd = os_open(str(path.parent), O_RDONLY)
+            try:
+                fsync(dir_fd)
+            finally:
+                close(dir_fd)
+        except OSError:
+            pass
+        return file_stat
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _write_file_in_place(path: Path,
+                             data: bytes,
+                             sync: bool = True) -> stat_result:
+        """
+        Overwrite the file in place, used when the directory is not writable but the file is.
+        The readers may see a half-written file, it is reloaded again when the write was finished.
+        :param path: the target file path.
+        :param data: the data to write.
+        :param sync: fsync the file.
+        :return: the stat of the written file.
+        """
+        with open(str(path), mode='r+b') as config_file:
+            config_file.write(data)
+            config_file.truncate()
+            config_file.flush()
+            if sync:
+                fsync(config_file.fileno())
+            return fstat(config_file.fileno())
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _decode_without_gc(decoder: Callable[[bytes], Any],
+                           data: bytes) -> Any:
+        """
+        Decode the data with the cyclic garbage collector paused.
+        The decoded config never contains reference cycles,
+        but the collector is run again and again while a large config is being decoded.
+        """
+        gc_was_enabled = gc_isenabled()
+        gc_disable()
+        try:
+            return decoder(data)
+        finally:
+            if gc_was_enabled:
+                gc_enable()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _get_binary_cache_path(self) -> Path:
+        """Return the path of the binary sidecar cache file."""
+        return self._path.with_name(self._path.name + MocaConfig.BINARY_CACHE_SUFFIX)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _is_internal_file(path: Path) -> bool:
+        """Return true if the file is a binary sidecar cache or a temporary file of the atomic writes."""
+        name = path.name
+        return name.endswith(MocaConfig.BINARY_CACHE_SUFFIX) or \
+            (name.startswith('.') and name.endswith(MocaConfig._ATOMIC_TMP_SUFFIX))
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _load_binary_cache(self,
+                           fingerprint: Tuple[int, int, int],
+                           content_hash: bytes) -> Optional[dict]:
+        """
+        Load the config from the binary sidecar cache file.
+        :param fingerprint: the (size, mtime_ns, inode) of the config file.
+        :param content_hash: the content hash of the config file.
+        :return: the config, None if the cache file doesn't exist, is broken, or is not fresh.
+        """
+        try:
+            with open(str(self._get_binary_cache_path()), mode='rb') as cache_file:
+                data = cache_file.read()
+            header = MocaConfig._BINARY_CACHE_HEADER
+            if not data.startswith(header):  # written by an other python version.
+                return None
+            size, mtime_ns, cached_hash, config = MocaConfig._decode_without_gc(marshal_loads,
+                                                                                  memoryview(data)[len(header):])
+            if (size, mtime_ns) == fingerprint[:2] and cached_hash == content_hash and isinstance(config, dict):
+                return config
+            return None
+        except FileNotFoundError:
+            return None
+        except Exception:
+            if self._debug_mode:
+                print_exc()
+            return None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _save_binary_cache(self,
+                           fingerprint: Tuple[int, int, int],
+                           content_hash: bytes,
+                           config: dict) -> None:
+        """
+        Save the config to the binary sidecar cache file.
+        The cache file is only a copy of the config file, so the errors are ignored and the file is not fsynced.
+        :param fingerprint: the (size, mtime_ns, inode) of the config file.
+        :param content_hash: the content hash of the config file.
+        :param config: the config parsed from the config file.
+        """
+        try:
+            data = marshal_dumps((fingerprint[0], fingerprint[1], content_hash, config))
+            self._write_file_atomic(self._get_binary_cache_path(), MocaConfig._BINARY_CACHE_HEADER + data,
+                                    sync=False, mode=stat(str(self._path)).st_mode & 0o7777)
+        except Exception:
+            if self._debug_mode:
+                print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _save_config_to_file(self,
+                             cache: Optional[dict] = None) -> bool:
         """
         Save the config data to config file
+        :param cache: the config cache to be saved, None means the current config cache.
         :return: status, [success] or [failed]
         """
         try:
-            json_string = dumps(self._config_cache,
-                                ensure_ascii=False,
-                                indent=4,
-                                sort_keys=True,
-                                separators=(',', ': '))
-            with open(str(self.path), mode='w', encoding='utf-8') as config_file:
-                config_file.write(json_string)
+            file_data = self._get_file_data(cache)
+            json_string = MocaJsonCodec.dumps_file(file_data)
+            data = json_string.encode('utf-8')
+            plain_hash = None
+            if self._file_password is None:
+                try:
+                    with open(str(self.path), mode='rb') as config_file:
+                        if config_file.read() == data:  # nothing changed, skip writing.
+                            return True
+                except FileNotFoundError:
+                    pass
+            else:  # the encrypted file is different every time, compare the plain json.
+                if self._decrypt_failed:  # don't overwrite the configs that couldn't be decrypted.
+                    self._status = MocaConfig.DECRYPT_ERROR
+                    return False
+                plain_hash = blake2b(data, digest_size=16).digest()
+                if plain_hash == self._plain_hash:
+                    return True
+                if self._file_salt is None:
+                    self._file_salt = Random.get_random_bytes(16)
+                data = MocaConfig._encrypt_file_data(data, self._file_password, self._file_salt)
+            # record the fingerprint of our own write, so the reload loop doesn't parse it again.
+            file_stat = self._write_file_atomic(self.path, data)
+            if plain_hash is not None:
+                self._plain_hash = plain_hash
+            fingerprint = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+            content_hash = blake2b(data, digest_size=16).digest()
+            self._set_fingerprint(fingerprint, content_hash)
+            if self._binary_cache:
+                self._save_binary_cache(fingerprint, content_hash, file_data)
+            MocaConfig._notify_children()
             if self._debug_mode:
                 print('Saved new config.')
                 print('-- new ---------------------')
@@ -708,6 +1861,182 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    def _commit(self,
+                cache: dict) -> bool:
+        """
+        Write the new config cache to the config file, or schedule a background write in write-behind mode.
+        the lock should be held by the caller, and the new cache should be published only if this succeeded.
+        :param cache: the new config cache, not published yet.
+        :return: status, [success] or [failed]
+        """
+        if not self._write_behind:
+            return self._save_config_to_file(cache)
+        self._dirty = True
+        if self._flush_timer is None:
+            self._start_flush_timer(self._write_behind_delay)
+        return True
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _start_flush_timer(self,
+                           delay: float) -> None:
+        """Schedule a background write. the lock should be held by the caller."""
+        self._flush_timer = Timer(delay, self._flush_in_background)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _flush_in_background(self) -> None:
+        """
+        Write the pending changes, and report the failure to the flush error handler.
+        """
+        with self._lock:
+            self._flush_timer = None
+        if (not self.flush()) and (self._flush_error_handler is not None):
+            try:
+                self._flush_error_handler(self, self._status)
+            except Exception:
+                if self._debug_mode:
+                    print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def flush(self) -> bool:
+        """
+        Write the pending changes of write-behind mode to the config file.
+        If the write failed, the changes are kept in memory, and the status is changed to the error code.
+        The failed write is retried in background with a exponential backoff (max FLUSH_RETRY_MAX_DELAY seconds),
+        the config file is not reloaded until the pending changes are written.
+        :return: status, [success] or [failed]
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            res = self._save_config_to_file()
+            if res:
+                self._dirty = False
+                self._flush_retry_delay = 0.0
+                self._status = MocaConfig.CORRECT
+            else:
+                self._flush_retry_delay = min(max(self._flush_retry_delay * 2, self._write_behind_delay, 0.1),
+                                              MocaConfig.FLUSH_RETRY_MAX_DELAY)
+                self._start_flush_timer(self._flush_retry_delay)
+            return res
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _flush_all(cls) -> None:
+        """Write the pending changes of all write-behind instances. (called at exit)"""
+        for instance in list(cls._write_behind_instances):
+            instance.flush()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _before_fork(cls) -> None:
+        """Prepare the pipe to the child. (called in the parent before fork)"""
+        if cls._fork_notifier is not None:
+            cls._fork_notifier.before_fork()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _after_fork_in_parent(cls) -> None:
+        """Keep the pipe to the child. (called in the parent after fork)"""
+        if cls._fork_notifier is not None:
+            cls._fork_notifier.after_fork_in_parent()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """
+        Restart the change detection in the child. (called in the child after fork)
+        Only the thread that called fork exists in the child, so the watchers, the locks and the thread pools are reset.
+        The config caches and the fingerprints of the files are kept, the unchanged files are not parsed again.
+        """
+        reset_watchers_after_fork()
+        cls._registry_lock = RLock()
+        notifier = cls._fork_notifier
+        notified = (notifier is not None) and notifier.after_fork_in_child()
+        for instance in list(cls._live_instances):
+            instance._reset_after_fork(watch=not notified)
+        if notified:
+            notifier.start(cls._reload_all, cls._watch_all)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _notify_children(cls) -> None:
+        """
+        Notify the forked children in 'notify' mode. (called after the config file was written or reloaded)
+        The children reload the file, so they must not be notified before the file is written.
+        """
+        if cls._fork_notifier is not None:
+            cls._fork_notifier.notify()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _reload_all(cls) -> None:
+        """Reload all instances. (called when the parent notified)"""
+        for instance in list(cls._live_instances):
+            instance.reload_config()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _watch_all(cls) -> None:
+        """Start watching the config files of all instances. (called when the parent stopped notifying)"""
+        for instance in list(cls._live_instances):
+            instance._watcher.register(instance)
+        cls._reload_all()  # the changes before watching.
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _reset_after_fork(self,
+                          watch: bool) -> None:
+        """
+        Reset the state of the threads that don't exist in the child. (called in the child after fork)
+        :param watch: register this instance to the watcher.
+        """
+        if not self._lock._is_owned():  # not held by the thread that called fork.
+            self._lock = RLock()
+            if self._batch_depth > 0:  # the batch of an other thread can't be committed, drop it.
+                self._batch_depth = 0
+                self._batch_cache = None
+                self._batch_changes = {}
+        # the pending changes of write-behind mode are written by the parent.
+        self._flush_timer = None
+        self._flush_retry_delay = 0.0
+        self._dirty = False
+        if self._handler_pool is not None:
+            self._handler_pool._after_fork_in_child()
+        if isinstance(self._watcher, MocaConfigInotifyWatcher) and \
+                (self._watcher is not MocaConfigInotifyWatcher._default):  # inotify is not available in the child.
+            self._watcher = MocaConfigWatcher.default()
+        if watch:
+            self._watcher.register(self)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     def set(self,
             key: str,
             config_value: Any,
@@ -717,6 +2046,8 @@ class MocaConfig(object):
         """
         set a config value.
         if the key already exists, overwrite it.
+        If the key is not a existing key and contains ".", it is a dotted path of nested config, (ex: "db.pool.size")
+        the missing dictionaries are created, and the handlers of the top-level key are run.
         :param key: the config name.
         :param config_value: the config value.
         :param allow_el_command: use el command.
@@ -726,7 +2057,7 @@ class MocaConfig(object):
         """
         if self._is_allowed(key, root_pass, access_token):
             try:
-                _ = dumps(config_value)
+                _ = json_dumps(config_value)  # the same encoder as the config file, the fast codecs accept more types.
                 value = config_value
             except TypeError:
                 value = str(config_value)
@@ -738,53 +2069,244 @@ class MocaConfig(object):
                     new_value = value
             else:
                 new_value = value
-            try:
-                old_value = self._config_cache[key]
-            except KeyError:
-                old_value = None
-            self._config_cache[key] = new_value
-            res = self._save_config_to_file()
-            if res:
-                if old_value is not None:
-                    self._run_handler_one(key, old_value, new_value)
-                return True
-            else:
-                try:
-                    del self._config_cache[key]
-                except KeyError:
-                    pass
-                return False
+            with self._lock:
+                old_cache = self._config_cache if self._batch_cache is None else self._batch_cache
+                shadowed = self._env_shadowed
+                if (key not in old_cache) and ('.' in key):
+                    path = MocaConfig._parse_path(key)
+                    key = path[0]
+                    if len(path) > 1:  # nested config, change the copy of the top-level value in the file.
+                        new_value = MocaConfig._set_by_path(shadowed.get(key, old_cache.get(key, MocaConfig._MISSING)),
+                                                            path[1:], new_value)
+                        if new_value is MocaConfig._MISSING:  # a segment is not a dictionary or a list.
+                            return False
+                old_value = old_cache.get(key, MocaConfig._MISSING)
+                if key in shadowed:  # overridden by the environment variables, only the file value is changed.
+                    self._env_shadowed = {**shadowed, key: new_value}
+                    new_value = self._apply_env_value(key, new_value)
+                if self._batch_depth > 0:  # the file will be saved when the batch is committed.
+                    old_cache[key] = new_value  # the private working copy of the batch.
+                    self._record_batch_change(key, old_value, new_value)
+                    return True
+                new_cache = dict(old_cache)
+                new_cache[key] = new_value
+                if not self._commit(new_cache):
+                    self._env_shadowed = shadowed
+                    return False
+                self._publish(new_cache)
+            if (key not in shadowed) or (old_value != new_value):
+                self._run_handler_one(key, None if old_value is MocaConfig._MISSING else old_value, new_value)
+            return True
         else:
             return None
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
-    def remove_config(self,
-                      key: str,
-                      access_token: str = '',
-                      root_pass: str = '') -> Optional[bool]:
+    def set_many(self,
+                 values: Dict[str, Any],
+                 access_token: str = '',
+                 root_pass: str = '') -> Optional[bool]:
+        """
+        set some config values, the config file is written only once, and then the handlers are run.
+        If a value can't be set, all changes are rolled back.
+        :param values: {the config name: the config value}
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: status, [success] or [failed], If can't access to any of the configs return None, and nothing is changed.
+        """
+        if not all(self._is_allowed(key, root_pass, access_token) for key in values):
+            return None
+        return self._set_many(values, access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _set_many(self,
+                  values: Dict[str, Any],
+                  access_token: str,
+                  root_pass: str) -> bool:
+        """
+        Set some config values in a batch, the config file is written only once, and then the handlers are run.
+        If a value can't be set, all changes are rolled back.
+        (in a outer batch, the changes are committed with the outer batch)
+        :return: status, [success] or [failed]
+        """
+        result: list = []
+        try:
+            with self._open_batch(result):
+                for key, value in values.items():
+                    if not self.set(key, value, access_token=access_token, root_pass=root_pass):
+                        raise ValueError(key)
+        except ValueError:
+            return False
+        if not result:  # joined a outer batch.
+            return True
+        status, changes = result[0]
+        self._run_handlers(changes)
+        return status
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def remove_config(self,
+                      key: str,
+                      access_token: str = '',
+                      root_pass: str = '') -> Optional[bool]:
+        """
+        Remove a config data.
+        :param key: the config key.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: status, [success] or [failed]. If can't access to this config file. return None.
+        """
+        if self._is_allowed(key, root_pass, access_token):
+            with self._lock:
+                old_cache = self._config_cache if self._batch_cache is None else self._batch_cache
+                shadowed = self._env_shadowed
+                if key in shadowed:  # overridden by the environment variables, only the file value is removed.
+                    if shadowed[key] is MocaConfig._MISSING:
+                        return False
+                    self._env_shadowed = {**shadowed, key: MocaConfig._MISSING}
+                    new_value = self._apply_env_value(key, MocaConfig._MISSING)
+                elif key not in old_cache:
+                    return False
+                else:
+                    new_value = MocaConfig._MISSING
+                value = old_cache[key]
+                if self._batch_depth > 0:  # the file will be saved when the batch is committed.
+                    if new_value is MocaConfig._MISSING:
+                        del old_cache[key]  # the private working copy of the batch.
+                    else:
+                        old_cache[key] = new_value
+                    self._record_batch_change(key, value, new_value)
+                    return True
+                new_cache = dict(old_cache)
+                if new_value is MocaConfig._MISSING:
+                    del new_cache[key]
+                else:
+                    new_cache[key] = new_value
+                if not self._commit(new_cache):
+                    self._env_shadowed = shadowed
+                    return False
+                self._publish(new_cache)
+            if new_value is MocaConfig._MISSING:
+                self._run_handler_one(key, value, None)
+            elif value != new_value:
+                self._run_handler_one(key, value, new_value)
+            return True
+        else:
+            return None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _record_batch_change(self,
+                             key: str,
+                             old_value: Any,
+                             new_value: Any) -> None:
+        """
+        Record a change in the current batch. the first old value and the last new value are kept.
+        if the key was not exists, the value is MocaConfig._MISSING.
+        """
+        try:
+            self._batch_changes[key][1] = new_value
+        except KeyError:
+            self._batch_changes[key] = [old_value, new_value]
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _is_same_value(old_value: Any,
+                       new_value: Any) -> bool:
+        """
+        Return true if the new value is surely the same as the old value in the config file.
+        Only the scalar values are compared, (1 == True, but they are different in json) the containers are treated as changed.
+        """
+        return (old_value is new_value) or \
+               ((type(old_value) is type(new_value)) and (type(old_value) in (str, int, float)) and (old_value == new_value))
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @contextmanager
+    def batch(self) -> Iterator['MocaConfig']:
         """
-        Remove a config data.
-        :param key: the config key.
-        :param access_token: the access token of config file.
-        :param root_pass: the root password.
-        :return: status, [success] or [failed]. If can't access to this config file. return None.
+        Group some set() and remove_config() calls into one transaction.
+        Inside the block, the changes are applied to a private copy of the config cache, and the config file is not written.
+        get() in the block sees the changes, but the other threads, the handles and the snapshots don't see them
+        until the block was committed.
+        When the block exits, the config file is written once, and then the handlers are run.
+        If the block raises an exception, or the config file can't be written, all changes are rolled back.
+        (if the config file can't be written, the status is changed to the error code.)
+        The other threads can't change or reload the config until the block exits. Nested blocks join the outer one.
+        The snapshot is published when the block exits, so the readers of snapshot() never see a half-done batch.
+
+        with config.batch():
+            config.set('a', 1)
+            config.set('b', 2)
         """
-        if self._is_allowed(key, root_pass, access_token):
+        result: list = []
+        with self._open_batch(result):
+            yield self
+        if result:
+            self._run_handlers(result[0][1])
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @contextmanager
+    def _open_batch(self,
+                    result: list) -> Iterator['MocaConfig']:
+        """
+        The transaction of batch(), without running the handlers.
+        When the outermost block was committed or rolled back, (status, changes) is appended to the result,
+        the status is True if the config file was written or nothing to write,
+        and the changes are the [(key, old value, new value)] to run the handlers. (empty if rolled back)
+        """
+        with self._lock:
+            if self._batch_depth > 0:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                return
+            self._batch_depth = 1
+            # the private working copy, the other threads keep reading the published cache until committed.
+            self._batch_cache = dict(self._config_cache)
+            self._batch_changes = {}
+            shadowed = self._env_shadowed
+            status = False
             try:
-                value = self._config_cache[key]
-                del self._config_cache[key]
-                res = self._save_config_to_file()
-                if res:
-                    return True
+                yield self
+            except BaseException:
+                self._env_shadowed = shadowed
+                self._batch_changes = {}
+                raise
+            else:
+                if (self._env_shadowed is shadowed) and \
+                        all(MocaConfig._is_same_value(old_value, new_value)
+                            for old_value, new_value in self._batch_changes.values()):
+                    status = True  # nothing changed, the snapshot is still up to date.
+                elif self._commit(self._batch_cache):
+                    self._publish(self._batch_cache)
+                    status = True
                 else:
-                    self._config_cache[key] = value
-                    return False
-            except KeyError:
-                return False
-        else:
-            return None
+                    self._env_shadowed = shadowed
+                    self._batch_changes = {}
+            finally:
+                self._batch_depth = 0
+                self._batch_cache = None
+            missing = MocaConfig._MISSING
+            changes = [(key,
+                        None if old_value is missing else old_value,
+                        None if new_value is missing else new_value)
+                       for key, (old_value, new_value) in self._batch_changes.items()
+                       if (old_value is not missing) or (new_value is not missing)]
+            self._batch_changes = {}
+            result.append((status, changes))
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -810,14 +2332,179 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    async def aget(self,
+                   key: str,
+                   res_type: Any = any,
+                   default: Any = None,
+                   auto_convert: bool = False,
+                   allow_el_command: bool = False,
+                   save_unknown_config: bool = True,
+                   access_token: str = '',
+                   root_pass: str = '') -> Any:
+        """
+        The coroutine version of get().
+        The value is read synchronously, only the write of the unknown config is run in the default executor.
+        """
+        get = partial(self.get, key, res_type, default, auto_convert, allow_el_command, save_unknown_config,
+                      access_token, root_pass)
+        if (not save_unknown_config) or (key in self._read_cache()):
+            return get()
+        else:
+            return await get_running_loop().run_in_executor(None, get)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    async def aset(self,
+                   key: str,
+                   config_value: Any,
+                   allow_el_command: bool = False,
+                   access_token: str = '',
+                   root_pass: str = '') -> Optional[bool]:
+        """The coroutine version of set(), the file write is run in the default executor."""
+        return await get_running_loop().run_in_executor(None, partial(self.set, key, config_value, allow_el_command,
+                                                                      access_token, root_pass))
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    async def aremove_config(self,
+                             key: str,
+                             access_token: str = '',
+                             root_pass: str = '') -> Optional[bool]:
+        """The coroutine version of remove_config(), the file write is run in the default executor."""
+        return await get_running_loop().run_in_executor(None, partial(self.remove_config, key,
+                                                                      access_token, root_pass))
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    async def areload_config(self) -> None:
+        """The coroutine version of reload_config(), the reload is run in the default executor."""
+        await get_running_loop().run_in_executor(None, self.reload_config)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    async def aflush(self) -> bool:
+        """The coroutine version of flush(), the file write is run in the default executor."""
+        return await get_running_loop().run_in_executor(None, self.flush)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    async def watch(self,
+                    keys: Optional[Union[List[str], str]] = None,
+                    maxsize: int = 0,
+                    pattern: bool = False) -> AsyncIterator[MocaConfigChange]:
+        """
+        Return a async iterator of the config changes, the changes are delivered on the running loop.
+        If pattern is true, the keys are wildcard patterns, same as add_handler().
+
+        async for change in config.watch(['db_*', 'lang'], pattern=True):
+            print(change.key, change.old_value, change.new_value)
+
+        :param keys: the keys of the config, None means all keys.
+        :param maxsize: the max size of the change queue, 0 means unlimited.
+                        if the queue is full, the new changes are dropped.
+        :param pattern: the keys are wildcard patterns or not.
+        :return: the changes.
+        """
+        loop = get_running_loop()
+        queue: Queue = Queue(maxsize)
+
+        def put_change(key: str, old_value: Any, new_value: Any) -> None:
+            if not queue.full():
+                queue.put_nowait(MocaConfigChange(key, old_value, new_value))
+
+        name = f'__moca_config_watch_{uuid4().hex}__'
+        if keys is None:
+            self.add_handler(name, '*', put_change, loop=loop, pattern=True)
+        else:
+            self.add_handler(name, keys, put_change, loop=loop, pattern=pattern)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.remove_handler(name)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     @classmethod
     def get_instance(cls,
                      name: str) -> Any:
-        """Return already created instance."""
-        try:
-            return cls._instance_list[name]
-        except (KeyError, Exception):
-            return None
+        """
+        Return already created instance.
+        If the config file was indexed by load_config_files(lazy=True), the instance is created at the first call.
+        """
+        instance = cls._instance_list.get(name)
+        if cls._lazy_instances:
+            instance = cls._get_lazy_instance(name, instance)
+        return instance
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _get_lazy_instance(cls,
+                           name: str,
+                           instance: Any) -> Any:
+        """
+        Create the lazy instance if needed, record the access time, and sweep the idle lazy instances.
+        :param name: the instance name.
+        :param instance: the created instance, or None.
+        :return: the instance, or None if the name is unknown.
+        """
+        now = monotonic()
+        entry = cls._lazy_instances.get(name)
+        if entry is not None:
+            if instance is None:
+                with cls._registry_lock:
+                    instance = cls._instance_list.get(name)
+                    if instance is None:
+                        path, kwargs, _, evicted = entry
+                        instance = None if evicted is None else evicted()
+                        if instance is None:
+                            instance = cls(name, path, **kwargs)
+                        else:  # evicted, but still referenced, watch it again.
+                            cls._instance_list[name] = instance
+                            instance._watcher.register(instance)
+                            instance.reload_config()
+                        entry[3] = None
+            cls._lazy_access[name] = now
+        if now - cls._last_sweep > MocaConfig.IDLE_SWEEP_INTERVAL:
+            cls._last_sweep = now
+            cls._evict_idle_instances(now)
+        return instance
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _evict_idle_instances(cls,
+                              now: float) -> None:
+        """
+        Release the lazy instances not accessed by get_instance() in their idle timeout.
+        The evicted instance stops watching, and is created again by the next get_instance().
+        The instances that have handlers, snapshot listeners or unwritten changes are not evicted.
+        """
+        with cls._registry_lock:
+            for name, last_access in list(cls._lazy_access.items()):
+                entry = cls._lazy_instances.get(name)
+                instance = cls._instance_list.get(name)
+                if (entry is None) or (instance is None):
+                    del cls._lazy_access[name]
+                    continue
+                idle_timeout = entry[2]
+                if (idle_timeout is None) or (now - last_access < idle_timeout):
+                    continue
+                if instance._handlers or instance._snapshot_listeners or (instance._dirty and not instance.flush()):
+                    continue
+                instance._watcher.unregister(instance)
+                del cls._instance_list[name]
+                del cls._lazy_access[name]
+                entry[3] = weak_ref(instance)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -883,11 +2570,11 @@ class MocaConfig(object):
         If some other error occurred return None.
         """
         try:
-            if MocaConfig._ROOT_PASS == root_pass:
-                return self._config_cache['__moca_config_access_token__'] == token
+            if MocaConfig._compare_secret(MocaConfig._ROOT_PASS, root_pass):
+                return MocaConfig._compare_secret(self._config_cache['__moca_config_access_token__'], token)
             else:
                 return None
-        except IndexError:
+        except (IndexError, KeyError):
             return None
 
     # ----------------------------------------------------------------------------
@@ -902,8 +2589,7 @@ class MocaConfig(object):
         :param root_pass: the root password.
         :return: status, [success] or [failed]
         """
-        if (MocaConfig._ROOT_PASS == root_pass) or bool(self.check_access_token(access_token,
-                                                                                MocaConfig._ROOT_PASS)):
+        if self._has_privilege(root_pass, access_token):
             try:
                 self._path.unlink()
                 return True
@@ -933,6 +2619,17 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    @staticmethod
+    def _derive_key(password: str) -> bytes:
+        """
+        Return the aes key of the password, the sha256 of the password. (same as Crypto.Hash.SHA256)
+        hashlib is as fast as a cache lookup, so the keys are not cached, and the passwords are never kept.
+        """
+        return sha256(password.encode()).digest()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     @staticmethod
     def _create_aes(password: str,
                     iv: bytes):
@@ -942,10 +2639,7 @@ class MocaConfig(object):
         :param iv: initialization vector
         :return: aes object
         """
-        sha256_hash = SHA256.new()
-        sha256_hash.update(password.encode())
-        hashed_key = sha256_hash.digest()
-        return AES.new(hashed_key, AES.MODE_CFB, iv)
+        return AES.new(MocaConfig._derive_key(password), AES.MODE_CFB, iv)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -980,6 +2674,88 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    @staticmethod
+    def _derive_file_key(password: str,
+                         salt: bytes,
+                         iterations: int) -> bytes:
+        """
+        Return the aes key of the encrypted config file, derived by pbkdf2-sha256.
+        The keys are cached, keyed by the digest of the password (keyed with the salt), not the password.
+        """
+        cache = MocaConfig._file_key_cache
+        cache_key = (blake2b(password.encode('utf-8'), key=salt).digest(), salt, iterations)
+        key = cache.get(cache_key)
+        if key is not None:
+            try:
+                cache.move_to_end(cache_key)
+            except KeyError:
+                pass  # evicted by other thread.
+            return key
+        key = PBKDF2(password, salt, dkLen=32, count=iterations, hmac_hash_module=SHA256)
+        cache[cache_key] = key
+        if len(cache) > MocaConfig.FILE_KEY_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                pass
+        return key
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _encrypt_file_data(data: bytes,
+                           password: str,
+                           salt: bytes) -> bytes:
+        """
+        Encrypt the config file with AES-GCM, a new nonce is used every time.
+        The header (magic, version, pbkdf2 iterations, salt, nonce) is authenticated with the data.
+        :param data: the plain json.
+        :param password: the password of the config file.
+        :param salt: the salt of the key.
+        :return: the header and the encrypted data.
+        """
+        header = MocaConfig._ENCRYPTED_FILE_HEADER
+        iterations = MocaConfig.FILE_KDF_ITERATIONS
+        nonce = Random.get_random_bytes(12)
+        aes = AES.new(MocaConfig._derive_file_key(password, salt, iterations), AES.MODE_GCM, nonce=nonce)
+        aes.update(header.pack(MocaConfig._ENCRYPTED_FILE_MAGIC, MocaConfig._ENCRYPTED_FILE_VERSION, iterations,
+                               salt, nonce, bytes(16))[:-16])
+        encrypted, tag = aes.encrypt_and_digest(data)
+        return header.pack(MocaConfig._ENCRYPTED_FILE_MAGIC, MocaConfig._ENCRYPTED_FILE_VERSION, iterations,
+                           salt, nonce, tag) + encrypted
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _decrypt_file_data(data: bytes,
+                           password: str) -> Tuple[bytes, Optional[bytes]]:
+        """
+        Decrypt the encrypted config file.
+        :param data: the content of the config file.
+        :param password: the password of the config file.
+        :return: (the plain json, the salt), if the file is not encrypted, return (data, None)
+
+        Raise
+        -----
+            ValueError: if the password is incorrect, or the file was broken.
+        """
+        header = MocaConfig._ENCRYPTED_FILE_HEADER
+        if not data.startswith(MocaConfig._ENCRYPTED_FILE_MAGIC):
+            return data, None
+        if len(data) < header.size:
+            raise ValueError('The encrypted config file is too short.')
+        magic, version, iterations, salt, nonce, tag = header.unpack_from(data)
+        if version != MocaConfig._ENCRYPTED_FILE_VERSION:
+            raise ValueError(f'Unknown encrypted config file version: {version}')
+        aes = AES.new(MocaConfig._derive_file_key(password, salt, iterations), AES.MODE_GCM, nonce=nonce)
+        aes.update(data[:header.size - 16])
+        return aes.decrypt_and_verify(data[header.size:], tag), salt
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     @staticmethod
     def encrypt_string(text: str,
                        password: str) -> Optional[str]:
@@ -1029,10 +2805,39 @@ class MocaConfig(object):
         :param root_pass: the root password.
         :return: status, [success] or [failed], If can't access to the config file return None
         """
-        json_string = dumps(value)
+        return self.set(key, self._encrypt_value(value, encrypt_pass), access_token=access_token, root_pass=root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def set_and_encrypt_many(self,
+                             values: Dict[str, Any],
+                             encrypt_pass: str,
+                             access_token: str = '',
+                             root_pass: str = '') -> Optional[bool]:
+        """
+        set some config values and encrypt them in the config file, the config file is written only once.
+        :param values: {the config name: the config value}
+        :param encrypt_pass: the password to decrypt the configs.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: status, [success] or [failed], If can't access to any of the configs return None, and nothing is changed.
+        """
+        if not all(self._is_allowed(key, root_pass, access_token) for key in values):
+            return None
+        return self._set_many({key: self._encrypt_value(value, encrypt_pass) for key, value in values.items()},
+                              access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _encrypt_value(self,
+                       value: Any,
+                       encrypt_pass: str) -> str:
+        """Return the encrypted json string of the value, used by set_and_encrypt."""
+        json_string = self.json_codec.dumps(value)
         encrypted_value = MocaConfig.encrypt(json_string.encode('utf-8'), password=encrypt_pass)
-        encrypted_string = b64encode(encrypted_value).decode('utf-8')
-        return self.set(key, encrypted_string, access_token=access_token, root_pass=root_pass)
+        return b64encode(encrypted_value).decode('utf-8')
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1072,13 +2877,76 @@ class MocaConfig(object):
                                     access_token, root_pass)
         if encrypted_string == moca_null:
             return default
-        else:
-            encrypted_value = b64decode(encrypted_string.encode('utf-8'))
-            plain_value = MocaConfig.decrypt(encrypted_value, encrypt_pass).decode()
+        cache = self._decrypt_cache
+        cache_key = (key, encrypted_string, MocaConfig._derive_key(encrypt_pass)) \
+            if isinstance(encrypted_string, str) else None
+        cached = None if cache_key is None else cache.get(cache_key)
+        if cached is not None:
             try:
-                return loads(plain_value)
-            except JSONDecodeError:
-                return default
+                cache.move_to_end(cache_key)
+            except KeyError:
+                pass
+            value, plain_value = cached
+            # the dictionaries and lists are parsed again, the caller may change them.
+            return self.json_codec.loads(plain_value) if value is MocaConfig._MISSING else value
+        encrypted_value = b64decode(encrypted_string.encode('utf-8'))
+        plain_value = MocaConfig.decrypt(encrypted_value, encrypt_pass).decode()
+        try:
+            value = self.json_codec.loads(plain_value)
+        except JSONDecodeError:
+            return default
+        if cache_key is not None:
+            cache[cache_key] = (MocaConfig._MISSING if isinstance(value, (dict, list)) else value, plain_value)
+            if len(cache) > MocaConfig.DECRYPT_CACHE_SIZE:
+                try:
+                    cache.popitem(last=False)
+                except KeyError:
+                    pass
+        return value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _purge_decrypt_cache(self,
+                             cache: dict) -> None:
+        """Remove the decrypted configs that the encrypted string was changed. the lock should be held by the caller."""
+        missing = MocaConfig._MISSING
+        for entry in list(self._decrypt_cache):
+            value = cache.get(entry[0], missing)
+            if value is missing:
+                value = MocaConfig._get_by_path(cache, entry[0])
+            if value != entry[1]:
+                self._decrypt_cache.pop(entry, None)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def clear_decrypt_cache(self) -> None:
+        """
+        Remove all decrypted configs and the derived keys of the encrypted config files from the memory.
+        The decrypted configs are cached until the encrypted string was changed (max DECRYPT_CACHE_SIZE configs).
+        The derived keys are shared by all instances (max FILE_KEY_CACHE_SIZE keys), they are derived again when needed.
+        """
+        self._decrypt_cache.clear()
+        MocaConfig._file_key_cache.clear()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _get_pattern_type(key: str,
+                          pattern: bool) -> int:
+        """
+        Return the type of the handled key.
+        0: a normal key, 1: a prefix like "db_*", 2: other wildcard patterns like "db_?_host"
+        If pattern is false, the key is always a normal key, even if it contains "*", "?" or "[".
+        """
+        if (not pattern) or (not any(char in key for char in '*?[')):
+            return 0
+        elif key.endswith('*') and not any(char in key[:-1] for char in '*?['):
+            return 1
+        else:
+            return 2
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1088,28 +2956,37 @@ class MocaConfig(object):
                     keys: Union[List[str], str],
                     handler: Callable,
                     args: Tuple = (),
-                    kwargs: Dict = {}) -> None:
+                    kwargs: Dict = {},
+                    loop: Optional[AbstractEventLoop] = None,
+                    pattern: bool = False) -> None:
         """
-        Add a handler to do something when the config value was changed.
+        Add a handler to do something when the config value was changed, added or removed.
+        If the key was added, the old value is None. If the key was removed, the new value is None.
+        If pattern is true, the keys are wildcard patterns. "db_*" matches all keys starts with "db_",
+        and "*" matches all keys. (the other patterns like "db_?_host" are also supported,
+        with the rules of fnmatch, but they are slower)
+        If pattern is false, the keys are matched exactly, "a[1]" only matches the key "a[1]".
         :param name: the name of this handler. if same name is already exists, overwrite it.
         :param keys: the keys of the config.
         :param handler: the handler function.  arguments(the_updated_key, old_value, new_value, *args, **kwargs)
         :param args: arguments to the handler.
         :param kwargs: keyword arguments to the handler.
+        :param loop: if the loop is specified, the handler is called on the loop with call_soon_threadsafe.
+                     (if the handler is a coroutine function, it is scheduled as a task on the loop)
+        :param pattern: the keys are wildcard patterns or not.
         :return: None
         """
-        self._handlers[name] = [keys, handler, args, kwargs]
-        if isinstance(keys, str):
-            try:
-                self._handled_keys[keys].append(name)
-            except KeyError:
-                self._handled_keys[keys] = [name, ]
-        else:
-            for key in keys:
-                try:
-                    self._handled_keys[key].append(name)
-                except KeyError:
-                    self._handled_keys[key] = [name]
+        with self._lock:
+            self.remove_handler(name)
+            self._handlers[name] = [keys, handler, args, kwargs, loop, pattern]
+            for key in ([keys] if isinstance(keys, str) else keys):
+                pattern_type = MocaConfig._get_pattern_type(key, pattern)
+                if pattern_type == 0:
+                    self._handled_keys.setdefault(key, []).append(name)
+                elif pattern_type == 1:
+                    self._handled_prefixes.add(key[:-1], name)
+                else:
+                    self._handled_patterns.setdefault(key, []).append(name)
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1117,15 +2994,24 @@ class MocaConfig(object):
     def remove_handler(self,
                        name: str) -> None:
         """Remove the registered handler"""
-        try:
-            del self._handlers[name]
-            for key in self._handled_keys:
+        with self._lock:
+            try:
+                handler_info = self._handlers.pop(name)
+            except KeyError:
+                return
+            keys, pattern = handler_info[0], handler_info[5]
+            for key in ([keys] if isinstance(keys, str) else keys):
+                pattern_type = MocaConfig._get_pattern_type(key, pattern)
+                if pattern_type == 1:
+                    self._handled_prefixes.remove(key[:-1], name)
+                    continue
+                index = self._handled_keys if pattern_type == 0 else self._handled_patterns
                 try:
-                    self._handled_keys[key].remove(name)
-                except ValueError:
+                    index[key].remove(name)
+                    if not index[key]:
+                        del index[key]
+                except (KeyError, ValueError):
                     pass
-        except KeyError:
-            pass
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1141,27 +3027,120 @@ class MocaConfig(object):
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    def _get_handler_names(self,
+                           key: str) -> List[str]:
+        """Return the names of the handlers subscribed to the key."""
+        names = self._handled_keys.get(key, [])
+        if len(self._handled_prefixes):
+            names = names + self._handled_prefixes.match(key)
+        if self._handled_patterns:
+            names = names + [name for pattern, items in self._handled_patterns.items()
+                             if fnmatchcase(key, pattern) for name in items]
+        return names
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _diff(self,
+              old_cache: dict,
+              new_cache: dict) -> List[Tuple[str, Any, Any]]:
+        """
+        Return the changes between two caches, [(key, old_value, new_value)].
+        If the key was added, the old value is None. If the key was removed, the new value is None.
+        If there are only a few normal handled keys, only these keys are compared,
+        otherwise all keys are compared.
+        """
+        if old_cache is new_cache:
+            return []
+        missing = MocaConfig._MISSING
+        old_get = old_cache.get
+        new_get = new_cache.get
+        if (not len(self._handled_prefixes)) and (not self._handled_patterns) and \
+                (len(self._handled_keys) < len(new_cache)):
+            keys = [key for key in self._handled_keys if old_get(key, missing) != new_get(key, missing)]
+        else:
+            keys = [key for key, value in new_cache.items() if old_get(key, missing) != value]
+            keys.extend(old_cache.keys() - new_cache.keys())
+        changes = []
+        for key in keys:
+            old_value = old_get(key, missing)
+            new_value = new_get(key, missing)
+            changes.append((key,
+                            None if old_value is missing else old_value,
+                            None if new_value is missing else new_value))
+        return changes
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _run_handlers(self,
+                      changes: List[Tuple[str, Any, Any]]) -> None:
+        """Run the handlers subscribed to the changed keys."""
+        if not self._handlers:
+            return
+        pool = self._handler_pool
+        for key, old_value, new_value in changes:
+            # a handler subscribed with some patterns runs only once.
+            for name in dict.fromkeys(self._get_handler_names(key)):
+                try:
+                    handler = self._handlers[name]
+                except KeyError:  # removed by other handler.
+                    continue
+                if handler[4] is not None:
+                    self._call_in_loop(handler[4], handler[1], (key, old_value, new_value, *handler[2]), handler[3])
+                    continue
+                if pool is not None:
+                    pool.submit(key, name, handler[1], (old_value, new_value, *handler[2]), handler[3])
+                    continue
+                try:
+                    handler[1](key, old_value, new_value, *handler[2], **handler[3])
+                except SystemExit:
+                    raise
+                except Exception:
+                    if self._debug_mode:
+                        print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _call_in_loop(self,
+                      loop: AbstractEventLoop,
+                      handler: Callable,
+                      args: tuple,
+                      kwargs: dict) -> None:
+        """Call the handler on the event loop from any thread."""
+        if iscoroutinefunction(handler):
+            callback = partial(loop.create_task, handler(*args, **kwargs))
+        else:
+            callback = partial(handler, *args, **kwargs)
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:  # the loop is closed.
+            if self._debug_mode:
+                print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_handler_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the stats of every handler run in the thread pool. (only available if handler_workers is positive)
+        :return: {name: {'calls', 'failures', 'timeouts', 'total_time', 'max_time', 'average_time'}}
+        """
+        if self._handler_pool is None:
+            return {}
+        else:
+            return self._handler_pool.get_stats()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     def _run_handler_total(self,
                            old_cache: dict,
                            new_cache: dict) -> None:
         """Run the handlers if needed."""
-        for key in self._handled_keys:
-            try:
-                if old_cache[key] != new_cache[key]:
-                    for name in self._handled_keys[key]:
-                        try:
-                            self._handlers[name][1](key,
-                                                    old_cache[key],
-                                                    new_cache[key],
-                                                    *self._handlers[name][2],
-                                                    **self._handlers[name][3])
-                        except SystemExit:
-                            raise
-                        except Exception:
-                            if self._debug_mode:
-                                print_exc()
-            except KeyError:
-                pass
+        if self._handlers:
+            self._run_handlers(self._diff(old_cache, new_cache))
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1171,21 +3150,7 @@ class MocaConfig(object):
                          old_value: Any,
                          new_value: Any) -> None:
         """Run the handlers if needed."""
-        try:
-            for name in self._handled_keys[key]:
-                try:
-                    self._handlers[name][1](key,
-                                            old_value,
-                                            new_value,
-                                            *self._handlers[name][2],
-                                            **self._handlers[name][3])
-                except SystemExit:
-                    raise
-                except Exception:
-                    if self._debug_mode:
-                        print_exc()
-        except KeyError:
-            pass
+        self._run_handlers([(key, old_value, new_value)])
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
@@ -1197,45 +3162,230 @@ class MocaConfig(object):
             del MocaConfig._instance_list[self._name]
         except KeyError:
             pass
+        with MocaConfig._registry_lock:
+            if self._name in MocaConfig._lazy_access:  # a lazy instance, move the index entry.
+                MocaConfig._lazy_instances[name] = MocaConfig._lazy_instances.pop(self._name)
+                MocaConfig._lazy_access[name] = MocaConfig._lazy_access.pop(self._name)
         self._name = name
         MocaConfig._instance_list[name] = self
 
     # ----------------------------------------------------------------------------
     # ----------------------------------------------------------------------------
 
+    @staticmethod
+    def _read_config_file(path: Path,
+                          file_password: Optional[str] = None,
+                          json_codec: Optional[MocaJsonCodec] = None) -> Tuple[str, Any, Any, Any, float]:
+        """
+        Read and parse a config file. (run in the worker threads or processes of load_config_files)
+        :param path: the config file path.
+        :param file_password: the password of the encrypted config file.
+        :param json_codec: the json codec to parse the file, None means the default codec.
+        :return: ('loaded', data, fingerprint, content hash, seconds) or ('skipped' or 'failed', reason, None, None, seconds)
+        """
+        start = perf_counter()
+        try:
+            with open(str(path), mode='rb') as config_file:
+                file_stat = fstat(config_file.fileno())
+                data = config_file.read()
+            fingerprint = (file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+            content_hash = blake2b(data, digest_size=16).digest()
+            if file_password is not None:
+                data, salt = MocaConfig._decrypt_file_data(data, file_password)
+                if salt is None:  # a plain json file, the instance loads and encrypts it again.
+                    fingerprint = content_hash = None
+            value = MocaConfig._decode_without_gc((json_codec or MocaConfig._default_json_codec).loads, data)
+            if not isinstance(value, dict):
+                return 'skipped', 'not a json object', None, None, perf_counter() - start
+            return 'loaded', value, fingerprint, content_hash, perf_counter() - start
+        except JSONDecodeError as e:
+            return 'failed', f'decode error: {e}', None, None, perf_counter() - start
+        except ValueError as e:
+            return 'failed', f'decode error: {e}' if file_password is None else f'decrypt error: {e}', \
+                None, None, perf_counter() - start
+        except Exception as e:
+            return 'failed', f'{type(e).__name__}: {e}', None, None, perf_counter() - start
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _scan_config_file(path: Path,
+                          file_password: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Find the instance name in the config file without parsing it. (used by load_config_files(lazy=True))
+        :param path: the config file path.
+        :param file_password: the password of the encrypted config file, the encrypted file is decrypted to find the name.
+        :return: (the file looks like a json object or not, the instance name or None)
+
+        Raise
+        -----
+            OSError: if can't read the config file.
+            ValueError: if can't decrypt the encrypted config file.
+        """
+        with open(str(path), mode='rb') as config_file:
+            if fstat(config_file.fileno()).st_size == 0:
+                return False, None
+            with mmap(config_file.fileno(), 0, access=ACCESS_READ) as mapped:
+                data = mapped
+                if (file_password is not None) and \
+                        (mapped[:len(MocaConfig._ENCRYPTED_FILE_MAGIC)] == MocaConfig._ENCRYPTED_FILE_MAGIC):
+                    data = MocaConfig._decrypt_file_data(mapped[:], file_password)[0]
+                if data[:64].lstrip(b' \t\r\n\xef\xbb\xbf')[:1] != b'{':
+                    return False, None
+                match = MocaConfig._find_top_level_match(MocaConfig._INSTANCE_NAME_PATTERN, data)
+                if match is None:
+                    return True, None
+                try:
+                    name = json_loads(match.group(1))
+                except ValueError:
+                    return True, None
+                return True, name
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _find_top_level_match(pattern: Any,
+                              data: Any) -> Optional[Any]:
+        """
+        Return the first match of the pattern that starts with a key of the top-level json object.
+        The matches in the nested objects or in the string values are skipped.
+        The strings and brackets before the match are tokenized by a regex, the file is never parsed.
+        :param pattern: the compiled pattern, starts with a json string.
+        :param data: the json data.
+        :return: the match or None.
+        """
+        tokens = MocaConfig._JSON_TOKEN_PATTERN.finditer(data)
+        token = next(tokens, None)
+        depth = 0
+        for match in pattern.finditer(data):
+            while (token is not None) and (token.start() < match.start()):
+                first = token.group()[:1]
+                if first in (b'{', b'['):
+                    depth += 1
+                elif first in (b'}', b']'):
+                    depth -= 1
+                token = next(tokens, None)
+            if token is None:
+                return None
+            if (token.start() == match.start()) and (depth == 1):
+                return match
+        return None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
     @classmethod
     def load_config_files(cls,
-                          config_dir: Union[Path, str]) -> int:
+                          config_dir: Union[Path, str],
+                          pattern: str = '*',
+                          executor: str = 'thread',
+                          max_workers: Optional[int] = None,
+                          lazy: bool = False,
+                          idle_timeout: Optional[float] = None,
+                          **kwargs) -> MocaConfigLoadReport:
         """
         Load all config files in the config directory.
+        Every file is read and parsed once in a thread pool or a process pool,
+        and the parsed data is handed to the new instance, the instance doesn't parse the file again.
+        The instance name is the "__config_instance_name__" in the file, or a random name.
         :param config_dir: the path to the config directory.
-        :return: the number of loaded config files. If config_dir is not a directory, return -1.
+        :param pattern: the glob pattern of the config files, relative to the config directory. (ex: '*.json', '**/*.json')
+                        the binary sidecar caches and the temporary files of the atomic writes are never loaded.
+        :param executor: 'thread' or 'process'. a process pool parses the files in parallel even if the json codec
+                         holds the GIL, but the parsed data is copied back to this process.
+        :param max_workers: the max number of the workers, None means the default of the executor.
+        :param lazy: if true, the files are only indexed by the instance names (found without parsing the files),
+                     and the instance is created, parsed and watched at the first get_instance(name).
+        :param idle_timeout: the lazy instances not accessed by get_instance() in this seconds are released,
+                             and created again by the next get_instance(). None means never.
+                             the released instances stop watching, so keep calling get_instance() instead of
+                             holding the instance, and don't use it for the instances that need handlers.
+                             (the instances that have handlers are never released)
+        :param kwargs: the other arguments of the instances. (ex: reload_interval, binary_cache)
+        :return: the report of the loaded, skipped and failed files.
+                 If config_dir is not a directory, the directory is reported as a failed file.
+
+        Raise
+        -----
+            ValueError: if the executor or the json codec is unknown.
+            ImportError: if the library of the json codec is not installed.
         """
-        count = 0
+        if executor not in ('thread', 'process'):
+            raise ValueError(f'Unknown executor: {executor}')
+        json_codec = kwargs.get('json_codec')
+        if isinstance(json_codec, str):
+            json_codec = get_json_codec(json_codec)
+        start = perf_counter()
+        loaded: List[MocaConfigLoadResult] = []
+        skipped: List[MocaConfigLoadResult] = []
+        failed: List[MocaConfigLoadResult] = []
         # set target directory
         target: Path
         if isinstance(config_dir, str):
             target = Path(config_dir)
         else:
             target = config_dir
-        if target.is_dir():  # check target directory
-            config_file_list = [item for item in list(target.iterdir()) if item.is_file()]
-        else:
-            return -1
-        for config_file in config_file_list:
-            try:
-                with open(str(config_file), mode='r', encoding='utf-8') as config:
+        if not target.is_dir():  # check target directory
+            failed.append(MocaConfigLoadResult(target, '', 'not a directory', 0.0))
+            return MocaConfigLoadReport(loaded, skipped, failed, perf_counter() - start)
+        config_file_list = sorted(item for item in target.glob(pattern)
+                                  if item.is_file() and not MocaConfig._is_internal_file(item))
+        if lazy:
+            for config_file in config_file_list:
+                scan_start = perf_counter()
+                try:
+                    is_object, name = MocaConfig._scan_config_file(config_file, kwargs.get('file_password'))
+                except Exception as e:
+                    failed.append(MocaConfigLoadResult(config_file, '', f'{type(e).__name__}: {e}',
+                                                       perf_counter() - scan_start))
+                    continue
+                if not is_object:
+                    skipped.append(MocaConfigLoadResult(config_file, '', 'not a json object',
+                                                        perf_counter() - scan_start))
+                    continue
+                if not isinstance(name, str):
+                    name = uuid4().hex
+                with cls._registry_lock:
+                    cls._lazy_instances[name] = [config_file, kwargs, idle_timeout, None]
+                loaded.append(MocaConfigLoadResult(config_file, name, '', perf_counter() - scan_start))
+        elif config_file_list:
+            pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+            with pool_class(max_workers=max_workers) as pool:
+                for config_file, (status, value, fingerprint, content_hash, seconds) in \
+                        zip(config_file_list, pool.map(partial(MocaConfig._read_config_file,
+                                                               file_password=kwargs.get('file_password'),
+                                                               json_codec=json_codec),
+                                                       config_file_list)):
+                    if status == 'skipped':
+                        skipped.append(MocaConfigLoadResult(config_file, '', value, seconds))
+                        continue
+                    elif status == 'failed':
+                        failed.append(MocaConfigLoadResult(config_file, '', value, seconds))
+                        continue
+                    create_start = perf_counter()
                     try:
-                        value = load(config)
-                        if isinstance(value, dict):
-                            cls(value.get('__config_instance_name__', uuid4().hex), config_file)
-                            count += 1
-                        else:
-                            pass
-                    except JSONDecodeError:
-                        pass
-            except (FileNotFoundError, PermissionError, OSError, Exception):
-                pass
-        return count
+                        name = value.get('__config_instance_name__', uuid4().hex)
+                        if not isinstance(name, str):
+                            name = uuid4().hex
+                        instance = cls(name, config_file, _preloaded=(value, fingerprint, content_hash), **kwargs)
+                        seconds += perf_counter() - create_start
+                        loaded.append(MocaConfigLoadResult(config_file, name,
+                                                           '' if instance.status == MocaConfig.CORRECT
+                                                           else f'status {instance.status}', seconds))
+                    except Exception as e:
+                        failed.append(MocaConfigLoadResult(config_file, '', f'{type(e).__name__}: {e}',
+                                                           seconds + perf_counter() - create_start))
+        return MocaConfigLoadReport(loaded, skipped, failed, perf_counter() - start)
+
+# write the pending changes of write-behind mode at exit.
+atexit_register(MocaConfig._flush_all)
+
+# keep watching in the forked child processes.
+if register_at_fork is not None:
+    register_at_fork(before=MocaConfig._before_fork,
+                     after_in_parent=MocaConfig._after_fork_in_parent,
+                     after_in_child=MocaConfig._after_fork_in_child)
 
 # -------------------------------------------------------------------------- MocaConfig --
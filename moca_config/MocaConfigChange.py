@@ -0,0 +1,45 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigChange --------------------------------------------------------------------------
+
+
+class MocaConfigChange(NamedTuple):
+    """
+    A change of the config, yielded by MocaConfig.watch().
+    If the key was added, the old value is None. If the key was removed, the new value is None.
+    """
+    key: str
+    old_value: Any
+    new_value: Any
+
+# -------------------------------------------------------------------------- MocaConfigChange --
@@ -0,0 +1,193 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from threading import Thread, Lock
+import os
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigForkNotifier --------------------------------------------------------------------------
+
+
+class MocaConfigForkNotifier(object):
+    """
+    Notify the forked child processes when the config was changed in the parent process.
+    A pipe is created for every fork, the parent writes a byte to the pipes every time a config was changed,
+    and a thread of the child reloads the configs when the pipe is readable, so the children don't watch the files.
+    The notifications are coalesced, if the pipe is full, the child will reload anyway.
+    When the parent exits (or stops notifying), the child gets EOF, and starts watching the files by itself.
+
+    Attributes
+    ----------
+    _lock: Lock
+        the lock to protect the pipes.
+
+    _pipes: List[int]
+        the write ends of the pipes to the children.
+
+    _pending: Optional[Tuple[int, int]]
+        the pipe created for the current fork.
+
+    _reader: Optional[int]
+        the read end of the pipe from the parent, only in the child.
+
+    _thread: Optional[Thread]
+        the reader thread, only in the child.
+    """
+
+    def __init__(self):
+        """The initializer of MocaConfigForkNotifier class."""
+        self._lock: Lock = Lock()
+        self._pipes: List[int] = []
+        self._pending: Optional[Tuple[int, int]] = None
+        self._reader: Optional[int] = None
+        self._thread: Optional[Thread] = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_child_count(self) -> int:
+        """Return the number of the children notified by this process. (the exited children may be counted)"""
+        return len(self._pipes)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def before_fork(self) -> None:
+        """Create the pipe for the child, called in the parent before fork."""
+        try:
+            self._pending = os.pipe()
+        except OSError:
+            self._pending = None  # the child will watch the files by itself.
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def after_fork_in_parent(self) -> None:
+        """Keep the write end of the pipe, called in the parent after fork."""
+        if self._pending is None:
+            return
+        reader, writer = self._pending
+        self._pending = None
+        os.close(reader)
+        os.set_blocking(writer, False)
+        with self._lock:
+            self._pipes.append(writer)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def after_fork_in_child(self) -> bool:
+        """
+        Keep the read end of the pipe, and close the pipes inherited from the parent, called in the child after fork.
+        :return: the child is notified by the parent or not.
+        """
+        self._lock = Lock()
+        for fd in self._pipes:  # the pipes to the siblings.
+            os.close(fd)
+        self._pipes = []
+        if self._reader is not None:  # the pipe from the grandparent.
+            os.close(self._reader)
+            self._reader = None
+        self._thread = None
+        if self._pending is None:
+            return False
+        reader, writer = self._pending
+        self._pending = None
+        os.close(writer)
+        self._reader = reader
+        return True
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def start(self,
+              on_notify: Callable[[], Any],
+              on_parent_exit: Callable[[], Any]) -> None:
+        """
+        Start the reader thread in the child.
+        :param on_notify: the function called when the parent notified.
+        :param on_parent_exit: the function called when the parent exited or stopped notifying.
+        :return: None
+        """
+        if (self._reader is not None) and (self._thread is None):
+            self._thread = Thread(target=self._read_loop, args=(self._reader, on_notify, on_parent_exit),
+                                  name='moca_config_fork_notifier', daemon=True)
+            self._thread.start()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def notify(self) -> None:
+        """Notify all children, never blocks."""
+        with self._lock:
+            for fd in tuple(self._pipes):
+                try:
+                    os.write(fd, b'\0')
+                except BlockingIOError:
+                    pass  # the child has not read the last notifications yet.
+                except OSError:  # the child exited.
+                    os.close(fd)
+                    self._pipes.remove(fd)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Stop notifying the children, they will watch the files by themselves."""
+        with self._lock:
+            for fd in self._pipes:
+                os.close(fd)
+            self._pipes = []
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _read_loop(self,
+                   fd: int,
+                   on_notify: Callable[[], Any],
+                   on_parent_exit: Callable[[], Any]) -> None:
+        """the reader loop of the child."""
+        while True:
+            try:
+                data = os.read(fd, 4096)
+            except OSError:
+                data = b''
+            try:
+                if data:
+                    on_notify()
+                else:
+                    if self._reader == fd:
+                        os.close(fd)
+                        self._reader = None
+                    on_parent_exit()
+                    return
+            except Exception:
+                pass  # the callbacks report the errors by themselves.
+
+# -------------------------------------------------------------------------- MocaConfigForkNotifier --
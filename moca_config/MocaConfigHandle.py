@@ -0,0 +1,136 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigHandle --------------------------------------------------------------------------
+
+
+class MocaConfigHandle(object):
+    """
+    A precompiled handle of one config value, created by MocaConfig.handle().
+    The access check and the type conversion run only when the config was changed (reloaded, set, or removed),
+    and the converted value is cached until the next change.
+
+    Attributes
+    ----------
+    _config: MocaConfig
+        the config instance.
+
+    _key: str
+        the config name.
+
+    _res_type: Any
+        the response type.
+
+    _default: Any
+        the default value.
+
+    _auto_convert: bool
+        try convert the value, if the type is incorrect.
+
+    _access_token: str
+        the access token of config file.
+
+    _root_pass: str
+        the root password.
+
+    _generation: int
+        the generation of the config when the value was cached. -1 means never cached.
+
+    _value: Any
+        the cached value.
+    """
+
+    __slots__ = ('_config', '_key', '_res_type', '_default', '_auto_convert',
+                 '_access_token', '_root_pass', '_generation', '_value')
+
+    def __init__(self,
+                 config: Any,
+                 key: str,
+                 res_type: Any = any,
+                 default: Any = None,
+                 auto_convert: bool = True,
+                 access_token: str = '',
+                 root_pass: str = ''):
+        """
+        The initializer of MocaConfigHandle class.
+        :param config: the config instance.
+        :param key: the config name.
+        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
+        :param default: if can't found the config value, return default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        """
+        self._config = config
+        self._key: str = key
+        self._res_type: Any = res_type
+        self._default: Any = default
+        self._auto_convert: bool = auto_convert
+        self._access_token: str = access_token
+        self._root_pass: str = root_pass
+        self._generation: int = -1
+        self._value: Any = default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def key(self) -> str:
+        """Return the self._key"""
+        return self._key
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def value(self) -> Any:
+        """Return the config value, same as config.get(key, res_type, default, auto_convert)"""
+        if self._generation != self._config._generation:
+            self.refresh()
+        return self._value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def refresh(self) -> None:
+        """Convert the config value again, and cache it."""
+        generation = self._config._generation  # read first, so a concurrent change is never missed.
+        self._value = self._config.get(self._key,
+                                       self._res_type,
+                                       self._default,
+                                       self._auto_convert,
+                                       save_unknown_config=False,
+                                       access_token=self._access_token,
+                                       root_pass=self._root_pass)
+        self._generation = generation
+
+# -------------------------------------------------------------------------- MocaConfigHandle --
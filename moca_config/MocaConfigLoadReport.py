@@ -0,0 +1,65 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from pathlib import Path
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigLoadReport --------------------------------------------------------------------------
+
+
+class MocaConfigLoadResult(NamedTuple):
+    """
+    The result of a config file loaded by MocaConfig.load_config_files().
+    The name is the instance name (only if loaded), the reason is the reason of skipped or failed files.
+    (if the status of a loaded instance is not correct, the reason is the status. ex: the file is read-only)
+    The seconds is the time to read, parse and create the instance.
+    """
+    path: Path
+    name: str
+    reason: str
+    seconds: float
+
+
+class MocaConfigLoadReport(NamedTuple):
+    """
+    The report of MocaConfig.load_config_files().
+    The skipped files are not json objects, the failed files can't be read or parsed.
+    The seconds is the wall time of the whole loading.
+    """
+    loaded: List[MocaConfigLoadResult]
+    skipped: List[MocaConfigLoadResult]
+    failed: List[MocaConfigLoadResult]
+    seconds: float
+
+    @property
+    def count(self) -> int:
+        """Return the number of the loaded config files."""
+        return len(self.loaded)
+
+# -------------------------------------------------------------------------- MocaConfigLoadReport --
@@ -0,0 +1,206 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from struct import Struct
+from marshal import dumps as marshal_dumps
+from multiprocessing.shared_memory import SharedMemory
+from traceback import print_exc
+from os import getpid
+from .MocaReadOnlyDict import MocaReadOnlyDict
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigPublisher --------------------------------------------------------------------------
+
+
+class MocaConfigPublisher(object):
+    """
+    Publish the snapshots of a MocaConfig to the shared memory, for the MocaConfigSubscriber in the other processes.
+    Only the publisher process reads and watches the config file,
+    the subscribers map the shared memory and decode the snapshot only when the version was changed.
+
+    The control segment (the name) contains the header protected by a seqlock,
+    (sequence, version, length of the data, index of the data segment) all unsigned 64-bit integers.
+    The sequence is odd while the publisher is writing, and is increased by 2 every time a snapshot was published.
+    The data segment (name + "_" + index) contains the marshal data of the snapshot,
+    if the snapshot doesn't fit, a new larger data segment is created, and the old one is unlinked.
+
+    Attributes
+    ----------
+    _config: MocaConfig
+        the published config.
+
+    _name: str
+        the name of the control segment.
+
+    _debug_mode: bool
+        debug mode
+
+    _control: SharedMemory
+        the control segment.
+
+    _data: Optional[SharedMemory]
+        the current data segment.
+
+    _data_index: int
+        the index of the current data segment.
+
+    _seq: int
+        the current sequence.
+
+    _header: Tuple[int, int, int]
+        the (version, length, data index) of the latest published snapshot.
+
+    _pid: int
+        the id of the process that owns the shared memory, the forked children don't publish.
+    """
+
+    # the header of the control segment, (sequence, version, length, data index)
+    HEADER: Struct = Struct('=QQQQ')
+
+    # the sequence of the header.
+    SEQ: Struct = Struct('=Q')
+
+    # the min size of the data segment.
+    MIN_DATA_SIZE: int = 64 * 1024
+
+    def __init__(self,
+                 config: Any,
+                 name: str,
+                 access_token: str = '',
+                 root_pass: str = '',
+                 debug_mode: bool = False):
+        """
+        The initializer of MocaConfigPublisher class.
+        The current snapshot is published immediately.
+        :param config: the MocaConfig instance.
+        :param name: the name of the shared memory.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+                          if the access token and the root password are incorrect, only the public configs are published.
+        :param debug_mode: turn on debug mode.
+
+        Raise
+        -----
+            FileExistsError: if the shared memory already exists.
+            PermissionError: if can't access to the config file.
+        """
+        self._config: Any = config
+        self._name: str = name
+        self._debug_mode: bool = debug_mode
+        self._control: SharedMemory = SharedMemory(name=name, create=True, size=MocaConfigPublisher.HEADER.size)
+        self._data: Optional[SharedMemory] = None
+        self._data_index: int = 0
+        self._seq: int = 0
+        self._header: Tuple[int, int, int] = (0, 0, 0)
+        self._pid: int = getpid()
+        if config.add_snapshot_listener(self._publish, access_token, root_pass) is None:
+            self.close()
+            raise PermissionError(f"Can't access to the config: {config.name}")
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        """Return the self._name"""
+        return self._name
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Return the version of the latest published snapshot."""
+        return self._header[0]
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _get_data_segment(self,
+                          size: int) -> SharedMemory:
+        """Return a data segment larger than the size, create a new one if the current one is too small."""
+        if (self._data is not None) and (self._data.size >= size):
+            return self._data
+        old_data = self._data
+        self._data = SharedMemory(name=f'{self._name}_{self._data_index + 1}', create=True,
+                                  size=max(size * 2, MocaConfigPublisher.MIN_DATA_SIZE))
+        self._data_index += 1
+        if old_data is not None:
+            # the subscribers mapping the old segment can still read it, and they will find the new index.
+            old_data.close()
+            old_data.unlink()
+        return self._data
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _publish(self,
+                 version: int,
+                 data: Mapping) -> None:
+        """Write the snapshot to the shared memory, called by the config with the writer lock held."""
+        if getpid() != self._pid:  # a forked child, only the owner writes the shared memory.
+            return
+        try:
+            payload = marshal_dumps(data._data if isinstance(data, MocaReadOnlyDict) else dict(data))
+            header = self._control.buf
+            seq = self._seq + 1
+            MocaConfigPublisher.SEQ.pack_into(header, 0, seq)  # odd, the readers retry.
+            try:
+                self._get_data_segment(len(payload)).buf[:len(payload)] = payload
+                self._header = (version, len(payload), self._data_index)
+            finally:
+                # always end the write, the header still points to the old data if the write failed.
+                MocaConfigPublisher.HEADER.pack_into(header, 0, seq, *self._header)
+                MocaConfigPublisher.SEQ.pack_into(header, 0, seq + 1)
+                self._seq = seq + 1
+        except Exception:
+            if self._debug_mode:
+                print_exc()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        Stop publishing, and unlink the shared memory. the subscribers can still read the last snapshot.
+        In a forked child, the shared memory is only unmapped.
+        """
+        self._config.remove_snapshot_listener(self._publish)
+        for segment in (self._data, self._control):
+            if segment is not None:
+                segment.close()
+                if getpid() != self._pid:
+                    continue
+                try:
+                    segment.unlink()
+                except FileNotFoundError:
+                    pass
+        self._data = None
+
+# -------------------------------------------------------------------------- MocaConfigPublisher --
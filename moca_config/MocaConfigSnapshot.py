@@ -0,0 +1,145 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from collections.abc import Mapping
+from types import MappingProxyType
+from .MocaReadOnlyDict import MocaReadOnlyDict, read_only
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigSnapshot --------------------------------------------------------------------------
+
+
+class MocaConfigSnapshot(Mapping):
+    """
+    A immutable snapshot of the config, published by MocaConfig every time the config was reloaded or changed.
+    The dictionary in the snapshot is never changed after it was published,
+    so the readers can read many keys from one snapshot without any lock, and always get a consistent view.
+    The nested dictionaries and lists are returned as read-only views, they are shared with the config cache.
+
+    Attributes
+    ----------
+    _version: int
+        the version of the snapshot, increased monotonically.
+
+    _data: MappingProxyType
+        the read-only config data, the nested values are not read-only. (only for the internal use)
+
+    _view: MocaReadOnlyDict
+        the deep read-only view of the config data.
+
+    _keys: Optional[tuple]
+        the keys of the config data, created when it was requested first time.
+
+    _public: Optional[MocaConfigSnapshot]
+        the snapshot without the private configs, created when it was requested first time.
+    """
+
+    __slots__ = ('_version', '_data', '_view', '_keys', '_public')
+
+    def __init__(self,
+                 version: int,
+                 data: dict):
+        """
+        The initializer of MocaConfigSnapshot class.
+        :param version: the version of the snapshot.
+        :param data: the config data, must not be changed after this.
+        """
+        self._version: int = version
+        self._data: MappingProxyType = MappingProxyType(data)
+        self._view: MocaReadOnlyDict = MocaReadOnlyDict(data)
+        self._keys: Optional[tuple] = None
+        self._public: Optional[MocaConfigSnapshot] = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Return the self._version"""
+        return self._version
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def data(self) -> MocaReadOnlyDict:
+        """Return the deep read-only view of the config data."""
+        return self._view
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def __getitem__(self,
+                    key: str) -> Any:
+        return read_only(self._data[key])
+
+    def __contains__(self,
+                     key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f'<MocaConfigSnapshot version={self._version} size={len(self._data)}>'
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get(self,
+            key: str,
+            default: Any = None) -> Any:
+        """Return the config value, if can't found the config value, return default value."""
+        return self._view.get(key, default)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_keys(self) -> tuple:
+        """Return all keys as a tuple."""
+        if self._keys is None:
+            self._keys = tuple(self._data)
+        return self._keys
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def public(self) -> 'MocaConfigSnapshot':
+        """Return the snapshot without the private configs (the key starts with "_"), with the same version."""
+        if self._public is None:
+            self._public = MocaConfigSnapshot(self._version,
+                                              {key: value for key, value in self._data.items()
+                                               if not key.startswith('_')})
+        return self._public
+
+# -------------------------------------------------------------------------- MocaConfigSnapshot --
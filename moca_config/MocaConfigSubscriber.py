@@ -0,0 +1,283 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from marshal import loads as marshal_loads
+from multiprocessing.shared_memory import SharedMemory
+from mmap import mmap, ACCESS_READ
+from os import O_RDONLY, fstat, close
+try:
+    from os import register_at_fork
+except ImportError:  # windows
+    register_at_fork = None
+from threading import Lock
+from weakref import WeakSet
+from time import monotonic, sleep
+from .MocaConfig import MocaConfig
+from .MocaConfigSnapshot import MocaConfigSnapshot
+from .MocaConfigPublisher import MocaConfigPublisher
+try:
+    from _posixshmem import shm_open
+except ImportError:  # windows
+    shm_open = None
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigSubscriber --------------------------------------------------------------------------
+
+
+class MocaConfigSubscriber(object):
+    """
+    Read the snapshots published by a MocaConfigPublisher in an other process.
+    The subscriber doesn't read the config file and doesn't run any thread,
+    every read checks the sequence in the shared memory, and the snapshot is decoded only when it was changed.
+
+    Attributes
+    ----------
+    _name: str
+        the name of the control segment.
+
+    _timeout: float
+        the max time to wait for the publisher to finish a write.
+
+    _control: Tuple[Any, memoryview]
+        the mapping and the buffer of the control segment.
+
+    _data: Optional[Tuple[Any, memoryview]]
+        the mapping and the buffer of the data segment.
+
+    _data_index: int
+        the index of the mapped data segment.
+
+    _seq: int
+        the sequence of the decoded snapshot.
+
+    _snapshot: MocaConfigSnapshot
+        the decoded snapshot.
+
+    _lock: Lock
+        the lock to decode a new snapshot only once.
+    """
+
+    # all instances, the locks are reset in the child process after fork.
+    _live_instances: WeakSet = WeakSet()
+
+    def __init__(self,
+                 name: str,
+                 timeout: float = 1.0):
+        """
+        The initializer of MocaConfigSubscriber class.
+        :param name: the name of the shared memory.
+        :param timeout: the max time to wait for the publisher to finish a write (seconds).
+                        if the publisher died while writing, the last snapshot is used after this.
+
+        Raise
+        -----
+            FileNotFoundError: if the shared memory doesn't exist.
+        """
+        self._name: str = name
+        self._timeout: float = timeout
+        self._control: Tuple[Any, memoryview] = MocaConfigSubscriber._attach(name)
+        self._data: Optional[Tuple[Any, memoryview]] = None
+        self._data_index: int = 0
+        self._seq: int = 0
+        self._snapshot: MocaConfigSnapshot = MocaConfigSnapshot(0, {})
+        self._lock: Lock = Lock()
+        MocaConfigSubscriber._live_instances.add(self)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """Reset the locks, they may be held by a thread of the parent. (called in the child after fork)"""
+        for instance in list(cls._live_instances):
+            instance._lock = Lock()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _attach(name: str) -> Tuple[Any, memoryview]:
+        """
+        Map the shared memory created by the publisher as read-only.
+        On posix, SharedMemory registers the attached memory to the resource tracker, and it is unlinked
+        when this process exits, (before python 3.13) so the memory is mapped without SharedMemory.
+        :param name: the name of the shared memory.
+        :return: the mapping and the buffer.
+        """
+        if shm_open is None:
+            segment = SharedMemory(name=name)
+            return segment, segment.buf
+        fd = shm_open('/' + name, O_RDONLY)
+        try:
+            mapping = mmap(fd, fstat(fd).st_size, access=ACCESS_READ)
+        finally:
+            close(fd)
+        return mapping, memoryview(mapping)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _detach(segment: Tuple[Any, memoryview]) -> None:
+        """Unmap the shared memory."""
+        mapping, buffer = segment
+        if not isinstance(mapping, SharedMemory):
+            buffer.release()
+        mapping.close()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        """Return the self._name"""
+        return self._name
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Return the version of the latest snapshot."""
+        return self._load().version
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _load(self) -> MocaConfigSnapshot:
+        """Return the latest snapshot, decode it only if the sequence was changed."""
+        if MocaConfigPublisher.SEQ.unpack_from(self._control[1], 0)[0] == self._seq:
+            return self._snapshot
+        with self._lock:
+            header = self._control[1]
+            deadline = monotonic() + self._timeout
+            while True:
+                seq, version, length, data_index = MocaConfigPublisher.HEADER.unpack_from(header, 0)
+                if seq == self._seq:  # decoded by an other thread.
+                    return self._snapshot
+                if (seq % 2 == 0) and (data_index > 0):
+                    try:
+                        if data_index != self._data_index:
+                            data = MocaConfigSubscriber._attach(f'{self._name}_{data_index}')
+                            if self._data is not None:
+                                MocaConfigSubscriber._detach(self._data)
+                            self._data, self._data_index = data, data_index
+                        payload = bytes(self._data[1][:length])
+                    except (FileNotFoundError, ValueError):
+                        payload = None  # the data segment was replaced while reading.
+                    if (payload is not None) and (MocaConfigPublisher.SEQ.unpack_from(header, 0)[0] == seq):
+                        self._snapshot = MocaConfigSnapshot(version,
+                                                            MocaConfig._decode_without_gc(marshal_loads, payload))
+                        self._seq = seq
+                        return self._snapshot
+                if monotonic() > deadline:
+                    return self._snapshot
+                sleep(0)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _has_privilege(self,
+                       snapshot: MocaConfigSnapshot,
+                       root_pass: str,
+                       access_token: str) -> bool:
+        """Check is the root password of this process or the access token of the config correct."""
+        return MocaConfig._compare_secret(MocaConfig._ROOT_PASS, root_pass) or \
+            MocaConfig._compare_secret(snapshot.get('__moca_config_access_token__'), access_token)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _is_private(snapshot: MocaConfigSnapshot) -> bool:
+        """Check is config private, the same as MocaConfig.is_private()"""
+        try:
+            return bool(snapshot['__private__'])
+        except Exception:
+            return True
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def snapshot(self,
+                 access_token: str = '',
+                 root_pass: str = '') -> Optional[MocaConfigSnapshot]:
+        """
+        Return the latest snapshot.
+        If the access token or root password is incorrect, the snapshot doesn't contain the private configs.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the snapshot. if can't access to the config file, return None.
+        """
+        snapshot = self._load()
+        if self._has_privilege(snapshot, root_pass, access_token):
+            return snapshot
+        elif MocaConfigSubscriber._is_private(snapshot):
+            return None
+        else:
+            return snapshot.public()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get(self,
+            key: str,
+            default: Any = None,
+            access_token: str = '',
+            root_pass: str = '') -> Any:
+        """
+        Return the config value from the latest snapshot.
+        :param key: the config key.
+        :param default: the value returned when the config doesn't exist.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the config value. if can't access to the config, return default value. (same as MocaConfig.get)
+        """
+        snapshot = self._load()
+        if (key.startswith('_') or MocaConfigSubscriber._is_private(snapshot)) and \
+                (not self._has_privilege(snapshot, root_pass, access_token)):
+            return default
+        return snapshot.get(key, default)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Unmap the shared memory."""
+        with self._lock:
+            for segment in (self._data, self._control):
+                if segment is not None:
+                    MocaConfigSubscriber._detach(segment)
+            self._data = None
+
+# -------------------------------------------------------------------------- MocaConfigSubscriber --
+
+# reset the locks in the forked child processes.
+if register_at_fork is not None:
+    register_at_fork(after_in_child=MocaConfigSubscriber._after_fork_in_child)
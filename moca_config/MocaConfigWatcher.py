@@ -0,0 +1,640 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from heapq import heappush, heappop
+from random import uniform
+from threading import Thread, Condition, Lock
+from time import monotonic
+from traceback import print_exc
+from pathlib import Path
+from select import select
+from struct import unpack_from, calcsize
+from sys import platform
+import ctypes
+import ctypes.util
+import os
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaConfigWatcher --------------------------------------------------------------------------
+
+
+class MocaConfigWatcher(object):
+    """
+    A process-wide scheduler that reloads every registered config on one thread.
+    The registered targets are kept in a deadline heap keyed on their reload interval,
+    and the polls are spread with a random jitter, so a lot of instances don't stat their files at the same moment.
+    The thread is started when the first target is registered, and exits when no target is left.
+
+    Attributes
+    ----------
+    _jitter: float
+        the jitter ratio of the reload interval.
+
+    _cond: Condition
+        the condition to protect the heap and wake up the watcher thread.
+
+    _heap: List[list]
+        the deadline heap, every entry is [deadline, sequence number, target].
+
+    _entries: Dict[int, list]
+        the scheduled entries, keyed by the id of the target.
+
+    _seq: int
+        the sequence number of the next entry.
+
+    _thread: Optional[Thread]
+        the watcher thread.
+    """
+
+    _default: Optional['MocaConfigWatcher'] = None
+
+    # if the reload interval is not positive (and not -1), reload the config file every 5 seconds.
+    FALLBACK_INTERVAL: float = 5.0
+
+    # the entries due inside this window are reloaded in one wakeup.
+    SLACK: float = 0.01
+
+    def __init__(self,
+                 jitter: float = 0.1):
+        """
+        The initializer of MocaConfigWatcher class.
+        :param jitter: the jitter ratio of the reload interval. 0.1 means ±10%.
+        """
+        self._jitter: float = jitter
+        self._cond: Condition = Condition()
+        self._heap: List[list] = []
+        self._entries: Dict[int, list] = {}
+        self._seq: int = 0
+        self._thread: Optional[Thread] = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def default(cls) -> 'MocaConfigWatcher':
+        """Return the process-wide watcher."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def thread(self) -> Optional[Thread]:
+        """Return the watcher thread, if it is running."""
+        return self._thread
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Reset the watcher in the child process after fork.
+        The watcher thread doesn't exist in the child, and the lock may be held by a thread of the parent,
+        so every target is dropped, and the targets should be registered again.
+        """
+        self._cond = Condition()
+        self._heap = []
+        self._entries = {}
+        self._thread = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_target_count(self) -> int:
+        """Return the number of the registered targets."""
+        return len(self._entries)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _get_interval(self,
+                      target: Any) -> Optional[float]:
+        """Return the reload interval of the target. if the target should not be reloaded, return None."""
+        interval = target.reload_interval
+        if interval == -1:
+            return None
+        elif interval <= 0:
+            return MocaConfigWatcher.FALLBACK_INTERVAL
+        else:
+            return interval
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _push(self,
+              target: Any,
+              deadline: float) -> None:
+        """Push a new entry to the heap. the lock should be held by the caller."""
+        entry = [deadline, self._seq, target]
+        self._seq += 1
+        self._entries[id(target)] = entry
+        heappush(self._heap, entry)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _drop(self,
+              target: Any) -> None:
+        """Drop the entry of the target. the lock should be held by the caller."""
+        entry = self._entries.pop(id(target), None)
+        if entry is not None:
+            entry[2] = None  # lazy deletion, the watcher thread will discard it.
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def register(self,
+                 target: Any) -> None:
+        """
+        Register a target, or reschedule it if it is already registered.
+        The target should have a reload_interval property and a reload_config method.
+        The first poll is placed randomly inside the first interval.
+        :param target: the target to reload.
+        :return: None
+        """
+        interval = self._get_interval(target)
+        with self._cond:
+            self._drop(target)
+            if interval is None:
+                return
+            self._push(target, monotonic() + uniform(0, interval))
+            if self._thread is None:
+                self._thread = Thread(target=self._watch_loop, name='moca_config_watcher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def unregister(self,
+                   target: Any) -> None:
+        """Unregister a target. if the target is not registered, do nothing."""
+        with self._cond:
+            self._drop(target)
+            self._cond.notify()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _watch_loop(self) -> None:
+        """the watcher loop."""
+        while True:
+            due: List[list] = []
+            with self._cond:
+                while not due:
+                    if not self._entries:
+                        self._heap.clear()
+                        self._thread = None
+                        return
+                    entry = self._heap[0]
+                    if entry[2] is None:
+                        heappop(self._heap)
+                        continue
+                    # the entries due inside the slack are reloaded together, to save wakeups.
+                    limit = monotonic() + MocaConfigWatcher.SLACK
+                    if entry[0] > limit:
+                        self._cond.wait(entry[0] - limit + MocaConfigWatcher.SLACK)
+                        continue
+                    while self._heap and self._heap[0][0] <= limit:
+                        entry = heappop(self._heap)
+                        if entry[2] is not None:
+                            due.append(entry)
+            for entry in due:
+                target = entry[2]
+                if target is None:
+                    continue
+                try:
+                    target.reload_config()
+                except Exception:
+                    if getattr(target, '_debug_mode', False):
+                        print_exc()
+            now = monotonic()
+            with self._cond:
+                for entry in due:
+                    target = entry[2]
+                    # the target may be unregistered or rescheduled while reloading.
+                    if (target is None) or (self._entries.get(id(target)) is not entry):
+                        continue
+                    interval = self._get_interval(target)
+                    if interval is None:
+                        self._drop(target)
+                    else:
+                        del self._entries[id(target)]
+                        self._push(target, now + interval * uniform(1 - self._jitter, 1 + self._jitter))
+
+# -------------------------------------------------------------------------- MocaConfigWatcher --
+
+
+# -- MocaConfigInotifyWatcher --------------------------------------------------------------------------
+
+
+class MocaConfigInotifyWatcher(object):
+    """
+    A process-wide change detection backend based on linux inotify (called through ctypes).
+    The parent directory of every config file is watched, so the editors that save the file by rename are detected too.
+    If the path goes through symbolic links, (ex: a Kubernetes ConfigMap "config.json -> ..data/config.json")
+    the parent directory of every link is watched too, and the links are resolved again after every event,
+    so a swap of the link target is detected.
+    The registered targets are reloaded only when their files are really written, moved, created, deleted or touched.
+    If a directory can't be watched, the target falls back to the polling watcher.
+
+    Attributes
+    ----------
+    _libc: Any
+        the libc loaded by ctypes.
+
+    _fd: int
+        the inotify file descriptor.
+
+    _lock: Lock
+        the lock to protect the watch tables.
+
+    _dirs: Dict[str, int]
+        the watch descriptors, keyed by the directory path.
+
+    _files: Dict[int, Dict[str, Dict[int, Any]]]
+        the targets, keyed by watch descriptor, file name and the id of the target.
+
+    _registered: Dict[int, List[Tuple[int, str]]]
+        the watch descriptors and file names of every registered target, keyed by the id of the target.
+        a target with more than one item has symbolic links in the path.
+
+    _fallback: MocaConfigWatcher
+        the polling watcher for the targets that can't be watched.
+
+    _thread: Optional[Thread]
+        the inotify reader thread.
+    """
+
+    _default: Optional['MocaConfigInotifyWatcher'] = None
+
+    # inotify constants, see <sys/inotify.h>
+    IN_ATTRIB: int = 0x00000004
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_FROM: int = 0x00000040
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    IN_DELETE: int = 0x00000200
+    IN_Q_OVERFLOW: int = 0x00004000
+    IN_IGNORED: int = 0x00008000
+    IN_ONLYDIR: int = 0x01000000
+    IN_NONBLOCK: int = 0o0004000
+    IN_CLOEXEC: int = 0o2000000
+
+    WATCH_MASK: int = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+
+    _EVENT_HEADER: str = 'iIII'
+    _EVENT_HEADER_SIZE: int = calcsize('iIII')
+
+    def __init__(self,
+                 fallback: Optional[MocaConfigWatcher] = None):
+        """
+        The initializer of MocaConfigInotifyWatcher class.
+        :param fallback: the polling watcher for the targets that can't be watched.
+
+        Raise
+        -----
+            OSError: if inotify is not available.
+        """
+        if not platform.startswith('linux'):
+            raise OSError('inotify is only available on linux.')
+        self._libc: Any = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc.inotify_init1.argtypes = [ctypes.c_int]
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self._fd: int = self._init_inotify()
+        self._lock: Lock = Lock()
+        self._dirs: Dict[str, int] = {}
+        self._files: Dict[int, Dict[str, Dict[int, Any]]] = {}
+        self._registered: Dict[int, List[Tuple[int, str]]] = {}
+        self._fallback: MocaConfigWatcher = fallback or MocaConfigWatcher.default()
+        self._thread: Optional[Thread] = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def default(cls) -> Optional['MocaConfigInotifyWatcher']:
+        """Return the process-wide inotify watcher. if inotify is not available, return None."""
+        if cls._default is None:
+            try:
+                cls._default = cls()
+            except (OSError, AttributeError):
+                return None
+        return cls._default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def thread(self) -> Optional[Thread]:
+        """Return the inotify reader thread, if it is running."""
+        return self._thread
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _init_inotify(self) -> int:
+        """
+        Create a new inotify file descriptor.
+        :return: the file descriptor.
+
+        Raise
+        -----
+            OSError: if inotify_init1 failed.
+        """
+        fd = self._libc.inotify_init1(MocaConfigInotifyWatcher.IN_NONBLOCK | MocaConfigInotifyWatcher.IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return fd
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Reset the watcher in the child process after fork.
+        The inotify file descriptor is shared with the parent (the events are read by only one of them),
+        so a new one is created, every target is dropped, and the targets should be registered again.
+
+        Raise
+        -----
+            OSError: if inotify_init1 failed.
+        """
+        old_fd = self._fd
+        self._lock = Lock()
+        self._dirs = {}
+        self._files = {}
+        self._registered = {}
+        self._thread = None
+        try:
+            self._fd = self._init_inotify()
+        finally:
+            os.close(old_fd)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_target_count(self) -> int:
+        """Return the number of the targets watched by inotify."""
+        return len(self._registered)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _add_watch(self,
+                   directory: str) -> int:
+        """Add a inotify watch to the directory. the lock should be held by the caller."""
+        wd = self._dirs.get(directory)
+        if wd is None:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), MocaConfigInotifyWatcher.WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), directory)
+            self._dirs[directory] = wd
+            self._files.setdefault(wd, {})
+        return wd
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _drop(self,
+              target: Any) -> None:
+        """Drop the target from the watch tables. the lock should be held by the caller."""
+        items = self._registered.pop(id(target), None)
+        if items is None:
+            return
+        for wd, name in items:
+            targets = self._files.get(wd, {}).get(name)
+            if targets is not None:
+                targets.pop(id(target), None)
+                if not targets:
+                    del self._files[wd][name]
+            if (wd in self._files) and (not self._files[wd]):
+                del self._files[wd]
+                for directory, dir_wd in list(self._dirs.items()):
+                    if dir_wd == wd:
+                        del self._dirs[directory]
+                self._libc.inotify_rm_watch(self._fd, wd)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _get_watch_names(path: Path) -> List[Tuple[str, str]]:
+        """
+        Return the (directory, name) of the file and every symbolic link on the path, the file last.
+        The links are resolved one component at a time, so the links to directories are found too.
+        """
+        names: List[Tuple[str, str]] = []
+        pending = list(path.parts[1:])
+        current = path.anchor
+        hops = 0
+        while pending:
+            part = pending.pop(0)
+            if part in ('', '.'):
+                continue
+            if part == '..':
+                current = os.path.dirname(current)
+                continue
+            candidate = os.path.join(current, part)
+            if (hops < 40) and os.path.islink(candidate):
+                hops += 1
+                names.append((current, part))
+                try:
+                    link = Path(os.readlink(candidate))
+                except OSError:
+                    current = candidate
+                    continue
+                if link.is_absolute():
+                    current = link.anchor
+                pending[0:0] = link.parts[1:] if link.is_absolute() else link.parts
+            else:
+                current = candidate
+        names.append((os.path.dirname(current), os.path.basename(current)))
+        return names
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def register(self,
+                 target: Any) -> None:
+        """
+        Register a target, or re-register it if it is already registered.
+        The target should have a path property, a reload_interval property and a reload_config method.
+        If the reload interval is -1, the target is not watched.
+        :param target: the target to reload.
+        :return: None
+        """
+        self._fallback.unregister(target)
+        path = Path(target.path).absolute()
+        with self._lock:
+            self._drop(target)
+            if target.reload_interval == -1:
+                return
+            items = []
+            try:
+                for directory, name in MocaConfigInotifyWatcher._get_watch_names(path):
+                    items.append((self._add_watch(directory), name))
+            except OSError:
+                if getattr(target, '_debug_mode', False):
+                    print_exc()
+                failed = True
+            else:
+                failed = False
+            for wd, name in items:
+                self._files[wd].setdefault(name, {})[id(target)] = target
+            self._registered[id(target)] = items
+            if not failed:
+                if self._thread is None:
+                    self._thread = Thread(target=self._watch_loop, name='moca_config_inotify_watcher', daemon=True)
+                    self._thread.start()
+                return
+            self._drop(target)  # a directory on the path can't be watched, remove the other watches.
+        self._fallback.register(target)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def unregister(self,
+                   target: Any) -> None:
+        """Unregister a target. if the target is not registered, do nothing."""
+        with self._lock:
+            self._drop(target)
+        self._fallback.unregister(target)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _read_events(self) -> List[Tuple[Any, bool]]:
+        """
+        Read the pending events, and return the targets to reload.
+        :return: [(target, resolve the symbolic links on the path again)]
+        """
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return []
+        targets: Dict[int, Tuple[Any, bool]] = {}
+        offset = 0
+        with self._lock:
+            while offset + MocaConfigInotifyWatcher._EVENT_HEADER_SIZE <= len(data):
+                wd, mask, _, length = unpack_from(MocaConfigInotifyWatcher._EVENT_HEADER, data, offset)
+                offset += MocaConfigInotifyWatcher._EVENT_HEADER_SIZE
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & MocaConfigInotifyWatcher.IN_Q_OVERFLOW:
+                    # some events were lost, reload everything.
+                    for files in self._files.values():
+                        for items in files.values():
+                            for target in items.values():
+                                targets[id(target)] = (target, len(self._registered.get(id(target), ())) > 1)
+                elif mask & MocaConfigInotifyWatcher.IN_IGNORED:
+                    # the directory was removed, the targets fall back to polling.
+                    # the targets with symbolic links on the path (ex: the old directory of a ConfigMap)
+                    # resolve the links again.
+                    removed: Dict[int, Any] = {}
+                    for items in self._files.pop(wd, {}).values():
+                        removed.update(items)
+                    for directory, dir_wd in list(self._dirs.items()):
+                        if dir_wd == wd:
+                            del self._dirs[directory]
+                    for target in removed.values():
+                        linked = len(self._registered.get(id(target), ())) > 1
+                        self._drop(target)
+                        if linked:
+                            targets[id(target)] = (target, True)
+                        else:
+                            self._fallback.register(target)
+                            targets.pop(id(target), None)
+                else:
+                    for target in self._files.get(wd, {}).get(name, {}).values():
+                        targets[id(target)] = (target, len(self._registered.get(id(target), ())) > 1)
+        return list(targets.values())
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _watch_loop(self) -> None:
+        """the inotify reader loop."""
+        while True:
+            with self._lock:
+                if not self._registered:
+                    self._thread = None
+                    return
+            # wake up periodically to check whether every target was unregistered.
+            readable, _, _ = select([self._fd], [], [], 1.0)
+            if not readable:
+                continue
+            for target, resolve in self._read_events():
+                if resolve:
+                    self.register(target)  # a link on the path may be changed, resolve it again.
+                try:
+                    target.reload_config()
+                except Exception:
+                    if getattr(target, '_debug_mode', False):
+                        print_exc()
+
+
+# -------------------------------------------------------------------------- MocaConfigInotifyWatcher --
+
+
+def reset_watchers_after_fork() -> None:
+    """
+    Reset the process-wide watchers in the child process after fork.
+    If inotify can't be used in the child, the polling watcher is used instead.
+    """
+    if MocaConfigWatcher._default is not None:
+        MocaConfigWatcher._default._after_fork_in_child()
+    if MocaConfigInotifyWatcher._default is not None:
+        try:
+            MocaConfigInotifyWatcher._default._after_fork_in_child()
+        except OSError:
+            MocaConfigInotifyWatcher._default = None
+
+
+def get_watcher(backend: str = 'auto') -> Union[MocaConfigWatcher, MocaConfigInotifyWatcher]:
+    """
+    Return the process-wide watcher of the change detection backend.
+    :param backend: 'auto', 'inotify' or 'poll'. if inotify is not available, 'auto' and 'inotify' use 'poll'.
+    :return: the watcher.
+
+    Raise
+    -----
+        ValueError: if the backend is unknown.
+    """
+    if backend in ('auto', 'inotify'):
+        return MocaConfigInotifyWatcher.default() or MocaConfigWatcher.default()
+    elif backend == 'poll':
+        return MocaConfigWatcher.default()
+    else:
+        raise ValueError(f'Unknown watch backend: {backend}')
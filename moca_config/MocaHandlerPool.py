@@ -0,0 +1,300 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from collections import deque
+from heapq import heappush, heappop
+from queue import SimpleQueue
+from threading import Thread, Lock, Condition
+from time import monotonic
+from traceback import print_exc
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaHandlerPool --------------------------------------------------------------------------
+
+
+class MocaHandlerPool(object):
+    """
+    A bounded thread pool to run the config handlers, so a slow handler can't stall the reloads and the writers.
+    The handlers of the same key are run in order, every key has a lane, and one worker drains one lane.
+    If a handler runs longer than the timeout, it is counted as timed out,
+    and the next handlers of the key are run by another worker without waiting for it.
+    (python can't stop a thread, so the timed out handler keeps its worker until it returns)
+    The worker threads are daemon threads, a stuck handler never blocks the exit of the interpreter.
+
+    Attributes
+    ----------
+    _max_workers: int
+        the max number of the worker threads.
+
+    _timeout: Optional[float]
+        the timeout of every handler call, None means no timeout.
+
+    _debug_mode: bool
+        debug mode
+
+    _lock: Lock
+        the lock to protect the lanes, the workers and the stats.
+
+    _tasks: SimpleQueue
+        the tasks waiting for a worker.
+
+    _workers: int
+        the number of the worker threads.
+
+    _idle: int
+        the number of the idle worker threads.
+
+    _lanes: Dict[str, list]
+        the lane of every key, [pending calls: deque, runner token: dict].
+
+    _seq: int
+        the id of the next handler call.
+
+    _deadlines: List[tuple]
+        the deadline heap of the running handler calls, (deadline, call id, key, runner token, handler name).
+
+    _deadline_cond: Condition
+        the condition to wake up the watchdog thread.
+
+    _watchdog: Optional[Thread]
+        the watchdog thread.
+
+    _stats: Dict[str, list]
+        the stats of every handler, [calls, failures, timeouts, total time, max time].
+    """
+
+    def __init__(self,
+                 max_workers: int = 4,
+                 timeout: Optional[float] = None,
+                 debug_mode: bool = False):
+        """
+        The initializer of MocaHandlerPool class.
+        :param max_workers: the max number of the worker threads.
+        :param timeout: the timeout of every handler call (seconds), None means no timeout.
+        :param debug_mode: turn on debug mode.
+        """
+        self._max_workers: int = max(1, max_workers)
+        self._timeout: Optional[float] = timeout
+        self._debug_mode: bool = debug_mode
+        self._lock: Lock = Lock()
+        self._tasks: SimpleQueue = SimpleQueue()
+        self._workers: int = 0
+        self._idle: int = 0
+        self._lanes: Dict[str, list] = {}
+        self._seq: int = 0
+        self._deadlines: List[tuple] = []
+        self._deadline_cond: Condition = Condition(self._lock)
+        self._watchdog: Optional[Thread] = None
+        self._stats: Dict[str, list] = {}
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _after_fork_in_child(self) -> None:
+        """
+        Reset the pool in the child process after fork.
+        The worker threads don't exist in the child, so the pending handler calls of the parent are dropped.
+        The stats are kept.
+        """
+        self._lock = Lock()
+        self._tasks = SimpleQueue()
+        self._workers = 0
+        self._idle = 0
+        self._lanes = {}
+        self._deadlines = []
+        self._deadline_cond = Condition(self._lock)
+        self._watchdog = None
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def submit(self,
+               key: str,
+               name: str,
+               handler: Callable,
+               args: tuple,
+               kwargs: dict) -> None:
+        """
+        Run the handler in the pool, after the handlers of the same key submitted before.
+        The handler is called as handler(key, *args, **kwargs).
+        :param key: the changed key.
+        :param name: the name of the handler.
+        :param handler: the handler function.
+        :param args: the arguments after the key.
+        :param kwargs: the keyword arguments to the handler.
+        :return: None
+        """
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is not None:
+                lane[0].append((name, handler, args, kwargs))
+                return
+            token = {'call': None}
+            self._lanes[key] = [deque([(name, handler, args, kwargs)]), token]
+            self._start_runner(key, token)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _start_runner(self,
+                      key: str,
+                      token: dict) -> None:
+        """Queue a runner of the lane, and start a new worker if needed. the lock should be held by the caller."""
+        self._tasks.put((key, token))
+        if (self._idle == 0) and (self._workers < self._max_workers):
+            self._workers += 1
+            Thread(target=self._worker_loop, name='moca_config_handler', daemon=True).start()
+        else:
+            self._idle -= 1  # the task will be taken by a idle worker.
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        """the worker loop."""
+        while True:
+            key, token = self._tasks.get()
+            self._drain(key, token)
+            with self._lock:
+                self._idle += 1
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _drain(self,
+               key: str,
+               token: dict) -> None:
+        """Run the pending calls of the lane in order, until the lane is empty or the runner is superseded."""
+        while True:
+            with self._lock:
+                lane = self._lanes.get(key)
+                if (lane is None) or (lane[1] is not token):
+                    return  # superseded by other runner after a timeout.
+                if not lane[0]:
+                    del self._lanes[key]
+                    return
+                name, handler, args, kwargs = lane[0].popleft()
+                self._seq += 1
+                call_id = self._seq
+                token['call'] = call_id
+                if self._timeout is not None:
+                    heappush(self._deadlines, (monotonic() + self._timeout, call_id, key, token, name))
+                    if self._watchdog is None:
+                        self._watchdog = Thread(target=self._watchdog_loop, name='moca_config_handler_watchdog',
+                                                daemon=True)
+                        self._watchdog.start()
+                    self._deadline_cond.notify()
+            failed = False
+            start = monotonic()
+            try:
+                handler(key, *args, **kwargs)
+            except Exception:
+                failed = True
+                if self._debug_mode:
+                    print_exc()
+            except BaseException:  # SystemExit, KeyboardInterrupt, ... end this worker, the lane is kept running.
+                self._finish(key, token, call_id, name, monotonic() - start, True, True)
+                raise
+            self._finish(key, token, call_id, name, monotonic() - start, failed, False)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _finish(self,
+                key: str,
+                token: dict,
+                call_id: int,
+                name: str,
+                elapsed: float,
+                failed: bool,
+                exiting: bool) -> None:
+        """
+        Record the stats of a finished handler call.
+        If the worker is exiting, the lane is handed to a new runner, so the next handlers of the key are still run.
+        """
+        with self._lock:
+            if token['call'] == call_id:
+                token['call'] = None
+            stats = self._stats.setdefault(name, [0, 0, 0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += int(failed)
+            stats[3] += elapsed
+            stats[4] = max(stats[4], elapsed)
+            if exiting:
+                self._workers -= 1
+                lane = self._lanes.get(key)
+                if (lane is not None) and (lane[1] is token):
+                    new_token = {'call': None}
+                    lane[1] = new_token
+                    self._start_runner(key, new_token)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _watchdog_loop(self) -> None:
+        """the watchdog loop, give up waiting for the handlers that ran longer than the timeout."""
+        with self._lock:
+            while True:
+                if not self._deadlines:
+                    self._deadline_cond.wait()
+                    continue
+                deadline, call_id, key, token, name = self._deadlines[0]
+                wait = deadline - monotonic()
+                if wait > 0:
+                    self._deadline_cond.wait(wait)
+                    continue
+                heappop(self._deadlines)
+                if token['call'] != call_id:
+                    continue  # already finished.
+                self._stats.setdefault(name, [0, 0, 0, 0.0, 0.0])[2] += 1
+                lane = self._lanes.get(key)
+                if (lane is not None) and (lane[1] is token):
+                    new_token = {'call': None}
+                    lane[1] = new_token
+                    self._start_runner(key, new_token)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the stats of every handler.
+        :return: {name: {'calls', 'failures', 'timeouts', 'total_time', 'max_time', 'average_time'}}
+        """
+        with self._lock:
+            return {name: {'calls': calls,
+                           'failures': failures,
+                           'timeouts': timeouts,
+                           'total_time': total_time,
+                           'max_time': max_time,
+                           'average_time': total_time / calls if calls else 0.0}
+                    for name, (calls, failures, timeouts, total_time, max_time) in self._stats.items()}
+
+# -------------------------------------------------------------------------- MocaHandlerPool --
@@ -0,0 +1,205 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from json import loads as json_loads, dumps as json_dumps
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaJsonCodec --------------------------------------------------------------------------
+
+
+class MocaJsonCodec(object):
+    """
+    The json codec of MocaConfig, based on the standard library.
+    The subclasses use the faster libraries to parse json and to check the values,
+    but the config file is always written by the standard library, so the file format never changes.
+    If a faster library can't handle the data (NaN, very big integers, non-string keys, ...),
+    the standard library is used instead, so all codecs accept the same data.
+    """
+
+    name: str = 'json'
+
+    def loads(self,
+              data: Union[bytes, str]) -> Any:
+        """
+        Parse the json data.
+        :param data: the json data.
+        :return: the parsed value.
+
+        Raise
+        -----
+            JSONDecodeError: if the data is not a valid json.
+        """
+        return json_loads(data)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def dumps(self,
+              value: Any) -> str:
+        """
+        Serialize the value to a compact json string.
+        :param value: the value.
+        :return: the json string.
+
+        Raise
+        -----
+            TypeError: if the value can't be serialized.
+        """
+        return json_dumps(value)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def dumps_file(value: Any,
+                   sort_keys: bool = True) -> str:
+        """Serialize the value with the format of the config file."""
+        return json_dumps(value,
+                          ensure_ascii=False,
+                          indent=4,
+                          sort_keys=sort_keys,
+                          separators=(',', ': '))
+
+# -------------------------------------------------------------------------- MocaJsonCodec --
+
+# -- MocaOrjsonCodec --------------------------------------------------------------------------
+
+
+class MocaOrjsonCodec(MocaJsonCodec):
+    """The json codec based on orjson."""
+
+    name: str = 'orjson'
+
+    def loads(self,
+              data: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json_loads(data)  # NaN, Infinity, or very big integers.
+
+    def dumps(self,
+              value: Any) -> str:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:
+            return json_dumps(value)  # non-string keys, or very big integers.
+
+# -------------------------------------------------------------------------- MocaOrjsonCodec --
+
+# -- MocaUjsonCodec --------------------------------------------------------------------------
+
+
+class MocaUjsonCodec(MocaJsonCodec):
+    """The json codec based on ujson."""
+
+    name: str = 'ujson'
+
+    def loads(self,
+              data: Union[bytes, str]) -> Any:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json_loads(data)
+
+    def dumps(self,
+              value: Any) -> str:
+        try:
+            return ujson.dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            return json_dumps(value)
+
+# -------------------------------------------------------------------------- MocaUjsonCodec --
+
+# -- MocaSimdjsonCodec --------------------------------------------------------------------------
+
+
+class MocaSimdjsonCodec(MocaJsonCodec):
+    """The json codec based on pysimdjson, only used to parse json."""
+
+    name: str = 'simdjson'
+
+    def loads(self,
+              data: Union[bytes, str]) -> Any:
+        try:
+            return simdjson.loads(data)
+        except ValueError:
+            return json_loads(data)
+
+# -------------------------------------------------------------------------- MocaSimdjsonCodec --
+
+
+_CODECS: Dict[str, Tuple[Any, type]] = {
+    'orjson': (orjson, MocaOrjsonCodec),
+    'simdjson': (simdjson, MocaSimdjsonCodec),
+    'ujson': (ujson, MocaUjsonCodec),
+}
+
+
+def get_json_codec(name: str = 'auto') -> MocaJsonCodec:
+    """
+    Return a json codec.
+    :param name: 'auto', 'orjson', 'simdjson', 'ujson' or 'json'.
+                 'auto' uses the first importable library in orjson, simdjson and ujson, or the standard library.
+    :return: the json codec.
+
+    Raise
+    -----
+        ValueError: if the name is unknown.
+        ImportError: if the library is not installed.
+    """
+    if name == 'auto':
+        for module, codec in _CODECS.values():
+            if module is not None:
+                return codec()
+        return MocaJsonCodec()
+    elif name == 'json':
+        return MocaJsonCodec()
+    elif name in _CODECS:
+        module, codec = _CODECS[name]
+        if module is None:
+            raise ImportError(f'{name} is not installed.')
+        return codec()
+    else:
+        raise ValueError(f'Unknown json codec: {name}')
@@ -0,0 +1,117 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaKeyTrie --------------------------------------------------------------------------
+
+
+class MocaKeyTrie(object):
+    """
+    A prefix tree of the handler subscriptions like "db_*".
+    Finding all subscriptions matched with a key costs O(length of the key),
+    it doesn't depend on the number of the subscriptions.
+
+    Attributes
+    ----------
+    _root: list
+        the root node, every node is [children: Dict[str, list], names: List[str]].
+
+    _size: int
+        the number of the subscriptions.
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self):
+        """The initializer of MocaKeyTrie class."""
+        self._root: list = [{}, []]
+        self._size: int = 0
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def add(self,
+            prefix: str,
+            name: str) -> None:
+        """Subscribe the name to all keys starts with the prefix."""
+        node = self._root
+        for char in prefix:
+            node = node[0].setdefault(char, [{}, []])
+        node[1].append(name)
+        self._size += 1
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def remove(self,
+               prefix: str,
+               name: str) -> None:
+        """Unsubscribe the name from the prefix. if it is not subscribed, do nothing."""
+        path = [self._root]
+        for char in prefix:
+            node = path[-1][0].get(char)
+            if node is None:
+                return
+            path.append(node)
+        try:
+            path[-1][1].remove(name)
+        except ValueError:
+            return
+        self._size -= 1
+        # remove the empty nodes.
+        for index in range(len(prefix), 0, -1):
+            node = path[index]
+            if node[0] or node[1]:
+                break
+            del path[index - 1][0][prefix[index - 1]]
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def match(self,
+              key: str) -> List[str]:
+        """Return the names subscribed to the prefixes of the key, the shorter prefix first."""
+        node = self._root
+        names = list(node[1])
+        for char in key:
+            node = node[0].get(char)
+            if node is None:
+                break
+            names.extend(node[1])
+        return names
+
+# -------------------------------------------------------------------------- MocaKeyTrie --
@@ -0,0 +1,472 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from pathlib import Path
+from threading import RLock
+from weakref import WeakSet
+from uuid import uuid4
+try:
+    from os import register_at_fork
+except ImportError:  # windows
+    register_at_fork = None
+from .MocaConfig import MocaConfig
+from .MocaConfigHandle import MocaConfigHandle
+from .MocaConfigSnapshot import MocaConfigSnapshot
+from .MocaKeyTrie import MocaKeyTrie
+from .MocaHandlerPool import MocaHandlerPool
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaLayeredConfig --------------------------------------------------------------------------
+
+
+class MocaLayeredConfig(object):
+    """
+    A read view of some stacked MocaConfig instances, like defaults -> environment -> host overrides.
+    The later layer overrides the earlier layer, and the dictionaries are merged recursively.
+    Every layer is a normal MocaConfig, it reloads and watches its own file.
+    The merged view is kept in memory, and only the changed keys are merged again,
+    so get() is a single dictionary lookup, never walks the layers.
+    The handlers are run only when the effective value was changed, a change hidden by a upper layer runs nothing.
+    The access check of a config uses every layer the value came from,
+    so a private part of a lower layer is never merged into the value returned to a caller without privilege.
+    The keys about the config file of every layer (access token, instance name, ...) are not merged.
+
+    Attributes
+    ----------
+    _name: str
+        the name of this instance.
+
+    _layers: Tuple[MocaConfig, ...]
+        the layers, the lowest priority first.
+
+    _merged: Dict[str, tuple]
+        the merged view, {key: (effective value, the layers that contributed to the value)}
+
+    _generation: int
+        the generation of the merged view, increased every time a effective value or the privileges were changed.
+
+    _snapshot: MocaConfigSnapshot
+        the latest snapshot of the merged view, created when it was requested.
+
+    _layer_handler_name: str
+        the name of the handler added to the layers.
+
+    _debug_mode: bool
+        debug mode
+
+    _lock: RLock
+        the lock to update the merged view and the handlers.
+
+    _handlers: Dict[str, List]
+        the handlers
+
+    _handled_keys: Dict[str, List[str]]
+        the keys handled by handlers.
+
+    _handled_prefixes: MocaKeyTrie
+        the prefixes handled by handlers, like "db_*".
+
+    _handled_patterns: Dict[str, List[str]]
+        the other wildcard patterns handled by handlers.
+
+    _handler_pool: Optional[MocaHandlerPool]
+        the thread pool to run the handlers, None means the handlers are run inline.
+    """
+
+    # all instances, the locks are reset in the child process after fork.
+    _live_instances: WeakSet = WeakSet()
+
+    # the keys about the config file of every layer, they are not merged.
+    _LAYER_KEYS: FrozenSet[str] = frozenset(('__MocaConfig__', '__MocaConfig_version__', '__private__',
+                                             '__moca_config_access_token__', '__config_instance_name__'))
+
+    def __init__(self,
+                 name: str,
+                 layers: Sequence[Union[MocaConfig, Path, str]],
+                 debug_mode: bool = False,
+                 handler_workers: int = 0,
+                 handler_timeout: Optional[float] = None,
+                 **kwargs):
+        """
+        The initializer of MocaLayeredConfig class.
+        :param name: the name of this instance.
+        :param layers: the MocaConfig instances or the config file paths, the lowest priority first.
+                       a MocaConfig instance named "<name>_layer_<index>" is created for every path.
+        :param debug_mode: turn on debug mode.
+        :param handler_workers: if the value is positive, the handlers are run in a thread pool with this many workers.
+        :param handler_timeout: the timeout of every handler call in the thread pool (seconds).
+        :param kwargs: the keyword arguments to the MocaConfig instances created for the paths.
+
+        Raise
+        -----
+            TypeError: if the arguments type is incorrect.
+            ValueError: if the layers are empty.
+        """
+        self._name: str = name
+        self._debug_mode: bool = debug_mode
+        instances = []
+        for index, layer in enumerate(layers):
+            if isinstance(layer, MocaConfig):
+                instances.append(layer)
+            elif isinstance(layer, (Path, str)):
+                instances.append(MocaConfig(f'{name}_layer_{index}', layer, debug_mode=debug_mode, **kwargs))
+            else:
+                raise TypeError('Argument type error, '
+                                'Expected layers: Sequence[Union[MocaConfig, Path, str]], '
+                                f'But received a layer: {type(layer)}')
+        if not instances:
+            raise ValueError('MocaLayeredConfig needs at least one layer.')
+        self._layers: Tuple[MocaConfig, ...] = tuple(instances)
+        self._merged: Dict[str, tuple] = {}
+        self._generation: int = 0
+        self._snapshot: MocaConfigSnapshot = MocaConfigSnapshot(0, {})
+        self._lock: RLock = RLock()
+        self._handlers: Dict[str, List] = {}
+        self._handled_keys: Dict[str, List[str]] = {}
+        self._handled_prefixes: MocaKeyTrie = MocaKeyTrie()
+        self._handled_patterns: Dict[str, List[str]] = {}
+        self._handler_pool: Optional[MocaHandlerPool] = MocaHandlerPool(handler_workers, handler_timeout, debug_mode) \
+            if handler_workers > 0 else None
+        # subscribe before the first merge, so no change is missed.
+        self._layer_handler_name: str = f'__moca_layered_config_{uuid4().hex}__'
+        for layer in self._layers:
+            layer.add_handler(self._layer_handler_name, '*', self._on_layer_change, pattern=True)
+        with self._lock:
+            keys = {}
+            for layer in self._layers:
+                keys.update(dict.fromkeys(layer._snapshot._data))
+            for key in keys:
+                if key not in MocaLayeredConfig._LAYER_KEYS:
+                    self._update_key(key)
+        MocaLayeredConfig._live_instances.add(self)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """Reset the locks and the handler pools, they may be used by a thread of the parent. (called after fork)"""
+        for instance in list(cls._live_instances):
+            instance._lock = RLock()
+            if instance._handler_pool is not None:
+                instance._handler_pool._after_fork_in_child()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def name(self) -> str:
+        """Return the self._name"""
+        return self._name
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @property
+    def layers(self) -> Tuple[MocaConfig, ...]:
+        """Return the self._layers"""
+        return self._layers
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _merge_start(values: List[Any]) -> int:
+        """
+        Return the index of the first value used by the merge, the lowest priority first.
+        The dictionaries on the top are merged, a value that is not a dictionary hides all values under it.
+        """
+        index = len(values) - 1
+        if isinstance(values[index], dict):
+            while (index > 0) and isinstance(values[index - 1], dict):
+                index -= 1
+        return index
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _merge_values(values: List[Any]) -> Any:
+        """
+        Return the effective value of the values from the layers, the lowest priority first.
+        The dictionaries on the top are merged recursively, the other values are overridden.
+        """
+        index = MocaLayeredConfig._merge_start(values)
+        if index == len(values) - 1:  # nothing to merge, the published values are never changed.
+            return values[-1]
+        children: Dict[str, list] = {}
+        for value in values[index:]:
+            for key, child in value.items():
+                children.setdefault(key, []).append(child)
+        return {key: MocaLayeredConfig._merge_values(items) for key, items in children.items()}
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _update_key(self,
+                    key: str) -> Optional[Tuple[str, Any, Any]]:
+        """
+        Merge the key again from the latest snapshots of the layers. the lock should be held by the caller.
+        :return: the change (key, old value, new value), or None if the effective value was not changed.
+        """
+        missing = MocaConfig._MISSING
+        values = []
+        owners = []
+        for layer in self._layers:
+            value = layer._snapshot._data.get(key, missing)
+            if value is not missing:
+                values.append(value)
+                owners.append(layer)
+        old_entry = self._merged.get(key)
+        if not owners:
+            if old_entry is None:
+                return None
+            del self._merged[key]
+            new_value = None
+        else:
+            new_value = MocaLayeredConfig._merge_values(values)
+            owners = tuple(owners[MocaLayeredConfig._merge_start(values):])
+            self._merged[key] = (new_value, owners)
+            if (old_entry is not None) and (old_entry[0] == new_value):
+                if old_entry[1] != owners:
+                    self._generation += 1  # the same value from other layers, the access check is changed.
+                return None
+        self._generation += 1
+        return key, None if old_entry is None else old_entry[0], new_value
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def _on_layer_change(self,
+                         key: str,
+                         old_value: Any,
+                         new_value: Any) -> None:
+        """The handler added to the layers, merge the changed key again."""
+        if key in MocaLayeredConfig._LAYER_KEYS:
+            with self._lock:
+                self._generation += 1  # the privileges of the layer were changed, check the access again.
+            return
+        with self._lock:
+            change = self._update_key(key)
+        if change is not None:
+            self._run_handlers([change])
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def reload_config(self) -> None:
+        """Reload the config files of all layers."""
+        for layer in self._layers:
+            layer.reload_config()
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get(self,
+            key: str,
+            res_type: Any = any,
+            default: Any = None,
+            auto_convert: bool = False,
+            allow_el_command: bool = False,
+            save_unknown_config: bool = False,
+            access_token: str = '',
+            root_pass: str = '') -> Any:
+        """
+        return the effective config value.
+        :param key: the config name, or a dotted path of nested config.
+        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
+        :param default: if can't found the config value, return default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :param allow_el_command: use el command.
+        :param save_unknown_config: save the config value with default value to the top layer,
+                                    when can't found the config value.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: config value. if can't found the config value, return default value.
+                 if the response type is incorrect and can't convert the value, return default value.
+                 if can't access to the config, return default value.
+        """
+        if allow_el_command and key.startswith('[el]#'):
+            if key == MocaConfig.GET_ALL_CONFIG:
+                return self.get_all_config(access_token, root_pass)
+            status, response = MocaConfig.el_command_parser(key)
+            if status:
+                return MocaConfig._convert_value(response, res_type, default, auto_convert)
+        entry = self._merged.get(key)
+        if entry is not None:
+            value, owners = entry
+        else:
+            path = MocaConfig._parse_path(key)
+            entry = self._merged.get(path[0])
+            value = MocaConfig._MISSING if entry is None else MocaConfig._get_by_path({path[0]: entry[0]}, key)
+            if value is MocaConfig._MISSING:
+                if save_unknown_config:
+                    self._layers[-1].set(key, default, access_token=access_token, root_pass=root_pass)
+                return default
+            owners = entry[1]
+        if all(owner._is_allowed(key, root_pass, access_token) for owner in owners):
+            return MocaConfig._convert_value(value, res_type, default, auto_convert)
+        else:
+            return default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def handle(self,
+               key: str,
+               res_type: Any = any,
+               default: Any = None,
+               auto_convert: bool = True,
+               access_token: str = '',
+               root_pass: str = '') -> MocaConfigHandle:
+        """
+        Return a handle of the effective config value for hot-path reads, same as MocaConfig.handle().
+        :param key: the config name.
+        :param res_type: the response type you want to get. if the value is <any>, don't check the response type.
+        :param default: if can't found the config value, return default value.
+        :param auto_convert: if the response type is incorrect, try convert the value.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the handle.
+        """
+        return MocaConfigHandle(self, key, res_type, default, auto_convert, access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def snapshot(self,
+                 access_token: str = '',
+                 root_pass: str = '') -> MocaConfigSnapshot:
+        """
+        Return a immutable snapshot of the merged view.
+        The configs that can't be accessed with the access token or root password are not in the snapshot.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the snapshot.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot.version != self._generation:
+                snapshot = MocaConfigSnapshot(self._generation,
+                                              {key: value for key, (value, owners) in self._merged.items()})
+                self._snapshot = snapshot
+            privileges = [layer._has_privilege(root_pass, access_token) for layer in self._layers]
+            if all(privileges):
+                return snapshot
+            elif (not any(privileges)) and (not any(layer.is_private() for layer in self._layers)):
+                return snapshot.public()
+            else:
+                return MocaConfigSnapshot(snapshot.version,
+                                          {key: value for key, (value, owners) in self._merged.items()
+                                           if all(owner._is_allowed(key, root_pass, access_token)
+                                                  for owner in owners)})
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get_all_config(self,
+                       access_token: str = '',
+                       root_pass: str = '') -> Mapping:
+        """
+        Return the merged view as a read-only mapping.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :return: the configs that can be accessed with the access token or root password.
+        """
+        return self.snapshot(access_token, root_pass).data
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def set(self,
+            key: str,
+            config_value: Any,
+            allow_el_command: bool = False,
+            access_token: str = '',
+            root_pass: str = '',
+            layer: int = -1) -> Optional[bool]:
+        """
+        Set a config value to a layer, the top layer by default.
+        If the handlers of the layers are run inline, the merged view is already updated when this method returns.
+        :param key: the config name.
+        :param config_value: the config value.
+        :param allow_el_command: use el command.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :param layer: the index of the layer.
+        :return: the return value of MocaConfig.set()
+        """
+        return self._layers[layer].set(key, config_value, allow_el_command, access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def remove_config(self,
+                      key: str,
+                      access_token: str = '',
+                      root_pass: str = '',
+                      layer: int = -1) -> Optional[bool]:
+        """
+        Remove a config from a layer, the top layer by default. the value of the lower layer becomes effective.
+        :param key: the config name.
+        :param access_token: the access token of config file.
+        :param root_pass: the root password.
+        :param layer: the index of the layer.
+        :return: the return value of MocaConfig.remove_config()
+        """
+        return self._layers[layer].remove_config(key, access_token, root_pass)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Remove the handlers from the layers, the merged view is not updated after this."""
+        for layer in self._layers:
+            layer.remove_handler(self._layer_handler_name)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    # the handlers work same as MocaConfig, only the effective changes are delivered.
+    add_handler = MocaConfig.add_handler
+    remove_handler = MocaConfig.remove_handler
+    get_handler = MocaConfig.get_handler
+    get_handler_stats = MocaConfig.get_handler_stats
+    watch = MocaConfig.watch
+    _get_handler_names = MocaConfig._get_handler_names
+    _run_handlers = MocaConfig._run_handlers
+    _call_in_loop = MocaConfig._call_in_loop
+
+
+# reset the locks in the forked child processes.
+if register_at_fork is not None:
+    register_at_fork(after_in_child=MocaLayeredConfig._after_fork_in_child)
+
+# -------------------------------------------------------------------------- MocaLayeredConfig --
@@ -0,0 +1,174 @@
+# Ω*
+#               ■          ■■■■■
+#               ■         ■■   ■■
+#               ■        ■■     ■
+#               ■        ■■
+#     ■■■■■     ■        ■■■
+#    ■■   ■■    ■         ■■■
+#   ■■     ■■   ■          ■■■■
+#   ■■     ■■   ■            ■■■■
+#   ■■■■■■■■■   ■              ■■■
+#   ■■          ■               ■■
+#   ■■          ■               ■■
+#   ■■     ■    ■        ■■     ■■
+#    ■■   ■■    ■   ■■■  ■■■   ■■
+#     ■■■■■     ■   ■■■    ■■■■■
+
+
+"""
+Copyright (c) 2020.1.17 [el.ideal-ideas]
+This software is released under the MIT License.
+see LICENSE.txt or following URL.
+https://www.el-ideal-ideas.com/MocaLog/LICENSE/
+"""
+
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from collections.abc import Mapping, Sequence
+from copy import deepcopy
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- MocaReadOnlyDict --------------------------------------------------------------------------
+
+
+def read_only(value: Any) -> Any:
+    """Return a read-only view of the dictionary or the list, other values are returned as is."""
+    if isinstance(value, dict):
+        return MocaReadOnlyDict(value)
+    elif isinstance(value, list):
+        return MocaReadOnlyList(value)
+    else:
+        return value
+
+
+class MocaReadOnlyDict(Mapping):
+    """
+    A deep read-only view of a config dictionary.
+    The nested dictionaries and lists are returned as read-only views too, so the view can't be used to change
+    the config cache. Creating the view is O(1), the nested views are created when they were accessed.
+    Use copy() to get a mutable deep copy.
+
+    Attributes
+    ----------
+    _data: dict
+        the viewed dictionary, must not be changed.
+    """
+
+    __slots__ = ('_data', )
+
+    def __init__(self,
+                 data: dict):
+        """
+        The initializer of MocaReadOnlyDict class.
+        :param data: the dictionary.
+        """
+        self._data: dict = data
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def __getitem__(self,
+                    key: Any) -> Any:
+        return read_only(self._data[key])
+
+    def __contains__(self,
+                     key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self,
+               other: object) -> bool:
+        if isinstance(other, (MocaReadOnlyDict, dict)):
+            return self._data == (other._data if isinstance(other, MocaReadOnlyDict) else other)
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'MocaReadOnlyDict({self._data!r})'
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def get(self,
+            key: Any,
+            default: Any = None) -> Any:
+        """Return the value, if can't found the value, return default value."""
+        try:
+            return read_only(self._data[key])
+        except KeyError:
+            return default
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def copy(self) -> dict:
+        """Return a mutable deep copy of the dictionary."""
+        return deepcopy(self._data)
+
+
+class MocaReadOnlyList(Sequence):
+    """
+    A deep read-only view of a list in the config.
+
+    Attributes
+    ----------
+    _data: list
+        the viewed list, must not be changed.
+    """
+
+    __slots__ = ('_data', )
+
+    def __init__(self,
+                 data: list):
+        """
+        The initializer of MocaReadOnlyList class.
+        :param data: the list.
+        """
+        self._data: list = data
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def __getitem__(self,
+                    index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return MocaReadOnlyList(self._data[index])
+        return read_only(self._data[index])
+
+    def __iter__(self) -> Iterator:
+        return map(read_only, self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self,
+               other: object) -> bool:
+        if isinstance(other, MocaReadOnlyList):
+            return self._data == other._data
+        elif isinstance(other, list):
+            return self._data == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'MocaReadOnlyList({self._data!r})'
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def copy(self) -> list:
+        """Return a mutable deep copy of the list."""
+        return deepcopy(self._data)
+
+# -------------------------------------------------------------------------- MocaReadOnlyDict --
@@ -24,6 +24,19 @@ https://www.el-ideal-ideas.com/MocaLog/LICENSE/
 
 
 from .MocaConfig import MocaConfig, VERSION
+from .MocaConfigHandle import MocaConfigHandle
+from .MocaConfigSnapshot import MocaConfigSnapshot
+from .MocaReadOnlyDict import MocaReadOnlyDict, MocaReadOnlyList
+from .MocaConfigChange import MocaConfigChange
+from .MocaJsonCodec import MocaJsonCodec, get_json_codec
+try:
+    from .MocaConfigPublisher import MocaConfigPublisher
+    from .MocaConfigSubscriber import MocaConfigSubscriber
+except ImportError:  # multiprocessing.shared_memory needs python 3.8+
+    MocaConfigPublisher = None
+    MocaConfigSubscriber = None
+from .MocaConfigLoadReport import MocaConfigLoadResult, MocaConfigLoadReport
+from .MocaLayeredConfig import MocaLayeredConfig
 
 __copyright__ = 'Copyright (C) 2020.1.17 <el.ideal-ideas: https://www.el-ideal-ideas.com>'
 __version__ = VERSION
@@ -32,4 +45,7 @@ __author__ = 'el.ideal-ideas'
 __author_email__ = 'el.idealideas@gmail.com'
 __url__ = 'https://github.com/el-ideal-ideas/MocaConfig'
 
-__all__ = ['MocaConfig', 'VERSION']
+__all__ = ['MocaConfig', 'MocaConfigHandle', 'MocaConfigSnapshot', 'MocaReadOnlyDict', 'MocaReadOnlyList',
+           'MocaConfigChange', 'MocaJsonCodec', 'get_json_codec',
+           'MocaConfigPublisher', 'MocaConfigSubscriber',
+           'MocaConfigLoadResult', 'MocaConfigLoadReport', 'MocaLayeredConfig', 'VERSION']
@@ -0,0 +1,92 @@
+"""
+The access decision cache of MocaConfig.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from pathlib import Path
+from secrets import token_hex
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestAccessCache --------------------------------------------------------------------------
+
+
+class TestAccessCache(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', '')
+        self.root_pass.start()
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set_access_token('token')
+        self.config.set('_secret', 'S')
+
+    def tearDown(self) -> None:
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self._dir.cleanup()
+
+    def test_wrong_token_is_denied_after_cached_grant(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.assertEqual(self.config.get('_secret', access_token='token'), 'S')
+        self.assertIsNone(self.config.get('_secret', access_token='tokem'))
+        self.assertIsNone(self.config.get('_secret'))
+
+    def test_cache_is_not_keyed_by_secrets(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.config.get('_secret', access_token='token')
+        for key in self.config._privilege_cache:
+            self.assertIsInstance(key, bytes)
+            self.assertNotIn(b'token', key)
+
+    def test_token_change_invalidates_grant(self) -> None:
+        MocaConfig.set_root_pass('root')
+        handle = self.config.handle('_secret', access_token='token')
+        self.assertEqual(handle.value, 'S')
+        self.config.set_access_token('new', root_pass='root')
+        self.assertIsNone(handle.value)
+        self.assertIsNone(self.config.get('_secret', access_token='token'))
+
+    def test_root_pass_invalidates_replaced_instance(self) -> None:
+        replaced = self.config
+        self.assertEqual(replaced.get('_secret'), 'S')  # everyone is privileged without the root password.
+        MocaConfig(replaced.name, self.path, reload_interval=-1)
+        handle = replaced.handle('_secret')
+        self.assertEqual(handle.value, 'S')
+        MocaConfig.set_root_pass('root')
+        self.assertIsNone(replaced.get('_secret'))
+        self.assertIsNone(handle.value)
+
+    def test_concurrent_eviction(self) -> None:
+        MocaConfig.set_root_pass('root')
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(2000):
+                    self.config.get('_secret', access_token=token_hex(4))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.config._privilege_cache), MocaConfig.PRIVILEGE_CACHE_SIZE + 8)
+
+# -------------------------------------------------------------------------- TestAccessCache --
+
+
+if __name__ == '__main__':
+    main()
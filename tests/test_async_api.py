@@ -0,0 +1,131 @@
+"""
+The coroutine versions of MocaConfig. (aget, aset, aremove_config, areload_config, aflush, watch)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from asyncio import ensure_future, gather, run, sleep, wait_for
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import get_ident
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig, MocaConfigChange
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestAsyncApi --------------------------------------------------------------------------
+
+
+class TestAsyncApi(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set('lang', 'ja')
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_aset_and_aget(self) -> None:
+        async def main_coroutine():
+            self.assertTrue(await self.config.aset('lang', 'en'))
+            self.assertEqual(await self.config.aget('lang'), 'en')
+            self.assertEqual(await self.config.aget('port', int, 80), 80)  # the unknown config is saved.
+            self.assertTrue(await self.config.aremove_config('lang'))
+            return await self.config.aget('lang', save_unknown_config=False)
+
+        self.assertIsNone(run(main_coroutine()))
+        self.assertEqual(self.config.get('port'), 80)
+
+    def test_file_write_is_not_on_loop_thread(self) -> None:
+        threads = []
+        write = MocaConfig._write_file_atomic
+
+        def record_thread(*args, **kwargs):
+            threads.append(get_ident())
+            return write(*args, **kwargs)
+
+        async def main_coroutine():
+            await self.config.aset('lang', 'en')
+            await self.config.aget('unknown', default=1)
+            return get_ident()
+
+        with patch.object(MocaConfig, '_write_file_atomic', side_effect=record_thread):
+            loop_thread = run(main_coroutine())
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+    def test_areload_config(self) -> None:
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'fr', '__private__': False}, config_file, indent=2)
+        run(self.config.areload_config())
+        self.assertEqual(self.config.get('lang'), 'fr')
+
+    def test_aflush(self) -> None:
+        config = MocaConfig(uuid4().hex, Path(self._dir.name) / 'wb.json', reload_interval=-1,
+                            write_behind=True, write_behind_delay=60)
+        config.set('lang', 'en')
+        self.assertTrue(run(config.aflush()))
+        with open(str(config.path), mode='r', encoding='utf-8') as config_file:
+            self.assertIn('"lang": "en"', config_file.read())
+
+    def test_concurrent_aset(self) -> None:
+        async def main_coroutine():
+            await gather(*[self.config.aset(f'key{index}', index) for index in range(20)])
+
+        run(main_coroutine())
+        self.assertEqual([self.config.get(f'key{index}') for index in range(20)], list(range(20)))
+
+    def test_watch_delivers_on_loop(self) -> None:
+        async def main_coroutine():
+            changes = self.config.watch('lang')
+            task = ensure_future(changes.__anext__())
+            await sleep(0)
+            await self.config.aset('port', 1)  # not watched.
+            await self.config.aset('lang', 'en')
+            change = await wait_for(task, 3.0)
+            await changes.aclose()
+            return change
+
+        change = run(main_coroutine())
+        self.assertIsInstance(change, MocaConfigChange)
+        self.assertEqual((change.key, change.old_value, change.new_value), ('lang', 'ja', 'en'))
+
+    def test_watch_removes_handler_when_closed(self) -> None:
+        async def main_coroutine():
+            changes = self.config.watch(['lang'])
+            task = ensure_future(changes.__anext__())
+            await sleep(0)
+            self.assertEqual(len(self.config._handlers), 1)
+            task.cancel()
+            await gather(task, return_exceptions=True)
+            await changes.aclose()
+
+        run(main_coroutine())
+        self.assertEqual(self.config._handlers, {})
+
+    def test_watch_maxsize_drops_new_changes(self) -> None:
+        async def main_coroutine():
+            changes = self.config.watch('count', maxsize=2)
+            task = ensure_future(changes.__anext__())
+            await sleep(0)
+            for index in range(5):
+                self.config.set('count', index)
+            values = [(await wait_for(task, 3.0)).new_value]
+            await sleep(0.05)
+            values.append((await wait_for(changes.__anext__(), 3.0)).new_value)
+            await changes.aclose()
+            return values
+
+        self.assertEqual(run(main_coroutine()), [0, 1])
+
+# -------------------------------------------------------------------------- TestAsyncApi --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+The atomic writes of the config file.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import os
+from json import load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main, skipIf
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestAtomicWrite --------------------------------------------------------------------------
+
+
+class TestAtomicWrite(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+        self.path = self.dir / 'config.json'
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def read_file(self, path: Path = None) -> dict:
+        with open(str(path or self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    def test_no_temporary_file_is_left(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        config.set('a', 1)
+        self.assertEqual([item.name for item in self.dir.iterdir()], ['config.json'])
+        self.assertEqual(self.read_file()['a'], 1)
+
+    def test_unchanged_save_is_skipped(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        config.set('a', 1)
+        inode = os.stat(str(self.path)).st_ino
+        config.set('a', 1)
+        self.assertEqual(os.stat(str(self.path)).st_ino, inode)
+
+    def test_permission_is_kept(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        os.chmod(str(self.path), 0o600)
+        config.set('a', 1)
+        self.assertEqual(os.stat(str(self.path)).st_mode & 0o777, 0o600)
+
+    def test_symlink_is_kept(self) -> None:
+        (self.dir / 'data').mkdir()
+        os.symlink('data/config.json', str(self.path))
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        config.set('a', 1)
+        self.assertTrue(self.path.is_symlink())
+        self.assertEqual(self.read_file(self.dir / 'data' / 'config.json')['a'], 1)
+
+    def test_in_place_write_when_directory_is_not_writable(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        inode = os.stat(str(self.path)).st_ino
+        with patch('moca_config.MocaConfig.mkstemp', side_effect=PermissionError(13, 'Permission denied')):
+            self.assertTrue(config.set('a', 'x' * 10))
+            self.assertTrue(config.set('a', 1))
+        self.assertEqual(os.stat(str(self.path)).st_ino, inode)
+        self.assertEqual(self.read_file()['a'], 1)
+
+    @skipIf((not hasattr(os, 'geteuid')) or (os.geteuid() != 0), 'only root can change the owner.')
+    def test_owner_is_kept(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        os.chown(str(self.path), 12345, 23456)
+        config.set('a', 1)
+        file_stat = os.stat(str(self.path))
+        self.assertEqual((file_stat.st_uid, file_stat.st_gid), (12345, 23456))
+
+# -------------------------------------------------------------------------- TestAtomicWrite --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+MocaConfig.batch, set_many and the rollback of the failed writes.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestBatch --------------------------------------------------------------------------
+
+
+def read_in_other_thread(function):
+    result = []
+    thread = Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class TestBatch(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set('a', 0)
+        self.calls = []
+        self.config.add_handler('h', ['a', 'b'], lambda key, old, new: self.calls.append((key, old, new)))
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def read_file(self) -> dict:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    def test_commit(self) -> None:
+        with self.config.batch():
+            self.config.set('a', 1)
+            self.config.set('b', 2)
+            self.assertEqual(self.calls, [])
+            self.assertNotIn('b', self.read_file())
+        self.assertEqual(self.read_file()['b'], 2)
+        self.assertEqual(sorted(self.calls), [('a', 0, 1), ('b', None, 2)])
+
+    def test_other_threads_see_only_committed_values(self) -> None:
+        version = self.config.snapshot().version
+        with self.config.batch():
+            self.config.set('a', 1)
+            self.config.remove_config('a')
+            self.config.set('a', 2)
+            self.assertEqual(self.config.get('a'), 2)  # the thread in the batch reads its own changes.
+            self.assertEqual(read_in_other_thread(lambda: self.config.get('a', save_unknown_config=False)), 0)
+            self.assertEqual(read_in_other_thread(lambda: self.config.get_many({'a': (any, None)})), {'a': 0})
+            self.assertEqual(self.config.snapshot().version, version)
+        self.assertEqual(read_in_other_thread(lambda: self.config.get('a')), 2)
+
+    def test_rollback_on_exception(self) -> None:
+        handle = self.config.handle('a')
+        self.assertEqual(handle.value, 0)
+        with self.assertRaises(RuntimeError):
+            with self.config.batch():
+                self.config.set('a', 1)
+                self.assertEqual(read_in_other_thread(lambda: handle.value), 0)
+                raise RuntimeError
+        self.assertEqual(self.config.get('a'), 0)
+        self.assertEqual(handle.value, 0)
+        self.assertEqual(self.read_file()['a'], 0)
+        self.assertEqual(self.calls, [])
+
+    def test_rollback_on_write_error(self) -> None:
+        seen = []
+        with patch.object(MocaConfig, '_write_file_atomic', side_effect=PermissionError(13, 'Permission denied')):
+            self.config.add_snapshot_listener(lambda version, data: seen.append(data.get('a')))
+            with self.config.batch():
+                self.config.set('a', 1)
+            self.assertFalse(self.config.set('a', 2))
+            self.assertFalse(self.config.set_many({'a': 3, 'b': 3}))
+        self.assertEqual(self.config.status, MocaConfig.PERMISSION_ERROR)
+        self.assertEqual(self.config.get('a'), 0)
+        self.assertEqual(seen, [0])  # the failed values were never published.
+        self.assertEqual(self.calls, [])
+
+    def test_nested_batch_joins_outer(self) -> None:
+        with self.config.batch():
+            with self.config.batch():
+                self.config.set('a', 1)
+            self.assertTrue(self.config.set_many({'b': 2}))
+            self.assertEqual(read_in_other_thread(lambda: self.config.get('a')), 0)
+            self.assertEqual(self.calls, [])
+        self.assertEqual(self.read_file()['a'], 1)
+        self.assertEqual(sorted(self.calls), [('a', 0, 1), ('b', None, 2)])
+
+    def test_unchanged_batch_is_not_published(self) -> None:
+        version = self.config.snapshot().version
+        with self.config.batch():
+            self.config.set('a', 0)
+        self.assertEqual(self.config.snapshot().version, version)
+
+# -------------------------------------------------------------------------- TestBatch --
+
+
+if __name__ == '__main__':
+    main()
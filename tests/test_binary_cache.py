@@ -0,0 +1,101 @@
+"""
+The binary sidecar cache of the config file. (MocaConfig(..., binary_cache=True))
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import os
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestBinaryCache --------------------------------------------------------------------------
+
+
+class TestBinaryCache(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.cache_path = Path(f'{self.path}.mcache')
+        self.write({'lang': 'ja', 'db': {'pool': [1, 2, 3]}})
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def write(self, data: dict) -> None:
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({**data, '__private__': False}, config_file)
+
+    def load(self) -> MocaConfig:
+        return MocaConfig(uuid4().hex, self.path, reload_interval=-1, binary_cache=True)
+
+    def test_second_load_uses_cache(self) -> None:
+        first = self.load()
+        self.assertTrue(self.cache_path.is_file())
+        second = self.load()
+        self.assertEqual(second.get_reload_stats()['parses'], 0)
+        self.assertEqual(second.get_reload_stats()['cache_loads'], 1)
+        self.assertEqual(second.get('db'), first.get('db'))
+        self.assertEqual(second.get('db.pool.2'), 3)
+
+    def test_cache_is_updated_by_set(self) -> None:
+        self.load().set('lang', 'en')
+        config = self.load()
+        self.assertEqual(config.get_reload_stats()['parses'], 0)
+        self.assertEqual(config.get('lang'), 'en')
+
+    def test_stale_cache_is_not_used(self) -> None:
+        self.load()
+        self.write({'lang': 'fr'})
+        config = self.load()
+        self.assertEqual(config.get_reload_stats()['parses'], 1)
+        self.assertEqual(config.get('lang'), 'fr')
+
+    def test_same_size_and_mtime_is_checked_by_hash(self) -> None:
+        self.load()
+        file_stat = os.stat(str(self.path))
+        with open(str(self.path), mode='r+', encoding='utf-8') as config_file:
+            text = config_file.read()
+            config_file.seek(0)
+            config_file.write(text.replace('"ja"', '"fr"'))
+        os.utime(str(self.path), ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+        config = self.load()
+        self.assertEqual(config.get('lang'), 'fr')
+        self.assertEqual(config.get_reload_stats()['cache_loads'], 0)
+
+    def test_broken_cache_is_ignored(self) -> None:
+        self.load()
+        for data in (b'', b'broken', MocaConfig._BINARY_CACHE_HEADER + b'\x00broken'):
+            with self.subTest(data=data):
+                with open(str(self.cache_path), mode='wb') as cache_file:
+                    cache_file.write(data)
+                config = self.load()
+                self.assertEqual(config.get('lang'), 'ja')
+                self.assertEqual(config.get_reload_stats()['cache_loads'], 0)
+
+    def test_cache_is_not_written_without_option(self) -> None:
+        MocaConfig(uuid4().hex, self.path, reload_interval=-1).set('lang', 'en')
+        self.assertFalse(self.cache_path.exists())
+
+    def test_cache_keeps_file_permission(self) -> None:
+        os.chmod(str(self.path), 0o600)
+        self.load()
+        self.assertEqual(os.stat(str(self.cache_path)).st_mode & 0o777, 0o600)
+
+    def test_cache_is_not_used_with_file_password(self) -> None:
+        config = MocaConfig(uuid4().hex, self.path, reload_interval=-1, binary_cache=True, file_password='pass')
+        self.assertEqual(config.get('lang'), 'ja')
+        self.assertFalse(self.cache_path.exists())
+
+# -------------------------------------------------------------------------- TestBinaryCache --
+
+
+if __name__ == '__main__':
+    main()
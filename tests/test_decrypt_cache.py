@@ -0,0 +1,105 @@
+"""
+The cache of the decrypted configs. (set_and_encrypt, get_encrypted_config, clear_decrypt_cache)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump, load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestDecryptCache --------------------------------------------------------------------------
+
+
+class TestDecryptCache(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set_and_encrypt('password', 'secret', 'pass')
+        self.config.set_and_encrypt('db', {'user': 'moca'}, 'pass')
+
+    def tearDown(self) -> None:
+        self.config.clear_decrypt_cache()
+        self._dir.cleanup()
+
+    def test_value_is_encrypted_in_file(self) -> None:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            text = config_file.read()
+        self.assertNotIn('secret', text)
+        self.assertNotIn('moca"', text)
+
+    def test_second_read_is_not_decrypted(self) -> None:
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+        with patch.object(MocaConfig, 'decrypt', side_effect=AssertionError('decrypted again')):
+            self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+
+    def test_cached_container_is_a_copy(self) -> None:
+        value = self.config.get_encrypted_config('db', 'pass')
+        value['user'] = 'changed'
+        self.assertEqual(self.config.get_encrypted_config('db', 'pass'), {'user': 'moca'})
+
+    def test_wrong_password_is_not_served_from_cache(self) -> None:
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+        try:
+            value = self.config.get_encrypted_config('password', 'wrong', save_unknown_config=False)
+        except ValueError:  # the random bytes are not utf-8.
+            value = None
+        self.assertNotEqual(value, 'secret')
+
+    def test_changed_value_is_decrypted_again(self) -> None:
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+        self.config.set_and_encrypt('password', 'new secret', 'pass')
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'new secret')
+
+    def test_reloaded_value_is_decrypted_again(self) -> None:
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+        other = MocaConfig(uuid4().hex, Path(self._dir.name) / 'other.json', reload_interval=-1)
+        other.set_and_encrypt('password', 'other secret', 'pass')
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            data = load(config_file)
+        data['password'] = other.get('password')
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump(data, config_file, indent=2)
+        self.config.reload_config()
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'other secret')
+
+    def test_removed_value_is_dropped(self) -> None:
+        self.config.get_encrypted_config('password', 'pass')
+        self.config.remove_config('password')
+        self.assertEqual(len([entry for entry in self.config._decrypt_cache if entry[0] == 'password']), 0)
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass', default='none',
+                                                          save_unknown_config=False), 'none')
+
+    def test_cache_size_is_limited(self) -> None:
+        with patch.object(MocaConfig, 'DECRYPT_CACHE_SIZE', 3):
+            self.config.set_and_encrypt_many({f'key{index}': index for index in range(5)}, 'pass')
+            for index in range(5):
+                self.assertEqual(self.config.get_encrypted_config(f'key{index}', 'pass'), index)
+            self.assertEqual(len(self.config._decrypt_cache), 3)
+
+    def test_clear_decrypt_cache(self) -> None:
+        self.config.get_encrypted_config('password', 'pass')
+        self.config.clear_decrypt_cache()
+        self.assertEqual(len(self.config._decrypt_cache), 0)
+        self.assertEqual(self.config.get_encrypted_config('password', 'pass'), 'secret')
+
+    def test_set_and_encrypt_many_writes_once(self) -> None:
+        with patch.object(MocaConfig, '_write_file_atomic', wraps=MocaConfig._write_file_atomic) as write:
+            self.assertTrue(self.config.set_and_encrypt_many({'a': 1, 'b': [2]}, 'pass'))
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(self.config.get_encrypted_config('b', 'pass'), [2])
+
+# -------------------------------------------------------------------------- TestDecryptCache --
+
+
+if __name__ == '__main__':
+    main()
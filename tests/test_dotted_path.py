@@ -0,0 +1,107 @@
+"""
+The dotted paths of nested configs. (get('db.pool.size'), set('db.pool.size', 20))
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump, load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestDottedPath --------------------------------------------------------------------------
+
+
+class TestDottedPath(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', '')
+        self.root_pass.start()
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'db': {'pool': {'size': 5}, 'hosts': ['a', 'b'], '_password': 'P'},
+                  'a.b': 'dotted', 'a': {'b': 'nested'}, '__private__': False}, config_file)
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set_access_token('token')
+        self.calls = []
+
+    def tearDown(self) -> None:
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self._dir.cleanup()
+
+    def record(self, key, old_value, new_value) -> None:
+        self.calls.append((key, old_value, new_value))
+
+    def read_file(self) -> dict:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    def test_get_nested_value(self) -> None:
+        self.assertEqual(self.config.get('db.pool.size'), 5)
+        self.assertEqual(self.config.get('db.hosts.1'), 'b')
+        self.assertEqual(self.config.get('db.pool.size', str, auto_convert=True), '5')
+
+    def test_missing_path_returns_default(self) -> None:
+        self.assertEqual(self.config.get('db.pool.max', default=10, save_unknown_config=False), 10)
+        self.assertEqual(self.config.get('db.hosts.5', default='x', save_unknown_config=False), 'x')
+        self.assertEqual(self.config.get('db.pool.size.value', default=0, save_unknown_config=False), 0)
+
+    def test_existing_key_with_dots_wins(self) -> None:
+        self.assertEqual(self.config.get('a.b'), 'dotted')
+        self.config.set('a.b', 'changed')
+        self.assertEqual(self.read_file()['a.b'], 'changed')
+        self.assertEqual(self.config.get('a'), {'b': 'nested'})
+
+    def test_escaped_dot(self) -> None:
+        self.config.set('x', {'y.z': 1})
+        self.assertEqual(self.config.get('x.y\\.z'), 1)
+        self.assertEqual(self.config.get('a\\.b'), 'dotted')
+
+    def test_empty_segment_is_not_a_path(self) -> None:
+        self.assertEqual(MocaConfig._parse_path('db..size'), ('db..size',))
+        self.assertEqual(MocaConfig._parse_path('.db'), ('.db',))
+        self.assertEqual(MocaConfig._parse_path('a\\\\.b'), ('a\\', 'b'))
+
+    def test_set_creates_missing_dictionaries(self) -> None:
+        self.assertTrue(self.config.set('cache.redis.port', 6379))
+        self.assertEqual(self.config.get('cache'), {'redis': {'port': 6379}})
+        self.assertEqual(self.read_file()['cache'], {'redis': {'port': 6379}})
+
+    def test_set_nested_value_keeps_siblings(self) -> None:
+        self.config.set('db.pool.size', 20)
+        self.assertEqual(self.config.get('db.pool'), {'size': 20})
+        self.assertEqual(self.config.get('db.hosts'), ['a', 'b'])
+        self.assertEqual(self.read_file()['db']['pool']['size'], 20)
+
+    def test_set_does_not_change_returned_value(self) -> None:
+        old = self.config.get('db')
+        self.config.set('db.pool.size', 20)
+        self.assertEqual(old['pool']['size'], 5)
+
+    def test_handler_of_top_level_key(self) -> None:
+        self.config.add_handler('h', 'db', self.record)
+        self.config.set('db.pool.size', 20)
+        self.assertEqual(len(self.calls), 1)
+        key, old_value, new_value = self.calls[0]
+        self.assertEqual((key, old_value['pool']['size'], new_value['pool']['size']), ('db', 5, 20))
+
+    def test_private_segment_without_privilege(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.assertIsNone(self.config.get('db._password'))
+        self.assertIsNone(self.config.set('db._password', 'X'))
+        self.assertEqual(self.config.get('db._password', root_pass='root'), 'P')
+        self.assertEqual(self.config.get('db.pool.size'), 5)
+
+# -------------------------------------------------------------------------- TestDottedPath --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+The encrypted config files. (MocaConfig(..., file_password=...))
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestEncryptedFile --------------------------------------------------------------------------
+
+
+class TestEncryptedFile(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+
+    def tearDown(self) -> None:
+        MocaConfig._file_key_cache.clear()
+        self._dir.cleanup()
+
+    def read_bytes(self) -> bytes:
+        with open(str(self.path), mode='rb') as config_file:
+            return config_file.read()
+
+    def load(self, password: str = 'pass') -> MocaConfig:
+        return MocaConfig(uuid4().hex, self.path, reload_interval=-1, file_password=password)
+
+    def test_file_is_encrypted(self) -> None:
+        self.load().set_many({'database_password': 'secret', 'port': 5432})
+        data = self.read_bytes()
+        self.assertTrue(data.startswith(MocaConfig._ENCRYPTED_FILE_MAGIC))
+        for text in (b'secret', b'database_password', b'5432'):
+            self.assertNotIn(text, data)
+
+    def test_values_are_read_back(self) -> None:
+        self.load().set_many({'lang': 'ja', 'db': {'pool': 5}})
+        config = self.load()
+        self.assertEqual(config.get('lang'), 'ja')
+        self.assertEqual(config.get('db.pool'), 5)
+        self.assertEqual(config.status, MocaConfig.CORRECT)
+
+    def test_plain_file_is_encrypted_when_loaded(self) -> None:
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'ja', '__private__': False}, config_file)
+        config = self.load()
+        self.assertEqual(config.get('lang'), 'ja')
+        self.assertTrue(self.read_bytes().startswith(MocaConfig._ENCRYPTED_FILE_MAGIC))
+        self.assertEqual(self.load().get('lang'), 'ja')
+
+    def test_wrong_password_never_overwrites_file(self) -> None:
+        self.load().set('lang', 'ja')
+        data = self.read_bytes()
+        config = self.load('wrong')
+        self.assertEqual(config.status, MocaConfig.DECRYPT_ERROR)
+        self.assertFalse(config.set('lang', 'en'))
+        self.assertEqual(config.status, MocaConfig.DECRYPT_ERROR)
+        self.assertEqual(self.read_bytes(), data)
+        self.assertEqual(self.load().get('lang'), 'ja')
+
+    def test_broken_file(self) -> None:
+        self.load().set('lang', 'ja')
+        data = bytearray(self.read_bytes())
+        data[-1] ^= 1
+        with open(str(self.path), mode='wb') as config_file:
+            config_file.write(bytes(data))
+        self.assertEqual(self.load().status, MocaConfig.DECRYPT_ERROR)
+        with open(str(self.path), mode='wb') as config_file:
+            config_file.write(MocaConfig._ENCRYPTED_FILE_MAGIC)
+        self.assertEqual(self.load().status, MocaConfig.DECRYPT_ERROR)
+
+    def test_same_content_is_not_written_again(self) -> None:
+        config = self.load()
+        config.set('lang', 'ja')
+        data = self.read_bytes()
+        config.set('lang', 'ja')
+        self.assertEqual(self.read_bytes(), data)  # a new nonce would change the file.
+
+    def test_reload_after_change_by_other_instance(self) -> None:
+        config = self.load()
+        config.set('lang', 'ja')
+        self.load().set('lang', 'en')
+        config.reload_config()
+        self.assertEqual(config.get('lang'), 'en')
+
+    def test_key_is_derived_once(self) -> None:
+        config = self.load()
+        with patch('moca_config.MocaConfig.PBKDF2', side_effect=AssertionError('derived again')):
+            for index in range(5):
+                config.set('count', index)
+            self.assertEqual(self.load().get('count'), 4)
+        self.assertEqual(len(MocaConfig._file_key_cache), 1)
+
+    def test_clear_decrypt_cache_drops_keys(self) -> None:
+        config = self.load()
+        config.set('lang', 'ja')
+        config.clear_decrypt_cache()
+        self.assertEqual(len(MocaConfig._file_key_cache), 0)
+        config.set('lang', 'en')
+        self.assertEqual(self.load().get('lang'), 'en')
+
+# -------------------------------------------------------------------------- TestEncryptedFile --
+
+
+if __name__ == '__main__':
+    main()
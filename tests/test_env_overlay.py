@@ -0,0 +1,173 @@
+"""
+The precedence rules of the environment variable overlay. (MocaConfig(..., env_prefix=...))
+environment variables > set() and the config file > the default value of get()
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from typing import *
+from json import dump, load
+from os import environ
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestEnvOverlay --------------------------------------------------------------------------
+
+
+class TestEnvOverlay(TestCase):
+
+    PREFIX: str = 'MOCA_TEST_ENV'
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'db': {'pool_size': 5, 'host': 'localhost'}, 'debug': False, 'port': 8080}, config_file)
+        self.env = patch.dict(environ, {f'{self.PREFIX}__DB__POOL_SIZE': '20',
+                                        f'{self.PREFIX}__DEBUG': 'true',
+                                        f'{self.PREFIX}__NAME': 'moca'})
+        self.env.start()
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1, env_prefix=self.PREFIX)
+
+    def tearDown(self) -> None:
+        self.env.stop()
+        self._dir.cleanup()
+
+    def read_file(self) -> dict:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    # ----------------------------------------------------------------------------
+    # ----------------------------------------------------------------------------
+
+    def test_env_overrides_file(self) -> None:
+        self.assertIs(self.config.get('debug'), True)
+        self.assertEqual(self.config.get('db.pool_size'), 20)
+        self.assertEqual(self.config.get('port'), 8080)
+
+    def test_nested_env_is_merged_into_file_value(self) -> None:
+        self.assertEqual(self.config.get('db'), {'pool_size': 20, 'host': 'localhost'})
+
+    def test_env_overrides_default(self) -> None:
+        self.assertEqual(self.config.get('name', str, 'default'), 'moca')
+
+    def test_default_is_used_without_env_and_file(self) -> None:
+        self.assertEqual(self.config.get('unknown', str, 'default'), 'default')
+
+    def test_env_is_never_written_to_file(self) -> None:
+        self.config.set('port', 9090)
+        data = self.read_file()
+        self.assertIs(data['debug'], False)
+        self.assertEqual(data['db']['pool_size'], 5)
+        self.assertNotIn('name', data)
+
+    def test_set_on_shadowed_key_changes_file_only(self) -> None:
+        self.assertTrue(self.config.set('debug', 'off'))
+        self.assertEqual(self.config.get('debug'), 'true')  # converted to the type of the new file value.
+        self.assertEqual(self.read_file()['debug'], 'off')
+
+    def test_set_nested_path_on_shadowed_key(self) -> None:
+        self.assertTrue(self.config.set('db.pool_size', 7))
+        self.assertTrue(self.config.set('db.host', 'example.com'))
+        self.assertEqual(self.config.get('db'), {'pool_size': 20, 'host': 'example.com'})
+        self.assertEqual(self.read_file()['db'], {'pool_size': 7, 'host': 'example.com'})
+
+    def test_set_wins_when_env_is_removed(self) -> None:
+        self.config.set('debug', 'off')
+        del environ[f'{self.PREFIX}__DEBUG']
+        self.assertTrue(self.config.refresh_env())
+        self.assertEqual(self.config.get('debug'), 'off')
+
+    def test_remove_config_on_shadowed_key(self) -> None:
+        self.assertTrue(self.config.remove_config('debug'))
+        self.assertEqual(self.config.get('debug'), 'true')  # no file value, kept as a string.
+        self.assertNotIn('debug', self.read_file())
+
+    def test_env_is_read_only_on_refresh(self) -> None:
+        environ[f'{self.PREFIX}__PORT'] = '1234'
+        self.assertEqual(self.config.get('port'), 8080)
+        self.assertTrue(self.config.refresh_env())
+        self.assertEqual(self.config.get('port'), 1234)
+
+    def test_env_overrides_reloaded_file(self) -> None:
+        data = self.read_file()
+        data['debug'] = True
+        data['db']['pool_size'] = 6
+        data['port'] = 80
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump(data, config_file, indent=2)
+        self.config.reload_config()
+        self.assertEqual(self.config.get('port'), 80)
+        self.assertEqual(self.config.get('db.pool_size'), 20)
+
+# -------------------------------------------------------------------------- TestEnvOverlay --
+
+# -- TestEnvConversion --------------------------------------------------------------------------
+
+
+class TestEnvConversion(TestCase):
+
+    PREFIX: str = 'MOCA_TEST_CONV'
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def load(self, data: dict, env: Dict[str, str]) -> MocaConfig:
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump(data, config_file)
+        with patch.dict(environ, {f'{self.PREFIX}__{name}': text for name, text in env.items()}):
+            return MocaConfig(uuid4().hex, self.path, reload_interval=-1, env_prefix=self.PREFIX)
+
+    def test_string_is_kept(self) -> None:
+        config = self.load({'version': '1.0', 'code': 'abc'}, {'VERSION': '1.10', 'CODE': '007'})
+        self.assertEqual(config.get('version'), '1.10')
+        self.assertEqual(config.get('code'), '007')
+
+    def test_converted_to_file_type(self) -> None:
+        config = self.load({'port': 80, 'ratio': 0.5, 'debug': False, 'hosts': ['a'], 'db': {'host': 'h'}},
+                           {'PORT': '007', 'RATIO': '1.10', 'DEBUG': 'yes', 'HOSTS': '["b", "c"]',
+                            'DB': '{"host": "x"}'})
+        self.assertEqual(config.get('port'), 7)
+        self.assertEqual(config.get('ratio'), 1.1)
+        self.assertIs(config.get('debug'), True)
+        self.assertEqual(config.get('hosts'), ['b', 'c'])
+        self.assertEqual(config.get('db'), {'host': 'x'})
+
+    def test_not_convertible_value_is_a_string(self) -> None:
+        config = self.load({'port': 80, 'debug': False, 'hosts': ['a']},
+                           {'PORT': 'auto', 'DEBUG': 'maybe', 'HOSTS': '{"a": 1}'})
+        self.assertEqual(config.get('port'), 'auto')
+        self.assertEqual(config.get('debug'), 'maybe')
+        self.assertEqual(config.get('hosts'), '{"a": 1}')
+
+    def test_new_key_is_a_lower_cased_string(self) -> None:
+        config = self.load({}, {'NEW__COUNT': '20'})
+        self.assertEqual(config.get('new'), {'count': '20'})
+
+    def test_upper_case_keys_are_overridden(self) -> None:
+        config = self.load({'LogLevel': 'info', 'DB': {'Host': 'h', 'PORT': 1}},
+                           {'LOGLEVEL': 'debug', 'db__host': 'x', 'DB__Port': '2'})
+        self.assertEqual(config.get('LogLevel'), 'debug')
+        self.assertEqual(config.get('DB'), {'Host': 'x', 'PORT': 2})
+        self.assertFalse({'loglevel', 'db'} & set(config.get_all_config_key()))  # no lower-cased copies.
+        config.set('LogLevel', 'warning')
+        self.assertEqual(config.get('LogLevel'), 'debug')
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            self.assertEqual(load(config_file)['LogLevel'], 'warning')
+
+# -------------------------------------------------------------------------- TestEnvConversion --
+
+
+if __name__ == '__main__':
+    main()
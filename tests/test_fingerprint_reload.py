@@ -0,0 +1,117 @@
+"""
+The change detection of the reload loop, the fingerprint (size, mtime, inode) and the content hash.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import os
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestFingerprintReload --------------------------------------------------------------------------
+
+
+class TestFingerprintReload(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.write({'lang': 'ja'})
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.calls = []
+        self.config.add_handler('h', 'lang', self.record)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def record(self, key, old_value, new_value) -> None:
+        self.calls.append((key, old_value, new_value))
+
+    def write(self, data: dict, age: float = 10.0) -> None:
+        """Write the config file with a old mtime, out of the racy window."""
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({**data, '__private__': False}, config_file)
+        mtime = time() - age
+        os.utime(str(self.path), (mtime, mtime))
+
+    def stats_delta(self, function) -> dict:
+        before = self.config.get_reload_stats()
+        function()
+        after = self.config.get_reload_stats()
+        return {key: after[key] - before[key] for key in after if after[key] != before[key]}
+
+    def test_unchanged_file_is_not_read(self) -> None:
+        mtime = time() - 10.0  # the file saved by the initializer is in the racy window.
+        os.utime(str(self.path), (mtime, mtime))
+        self.config.reload_config()
+        self.assertEqual(self.stats_delta(self.config.reload_config), {'checks': 1, 'unchanged': 1})
+
+    def test_touched_file_is_not_parsed(self) -> None:
+        self.config.reload_config()
+        os.utime(str(self.path), None)
+        self.assertEqual(self.stats_delta(self.config.reload_config), {'checks': 1, 'skipped_parses': 1})
+        self.assertEqual(self.calls, [])
+
+    def test_changed_file_is_parsed(self) -> None:
+        self.config.reload_config()
+        self.write({'lang': 'en'}, age=5.0)
+        self.assertEqual(self.stats_delta(self.config.reload_config), {'checks': 1, 'parses': 1})
+        self.assertEqual(self.config.get('lang'), 'en')
+        self.assertEqual(self.calls, [('lang', 'ja', 'en')])
+
+    def test_same_size_and_mtime_in_racy_window(self) -> None:
+        # two writes in the same timestamp tick with the same size, only the content hash can see the change.
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'ja', '__private__': False}, config_file)
+        mtime_ns = os.stat(str(self.path)).st_mtime_ns
+        self.config.reload_config()
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'fr', '__private__': False}, config_file)
+        os.utime(str(self.path), ns=(mtime_ns, mtime_ns))
+        self.config.reload_config()
+        self.assertEqual(self.config.get('lang'), 'fr')
+
+    def test_own_write_is_not_parsed_again(self) -> None:
+        self.config.set('lang', 'en')
+        self.assertNotIn('parses', self.stats_delta(self.config.reload_config))
+        self.assertEqual(self.calls, [('lang', 'ja', 'en')])
+
+    def test_replaced_file_is_parsed(self) -> None:
+        self.config.reload_config()
+        other = self.path.with_name('other.json')
+        with open(str(other), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'de', '__private__': False}, config_file)
+        os.replace(str(other), str(self.path))
+        self.config.reload_config()
+        self.assertEqual(self.config.get('lang'), 'de')
+
+    def test_broken_file_keeps_cache(self) -> None:
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            config_file.write('{"lang": ')
+        self.config.reload_config()
+        self.assertEqual(self.config.status, MocaConfig.DECODE_ERROR)
+        self.assertEqual(self.config.get('lang'), 'ja')
+        self.write({'lang': 'en'})
+        self.config.reload_config()
+        self.assertEqual(self.config.status, MocaConfig.CORRECT)
+        self.assertEqual(self.config.get('lang'), 'en')
+
+    def test_missing_file(self) -> None:
+        os.remove(str(self.path))
+        self.config.reload_config()
+        self.assertEqual(self.config.status, MocaConfig.FILE_NOT_FOUND)
+        self.assertEqual(self.config.get('lang'), 'ja')
+
+# -------------------------------------------------------------------------- TestFingerprintReload --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+The config instances in the forked child processes. (MocaConfig.set_fork_mode)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import os
+from json import dumps, loads
+from pathlib import Path
+from select import select
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import monotonic, perf_counter, sleep
+from unittest import TestCase, main, skipIf
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestFork --------------------------------------------------------------------------
+
+
+def run_in_child(function, timeout: float = 10.0):
+    """Run the function in a forked child, and return the json result."""
+    reader, writer = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(reader)
+            os.write(writer, dumps(function()).encode())
+        finally:
+            os._exit(0)
+    os.close(writer)
+    try:
+        readable, _, _ = select([reader], [], [], timeout)
+        data = b''
+        if readable:
+            chunk = os.read(reader, 65536)
+            while chunk:
+                data += chunk
+                chunk = os.read(reader, 65536)
+        return loads(data) if data else None
+    finally:
+        os.close(reader)
+        os.waitpid(pid, 0)
+
+
+def wait_for(function, expected, timeout: float = 5.0):
+    deadline = monotonic() + timeout
+    value = function()
+    while (value != expected) and (monotonic() < deadline):
+        sleep(0.01)
+        value = function()
+    return value
+
+
+@skipIf(not hasattr(os, 'register_at_fork'), 'os.fork is not available.')
+class TestFork(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+
+    def tearDown(self) -> None:
+        MocaConfig.set_fork_mode('watch')
+        self._dir.cleanup()
+
+    def check_child_sees_parent_change(self, mode: str, **kwargs) -> None:
+        MocaConfig.set_fork_mode(mode)
+        # the children in notify mode never poll by themselves while the parent is alive.
+        interval = 0.05 if mode == 'watch' else 60
+        config = MocaConfig(uuid4().hex, self.dir / f'{mode}.json', reload_interval=interval, **kwargs)
+        config.set('v', 1)
+        config.flush()
+
+        def parent_change():
+            sleep(0.1)  # let the child start.
+            config.set('v', 2)
+
+        thread = Thread(target=parent_change)
+        thread.start()
+        value = run_in_child(lambda: wait_for(lambda: config.get('v'), 2))
+        thread.join()
+        config.stop_auto_reload()
+        self.assertEqual(value, 2)
+
+    def test_watch_mode(self) -> None:
+        self.check_child_sees_parent_change('watch')
+
+    def test_watch_mode_with_write_behind(self) -> None:
+        self.check_child_sees_parent_change('watch', write_behind=True, write_behind_delay=0.05)
+
+    def test_notify_mode(self) -> None:
+        self.check_child_sees_parent_change('notify')
+
+    def test_notify_mode_with_write_behind(self) -> None:
+        self.check_child_sees_parent_change('notify', write_behind=True, write_behind_delay=0.05)
+
+    def test_child_startup_does_not_parse_again(self) -> None:
+        configs = []
+        for index in range(50):
+            config = MocaConfig(uuid4().hex, self.dir / f'{index}.json', reload_interval=-1)
+            config.set_many({f'key{number}': number for number in range(200)})
+            configs.append(config)
+        parses = sum(config.get_reload_stats()['parses'] for config in configs)
+        for mode in ('watch', 'notify'):
+            MocaConfig.set_fork_mode(mode)
+            start = perf_counter()
+
+            def child():
+                values = [config.get('key199') for config in configs]
+                return {
+                    'startup': perf_counter() - start,  # monotonic clock, shared with the parent.
+                    'parses': sum(config.get_reload_stats()['parses'] for config in configs),
+                    'values': values,
+                }
+
+            result = run_in_child(child)
+            self.assertEqual(result['values'], [199] * 50)
+            self.assertEqual(result['parses'], parses, mode)
+            self.assertLess(result['startup'], 2.0, mode)
+
+# -------------------------------------------------------------------------- TestFork --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+The bulk reads and writes of MocaConfig. (get_many, set_many)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestGetMany --------------------------------------------------------------------------
+
+
+class TestGetMany(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', '')
+        self.root_pass.start()
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set_access_token('token')
+        self.config.set_many({'port': '8080', 'lang': 'ja', 'db': {'host': 'h'}, '_secret': 'S'})
+        self.calls = []
+
+    def tearDown(self) -> None:
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self._dir.cleanup()
+
+    def record(self, key, old_value, new_value) -> None:
+        self.calls.append((key, old_value, new_value))
+
+    def read_file(self) -> dict:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    def test_same_as_get(self) -> None:
+        keys = {'port': (int, 0), 'lang': (str, 'english'), 'db.host': (str, ''), 'unknown': (str, 'x')}
+        expected = {key: self.config.get(key, res_type, default, auto_convert=True, save_unknown_config=False)
+                    for key, (res_type, default) in keys.items()}
+        self.assertEqual(self.config.get_many(keys, auto_convert=True, save_unknown_config=False), expected)
+        self.assertEqual(expected, {'port': 8080, 'lang': 'ja', 'db.host': 'h', 'unknown': 'x'})
+
+    def test_missing_defaults_are_saved_with_one_write(self) -> None:
+        with patch.object(MocaConfig, '_write_file_atomic', wraps=MocaConfig._write_file_atomic) as write:
+            values = self.config.get_many({'a': (int, 1), 'b': (int, 2), 'lang': (str, '')})
+        self.assertEqual(values, {'a': 1, 'b': 2, 'lang': 'ja'})
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual((self.read_file()['a'], self.read_file()['b']), (1, 2))
+
+    def test_private_keys_without_privilege(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.assertEqual(self.config.get_many({'_secret': (any, None), 'lang': (any, None)}),
+                         {'_secret': None, 'lang': 'ja'})
+        self.assertEqual(self.config.get_many({'_secret': (any, None)}, root_pass='root'), {'_secret': 'S'})
+
+    def test_private_path_without_privilege(self) -> None:
+        self.config.set('db._password', 'P')
+        MocaConfig.set_root_pass('root')
+        self.assertEqual(self.config.get_many({'db._password': (any, None)}), {'db._password': None})
+
+    def test_set_many_writes_once_and_runs_handlers_after(self) -> None:
+        self.config.add_handler('h', ['a', 'b'], self.record)
+        with patch.object(MocaConfig, '_write_file_atomic', wraps=MocaConfig._write_file_atomic) as write:
+            self.assertTrue(self.config.set_many({'a': 1, 'b': 2}))
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(sorted(self.calls), [('a', None, 1), ('b', None, 2)])
+
+    def test_set_many_changes_nothing_without_privilege(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.assertIsNone(self.config.set_many({'lang': 'en', '_secret': 'X'}))
+        self.assertEqual(self.config.get('lang'), 'ja')
+        self.assertEqual(self.config.get('_secret', root_pass='root'), 'S')
+
+    def test_set_many_keeps_cache_when_write_failed(self) -> None:
+        with patch.object(MocaConfig, '_write_file_atomic', side_effect=OSError('disk full')):
+            self.assertFalse(self.config.set_many({'lang': 'en', 'port': 1}))
+        self.assertEqual(self.config.get_many({'lang': (any, None), 'port': (any, None)}),
+                         {'lang': 'ja', 'port': '8080'})
+
+# -------------------------------------------------------------------------- TestGetMany --
+
+
+if __name__ == '__main__':
+    main()
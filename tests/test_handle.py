@@ -0,0 +1,87 @@
+"""
+The config handles for hot-path reads. (MocaConfig.handle)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig, MocaConfigHandle
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestHandle --------------------------------------------------------------------------
+
+
+class TestHandle(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', '')
+        self.root_pass.start()
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1)
+        self.config.set_access_token('token')
+        self.config.set_many({'port': '8080', 'lang': 'ja', '_secret': 'S'})
+
+    def tearDown(self) -> None:
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self._dir.cleanup()
+
+    def test_value_is_same_as_get(self) -> None:
+        handle = self.config.handle('port', int, 0)
+        self.assertIsInstance(handle, MocaConfigHandle)
+        self.assertEqual(handle.key, 'port')
+        self.assertEqual(handle.value, self.config.get('port', int, 0, auto_convert=True))
+        self.assertEqual(handle.value, 8080)
+
+    def test_value_is_converted_once(self) -> None:
+        handle = self.config.handle('port', int, 0)
+        handle.value
+        with patch.object(MocaConfig, '_convert_value', side_effect=AssertionError('converted again')):
+            for _ in range(10):
+                self.assertEqual(handle.value, 8080)
+
+    def test_set_updates_value(self) -> None:
+        handle = self.config.handle('lang', str, 'english')
+        self.assertEqual(handle.value, 'ja')
+        self.config.set('lang', 'en')
+        self.assertEqual(handle.value, 'en')
+        self.config.remove_config('lang')
+        self.assertEqual(handle.value, 'english')
+
+    def test_reload_updates_value(self) -> None:
+        handle = self.config.handle('lang')
+        self.assertEqual(handle.value, 'ja')
+        with open(str(self.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'fr'}, config_file, indent=4)
+        self.config.reload_config()
+        self.assertEqual(handle.value, 'fr')
+
+    def test_default_when_not_convertible(self) -> None:
+        self.config.set('port', 'auto')
+        self.assertEqual(self.config.handle('port', int, 80).value, 80)
+
+    def test_private_key_without_privilege(self) -> None:
+        MocaConfig.set_root_pass('root')
+        self.assertIsNone(self.config.handle('_secret').value)
+        self.assertEqual(self.config.handle('_secret', root_pass='root').value, 'S')
+
+    def test_private_config_without_privilege(self) -> None:
+        self.config.set_config_private()
+        handle = self.config.handle('lang', default='english')
+        self.assertEqual(handle.value, 'ja')  # everyone is privileged without the root password.
+        MocaConfig.set_root_pass('root')
+        self.assertEqual(handle.value, 'english')
+
+# -------------------------------------------------------------------------- TestHandle --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+The handler index of MocaConfig, the exact keys and the opt-in wildcard patterns.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from asyncio import ensure_future, run, sleep, wait_for
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestHandlerIndex --------------------------------------------------------------------------
+
+
+class TestHandlerIndex(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.config = MocaConfig(uuid4().hex, Path(self._dir.name) / 'config.json', reload_interval=-1)
+        self.calls = []
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def record(self, key, old_value, new_value) -> None:
+        self.calls.append((key, old_value, new_value))
+
+    def test_literal_key_with_glob_characters(self) -> None:
+        self.config.add_handler('h', 'a[1]', self.record)
+        self.config.set('a1', 1)
+        self.assertEqual(self.calls, [])
+        self.config.set('a[1]', 1)
+        self.assertEqual(self.calls, [('a[1]', None, 1)])
+
+    def test_literal_star_is_not_a_prefix(self) -> None:
+        self.config.add_handler('h', ['db_*', 'x?'], self.record)
+        self.config.set_many({'db_host': 'h', 'xy': 1})
+        self.assertEqual(self.calls, [])
+        self.config.set('db_*', 1)
+        self.assertEqual(self.calls, [('db_*', None, 1)])
+
+    def test_prefix_pattern(self) -> None:
+        self.config.add_handler('h', 'db_*', self.record, pattern=True)
+        self.config.set('db_host', 'h')
+        self.config.set('lang', 'ja')
+        self.assertEqual(self.calls, [('db_host', None, 'h')])
+
+    def test_fnmatch_pattern(self) -> None:
+        self.config.add_handler('h', 'db_?_host', self.record, pattern=True)
+        self.config.set('db_1_host', 'h')
+        self.config.set('db_10_host', 'h')
+        self.assertEqual(self.calls, [('db_1_host', None, 'h')])
+
+    def test_remove_handler(self) -> None:
+        self.config.add_handler('a', 'a[1]', self.record)
+        self.config.add_handler('b', 'db_*', self.record, pattern=True)
+        self.config.add_handler('c', '*', self.record, pattern=True)
+        for name in ('a', 'b', 'c'):
+            self.config.remove_handler(name)
+        self.assertEqual((self.config._handled_keys, self.config._handled_patterns), ({}, {}))
+        self.assertEqual(len(self.config._handled_prefixes), 0)
+        self.config.set('a[1]', 1)
+        self.config.set('db_host', 1)
+        self.assertEqual(self.calls, [])
+
+    def test_watch_all_keys_by_default(self) -> None:
+        async def watch_one():
+            changes = self.config.watch()
+            task = ensure_future(changes.__anext__())
+            await sleep(0)  # the handler is added at the first step of the generator.
+            self.config.set('anything', 1)
+            change = await wait_for(task, 3.0)
+            await changes.aclose()
+            return change.key, change.new_value
+
+        self.assertEqual(run(watch_one()), ('anything', 1))
+
+# -------------------------------------------------------------------------- TestHandlerIndex --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+MocaHandlerPool, the bounded thread pool of the config handlers.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+import threading
+from threading import Event
+from time import sleep
+from unittest import TestCase, main
+from moca_config.MocaHandlerPool import MocaHandlerPool
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestHandlerPool --------------------------------------------------------------------------
+
+
+class TestHandlerPool(TestCase):
+
+    def test_same_key_runs_in_order(self) -> None:
+        pool = MocaHandlerPool(max_workers=4)
+        calls = []
+        done = Event()
+        for index in range(50):
+            pool.submit('key', 'h', lambda key, value: calls.append(value), (index,), {})
+        pool.submit('key', 'h', lambda key: done.set(), (), {})
+        self.assertTrue(done.wait(5))
+        self.assertEqual(calls, list(range(50)))
+
+    def test_failure_is_counted(self) -> None:
+        pool = MocaHandlerPool(max_workers=1)
+        done = Event()
+
+        def broken(key):
+            raise ValueError(key)
+
+        pool.submit('key', 'broken', broken, (), {})
+        pool.submit('key', 'ok', lambda key: done.set(), (), {})
+        self.assertTrue(done.wait(5))
+        sleep(0.05)
+        stats = pool.get_stats()
+        self.assertEqual(stats['broken']['failures'], 1)
+        self.assertEqual(stats['ok']['failures'], 0)
+
+    def test_timeout_does_not_block_the_key(self) -> None:
+        pool = MocaHandlerPool(max_workers=2, timeout=0.1)
+        release = Event()
+        done = Event()
+        pool.submit('key', 'slow', lambda key: release.wait(5), (), {})
+        pool.submit('key', 'next', lambda key: done.set(), (), {})
+        self.assertTrue(done.wait(2))
+        release.set()
+        self.assertEqual(pool.get_stats()['slow']['timeouts'], 1)
+
+    def test_base_exception_is_not_swallowed(self) -> None:
+        pool = MocaHandlerPool(max_workers=1)
+        raised = []
+        done = Event()
+        old_hook = threading.excepthook
+        threading.excepthook = lambda args: raised.append(args.exc_type)
+        try:
+            def interrupt(key):
+                raise KeyboardInterrupt()
+
+            pool.submit('key', 'interrupt', interrupt, (), {})
+            pool.submit('key', 'next', lambda key: done.set(), (), {})
+            self.assertTrue(done.wait(5))
+            sleep(0.05)
+        finally:
+            threading.excepthook = old_hook
+        self.assertEqual(raised, [KeyboardInterrupt])
+        self.assertEqual(pool.get_stats()['next']['calls'], 1)
+
+# -------------------------------------------------------------------------- TestHandlerPool --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+The inotify change detection backend. (MocaConfig(..., watch_backend='inotify'))
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from os import replace, symlink
+from pathlib import Path
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from time import monotonic, sleep
+from unittest import TestCase, main, skipIf
+from uuid import uuid4
+from moca_config import MocaConfig
+from moca_config.MocaConfigWatcher import MocaConfigWatcher, MocaConfigInotifyWatcher
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestInotifyWatcher --------------------------------------------------------------------------
+
+
+def wait_for(function, expected, timeout: float = 3.0):
+    deadline = monotonic() + timeout
+    value = function()
+    while (value != expected) and (monotonic() < deadline):
+        sleep(0.02)
+        value = function()
+    return value
+
+
+@skipIf(MocaConfigInotifyWatcher.default() is None, 'inotify is not available.')
+class TestInotifyWatcher(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    @staticmethod
+    def write(path: Path, value: int) -> None:
+        with open(str(path), mode='w') as config_file:
+            dump({'v': value}, config_file)
+
+    def test_default_backend_is_poll(self) -> None:
+        config = MocaConfig(uuid4().hex, self.dir / 'config.json', reload_interval=-1)
+        self.assertIsInstance(config._watcher, MocaConfigWatcher)
+
+    def test_reload_on_write(self) -> None:
+        path = self.dir / 'config.json'
+        self.write(path, 1)
+        config = MocaConfig(uuid4().hex, path, reload_interval=60, watch_backend='inotify')
+        self.assertIsInstance(config._watcher, MocaConfigInotifyWatcher)
+        self.write(path, 2)
+        self.assertEqual(wait_for(lambda: config.get('v'), 2), 2)
+        config.stop_auto_reload()
+
+    def test_reload_on_rename(self) -> None:
+        path = self.dir / 'config.json'
+        self.write(path, 1)
+        config = MocaConfig(uuid4().hex, path, reload_interval=60, watch_backend='inotify')
+        self.write(self.dir / 'config.json.swp', 2)
+        replace(str(self.dir / 'config.json.swp'), str(path))
+        self.assertEqual(wait_for(lambda: config.get('v'), 2), 2)
+        config.stop_auto_reload()
+
+    def test_reload_on_symlink_swap(self) -> None:
+        # the layout of a Kubernetes ConfigMap volume.
+        (self.dir / 'ts1').mkdir()
+        self.write(self.dir / 'ts1' / 'config.json', 1)
+        symlink('ts1', str(self.dir / '..data'))
+        symlink('..data/config.json', str(self.dir / 'config.json'))
+        config = MocaConfig(uuid4().hex, self.dir / 'config.json', reload_interval=60, watch_backend='inotify')
+        self.assertEqual(config.get('v'), 1)
+        previous = 'ts1'
+        for value in (2, 3):
+            current = f'ts{value}'
+            (self.dir / current).mkdir()
+            self.write(self.dir / current / 'config.json', value)
+            symlink(current, str(self.dir / '..tmp'))
+            replace(str(self.dir / '..tmp'), str(self.dir / '..data'))
+            rmtree(str(self.dir / previous))
+            previous = current
+            self.assertEqual(wait_for(lambda: config.get('v'), value), value)
+        self.assertTrue((self.dir / 'config.json').is_symlink())
+        config.stop_auto_reload()
+
+# -------------------------------------------------------------------------- TestInotifyWatcher --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+The json codecs of MocaConfig. (MocaConfig(..., json_codec=...), MocaConfig.set_default_json_codec)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import JSONDecodeError
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main, skipIf
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig, MocaJsonCodec, get_json_codec
+from moca_config.MocaJsonCodec import orjson, ujson, simdjson
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestJsonCodec --------------------------------------------------------------------------
+
+
+INSTALLED = ['json'] + [name for name, module in (('orjson', orjson), ('ujson', ujson), ('simdjson', simdjson))
+                        if module is not None]
+
+
+class TestJsonCodec(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+        self.default_codec = patch.object(MocaConfig, '_default_json_codec', MocaConfig._default_json_codec)
+        self.default_codec.start()
+
+    def tearDown(self) -> None:
+        self.default_codec.stop()
+        self._dir.cleanup()
+
+    def test_get_json_codec(self) -> None:
+        self.assertEqual(get_json_codec('json').name, 'json')
+        self.assertEqual(get_json_codec('auto').name, INSTALLED[1] if len(INSTALLED) > 1 else 'json')
+        with self.assertRaises(ValueError):
+            get_json_codec('yaml')
+
+    @skipIf(ujson is not None, 'ujson is installed.')
+    def test_not_installed_codec(self) -> None:
+        with self.assertRaises(ImportError):
+            get_json_codec('ujson')
+
+    def test_codecs_accept_same_data(self) -> None:
+        value = {'int': 2 ** 70, 'float': float('nan'), 'text': '日本語', 'list': [1, None, True], 'nested': {'a': {}}}
+        text = MocaJsonCodec().dumps(value)
+        for name in INSTALLED:
+            with self.subTest(codec=name):
+                codec = get_json_codec(name)
+                parsed = codec.loads(text)
+                self.assertEqual(parsed['int'], 2 ** 70)
+                self.assertNotEqual(parsed['float'], parsed['float'])  # NaN
+                self.assertEqual({key: parsed[key] for key in ('text', 'list', 'nested')},
+                                 {key: value[key] for key in ('text', 'list', 'nested')})
+                if name != 'simdjson':
+                    self.assertEqual(codec.loads(codec.dumps({1: 'a'})), {'1': 'a'})
+
+    def test_invalid_json_raises(self) -> None:
+        for name in INSTALLED:
+            with self.subTest(codec=name):
+                with self.assertRaises(JSONDecodeError):
+                    get_json_codec(name).loads('{"a": ')
+
+    def test_file_format_is_same_for_all_codecs(self) -> None:
+        contents = set()
+        for name in INSTALLED:
+            path = self.dir / f'{name}.json'
+            config = MocaConfig(uuid4().hex, path, reload_interval=-1, json_codec=name)
+            self.assertEqual(config.json_codec.name, name)
+            config.set_many({'__MocaConfig_version__': 0, 'lang': '日本語', 'n': 1.5, 'list': [1, 2]})
+            with open(str(path), mode='r', encoding='utf-8') as config_file:
+                contents.add(config_file.read().replace(config.name, ''))
+            config.reload_config()
+            self.assertEqual(config.get('lang'), '日本語')
+        self.assertEqual(len(contents), 1)
+
+    def test_default_codec(self) -> None:
+        MocaConfig.set_default_json_codec('json')
+        config = MocaConfig(uuid4().hex, self.dir / 'config.json', reload_interval=-1)
+        self.assertEqual(config.json_codec.name, 'json')
+        codec = MocaJsonCodec()
+        config = MocaConfig(uuid4().hex, self.dir / 'other.json', reload_interval=-1, json_codec=codec)
+        self.assertIs(config.json_codec, codec)
+
+    def test_unknown_codec_in_initializer(self) -> None:
+        with self.assertRaises(ValueError):
+            MocaConfig(uuid4().hex, self.dir / 'config.json', reload_interval=-1, json_codec='yaml')
+
+    def test_set_checks_values_with_standard_encoder(self) -> None:
+        config = MocaConfig(uuid4().hex, self.dir / 'config.json', reload_interval=-1, json_codec=INSTALLED[-1])
+        config.set('value', {1, 2})  # not a json value, saved as a string.
+        self.assertEqual(config.get('value'), str({1, 2}))
+        with patch.object(MocaJsonCodec, 'dumps_file', wraps=MocaJsonCodec.dumps_file) as dumps_file:
+            config.set('lang', 'ja')
+        self.assertEqual(dumps_file.call_count, 1)
+
+# -------------------------------------------------------------------------- TestJsonCodec --
+
+
+if __name__ == '__main__':
+    main()
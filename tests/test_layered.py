@@ -0,0 +1,134 @@
+"""
+The layered configs. (MocaLayeredConfig)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig, MocaLayeredConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestLayered --------------------------------------------------------------------------
+
+
+class TestLayered(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', '')
+        self.root_pass.start()
+        self.base = MocaConfig(uuid4().hex, self.dir / 'base.json', reload_interval=-1)
+        self.top = MocaConfig(uuid4().hex, self.dir / 'top.json', reload_interval=-1)
+        for layer in (self.base, self.top):
+            layer.set_access_token('token')
+        self.base.set_many({'lang': 'en', 'port': 80, 'db': {'host': 'localhost', 'pool': {'size': 5, 'max': 10}}})
+        self.top.set_many({'lang': 'ja', 'db': {'pool': {'size': 20}}})
+        self.config = MocaLayeredConfig(uuid4().hex, [self.base, self.top])
+        self.calls = []
+
+    def tearDown(self) -> None:
+        self.config.close()
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self._dir.cleanup()
+
+    def record(self, key, old_value, new_value) -> None:
+        self.calls.append((key, old_value, new_value))
+
+    def test_top_layer_wins(self) -> None:
+        self.assertEqual(self.config.get('lang'), 'ja')
+        self.assertEqual(self.config.get('port'), 80)
+
+    def test_dictionaries_are_merged(self) -> None:
+        self.assertEqual(self.config.get('db'), {'host': 'localhost', 'pool': {'size': 20, 'max': 10}})
+        self.assertEqual(self.config.get('db.pool.max'), 10)
+
+    def test_not_dictionary_hides_lower_layers(self) -> None:
+        self.top.set('db', 'sqlite://')
+        self.assertEqual(self.config.get('db'), 'sqlite://')
+        self.assertIsNone(self.config.get('db.host'))
+
+    def test_remove_from_top_uses_lower_layer(self) -> None:
+        self.assertTrue(self.config.remove_config('lang'))
+        self.assertEqual(self.config.get('lang'), 'en')
+        self.assertEqual(self.base.get('lang'), 'en')
+
+    def test_set_to_layer(self) -> None:
+        self.config.set('port', 8080, layer=0)
+        self.assertEqual(self.base.get('port'), 8080)
+        self.assertNotIn('port', self.top.get_all_config_key())
+        self.assertEqual(self.config.get('port'), 8080)
+
+    def test_handlers_run_only_for_effective_changes(self) -> None:
+        self.config.add_handler('h', 'lang', self.record)
+        self.base.set('lang', 'fr')  # hidden by the top layer.
+        self.assertEqual(self.calls, [])
+        self.top.remove_config('lang')
+        self.assertEqual(self.calls, [('lang', 'ja', 'fr')])
+
+    def test_handle_and_snapshot(self) -> None:
+        handle = self.config.handle('lang')
+        snapshot = self.config.snapshot()
+        self.assertEqual(handle.value, 'ja')
+        self.top.set('lang', 'de')
+        self.assertEqual(handle.value, 'de')
+        self.assertEqual(snapshot['lang'], 'ja')
+        self.assertEqual(self.config.snapshot()['lang'], 'de')
+        self.assertEqual(self.config.get_all_config()['db']['pool']['size'], 20)
+
+    def test_layers_from_paths(self) -> None:
+        paths = [self.dir / 'a.json', self.dir / 'b.json']
+        for path, data in zip(paths, ({'lang': 'en', 'port': 80}, {'lang': 'ja'})):
+            with open(str(path), mode='w', encoding='utf-8') as config_file:
+                dump({**data, '__private__': False}, config_file)
+        config = MocaLayeredConfig(uuid4().hex, paths, reload_interval=-1)
+        self.assertEqual([layer.path for layer in config.layers], paths)
+        self.assertEqual((config.get('lang'), config.get('port')), ('ja', 80))
+        config.close()
+
+    def test_errors(self) -> None:
+        with self.assertRaises(ValueError):
+            MocaLayeredConfig(uuid4().hex, [])
+        with self.assertRaises(TypeError):
+            MocaLayeredConfig(uuid4().hex, [1])
+
+    def test_closed_view_is_not_updated(self) -> None:
+        self.config.close()
+        self.top.set('lang', 'de')
+        self.assertEqual(self.config.get('lang'), 'ja')
+
+    def test_private_layer_is_not_leaked(self) -> None:
+        self.base.set('_secret', 'S')
+        self.base.set_config_private()
+        MocaConfig.set_root_pass('root')
+        # the values from a private layer need the privilege of that layer.
+        self.assertIsNone(self.config.get('port'))
+        self.assertIsNone(self.config.get('db'))
+        self.assertIsNone(self.config.get('db.pool.max'))
+        self.assertEqual(self.config.get('lang'), 'ja')  # only from the public top layer.
+        self.assertEqual(set(self.config.snapshot().get_keys()) & {'port', 'db', '_secret'}, set())
+        self.assertNotIn('port', self.config.get_all_config())
+        self.assertIsNone(self.config.handle('port').value)
+        self.assertEqual(self.config.get('port', root_pass='root'), 80)
+        self.assertEqual(self.config.get('_secret', access_token='token'), 'S')
+
+    def test_layer_becomes_private_later(self) -> None:
+        MocaConfig.set_root_pass('root')
+        handle = self.config.handle('port')
+        self.assertEqual(handle.value, 80)
+        self.base.set_config_private()
+        self.assertIsNone(handle.value)
+
+# -------------------------------------------------------------------------- TestLayered --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+load_config_files(lazy=True), the lazy instance registry with idle eviction.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestLazyRegistry --------------------------------------------------------------------------
+
+
+class TestLazyRegistry(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def write(self, file_name: str, text: str) -> Path:
+        path = self.dir / file_name
+        path.write_text(text, encoding='utf-8')
+        return path
+
+    def test_instance_is_created_at_first_access(self) -> None:
+        name = uuid4().hex
+        with open(str(self.dir / 'a.json'), mode='w') as config_file:
+            dump({'__config_instance_name__': name, 'v': 1}, config_file)
+        report = MocaConfig.load_config_files(self.dir, lazy=True, reload_interval=-1)
+        self.assertEqual([result.name for result in report.loaded], [name])
+        self.assertNotIn(name, MocaConfig._instance_list)
+        self.assertIn(name, MocaConfig.get_instance_list())
+        self.assertEqual(MocaConfig.get_instance(name).get('v'), 1)
+        self.assertIs(MocaConfig.get_instance(name), MocaConfig._instance_list[name])
+
+    def test_nested_instance_name_is_ignored(self) -> None:
+        name = uuid4().hex
+        self.write('a.json', '{"a": {"__config_instance_name__": "nested"}, '
+                             '"b": "\\"__config_instance_name__\\": \\"in string\\"", '
+                             '"c": ["__config_instance_name__"], '
+                             f'"__config_instance_name__": "{name}"}}')
+        report = MocaConfig.load_config_files(self.dir, lazy=True, reload_interval=-1)
+        self.assertEqual([result.name for result in report.loaded], [name])
+
+    def test_nested_instance_name_only(self) -> None:
+        self.write('a.json', '{"a": {"__config_instance_name__": "nested"}}')
+        report = MocaConfig.load_config_files(self.dir, lazy=True, reload_interval=-1)
+        self.assertEqual(len(report.loaded), 1)
+        self.assertNotEqual(report.loaded[0].name, 'nested')
+
+    def test_not_a_json_object_is_skipped(self) -> None:
+        self.write('a.json', '[1, 2, 3]')
+        report = MocaConfig.load_config_files(self.dir, lazy=True, reload_interval=-1)
+        self.assertEqual(len(report.skipped), 1)
+
+    def test_idle_instance_is_evicted_and_created_again(self) -> None:
+        name = uuid4().hex
+        with open(str(self.dir / 'a.json'), mode='w') as config_file:
+            dump({'__config_instance_name__': name, 'v': 1}, config_file)
+        MocaConfig.load_config_files(self.dir, lazy=True, idle_timeout=0.05, reload_interval=-1)
+        with patch.object(MocaConfig, 'IDLE_SWEEP_INTERVAL', 0.0):
+            self.assertEqual(MocaConfig.get_instance(name).get('v'), 1)
+            sleep(0.1)
+            MocaConfig.get_instance(uuid4().hex)  # sweep
+            self.assertNotIn(name, MocaConfig._instance_list)
+            self.assertEqual(MocaConfig.get_instance(name).get('v'), 1)
+            self.assertIn(name, MocaConfig._instance_list)
+
+# -------------------------------------------------------------------------- TestLazyRegistry --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+MocaConfig.load_config_files, loading every config file in a directory.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestLoadConfigFiles --------------------------------------------------------------------------
+
+
+class TestLoadConfigFiles(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+        self.names = []
+        for index in range(3):
+            name = uuid4().hex
+            self.names.append(name)
+            with open(str(self.dir / f'{index}.json'), mode='w') as config_file:
+                dump({'__config_instance_name__': name, 'v': index}, config_file)
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_load(self) -> None:
+        for executor in ('thread', 'process'):
+            report = MocaConfig.load_config_files(self.dir, executor=executor, reload_interval=-1)
+            self.assertEqual(sorted(result.name for result in report.loaded), sorted(self.names))
+            self.assertEqual(report.failed, [])
+            self.assertEqual(MocaConfig.get_instance(self.names[2]).get('v'), 2)
+
+    def test_not_a_directory(self) -> None:
+        report = MocaConfig.load_config_files(self.dir / '0.json', reload_interval=-1)
+        self.assertEqual(report.loaded, [])
+        self.assertEqual(len(report.failed), 1)
+
+    def test_broken_file_is_failed(self) -> None:
+        (self.dir / 'broken.json').write_text('{', encoding='utf-8')
+        report = MocaConfig.load_config_files(self.dir, reload_interval=-1)
+        self.assertEqual(len(report.loaded), 3)
+        self.assertEqual([result.path.name for result in report.failed], ['broken.json'])
+
+    def test_binary_cache_is_not_loaded(self) -> None:
+        for lazy in (False, True):
+            for _ in range(2):
+                report = MocaConfig.load_config_files(self.dir, lazy=lazy, reload_interval=-1, binary_cache=True)
+                for name in self.names:
+                    MocaConfig.get_instance(name).get('v')
+                self.assertEqual(report.failed, [])
+                self.assertEqual(report.skipped, [])
+                self.assertEqual(len(report.loaded), 3)
+        self.assertTrue((self.dir / ('0.json' + MocaConfig.BINARY_CACHE_SUFFIX)).is_file())
+
+    def test_temporary_file_is_not_loaded(self) -> None:
+        (self.dir / ('.0.json.abc123' + MocaConfig._ATOMIC_TMP_SUFFIX)).write_text('{"v": -1}', encoding='utf-8')
+        report = MocaConfig.load_config_files(self.dir, reload_interval=-1)
+        self.assertEqual(len(report.loaded), 3)
+        self.assertEqual(report.failed + report.skipped, [])
+
+# -------------------------------------------------------------------------- TestLoadConfigFiles --
+
+
+if __name__ == '__main__':
+    main()
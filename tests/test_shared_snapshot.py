@@ -0,0 +1,79 @@
+"""
+MocaConfigPublisher / MocaConfigSubscriber, the snapshots shared through the shared memory.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from multiprocessing import get_context
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main, skipIf
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig, MocaConfigPublisher, MocaConfigSubscriber
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestSharedSnapshot --------------------------------------------------------------------------
+
+
+def _read_in_other_process(name: str, queue) -> None:
+    subscriber = MocaConfigSubscriber(name)
+    queue.put((subscriber.get('lang'), subscriber.version))
+    subscriber.close()
+
+
+@skipIf(MocaConfigPublisher is None, 'multiprocessing.shared_memory is not available.')
+class TestSharedSnapshot(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.config = MocaConfig(uuid4().hex, Path(self._dir.name) / 'config.json', reload_interval=-1)
+        self.config.set_access_token('token')
+        self.config.set('lang', 'ja')
+        self.config.set('_secret', 'S')
+        self.name = f'moca_test_{uuid4().hex[:12]}'
+        self.publisher = MocaConfigPublisher(self.config, self.name, access_token='token')
+        self.subscriber = MocaConfigSubscriber(self.name)
+        # everyone is privileged while the root password is empty.
+        self.root_pass = patch.object(MocaConfig, '_ROOT_PASS', 'root')
+        self.root_pass.start()
+        MocaConfig._invalidate_all()
+
+    def tearDown(self) -> None:
+        self.root_pass.stop()
+        MocaConfig._invalidate_all()
+        self.subscriber.close()
+        self.publisher.close()
+        self._dir.cleanup()
+
+    def test_read_published_value(self) -> None:
+        self.assertEqual(self.subscriber.get('lang'), 'ja')
+        self.assertEqual(self.subscriber.version, self.publisher.version)
+
+    def test_read_after_change(self) -> None:
+        self.config.set('lang', 'en', root_pass='root')
+        self.assertEqual(self.subscriber.get('lang'), 'en')
+        self.assertEqual(self.subscriber.get('unknown', 'default'), 'default')
+
+    def test_private_key_returns_default_without_privilege(self) -> None:
+        self.assertEqual(self.subscriber.get('_secret', 'default'), 'default')
+        self.assertEqual(self.subscriber.get('_secret', access_token='token'), 'S')
+        self.assertNotIn('_secret', self.subscriber.snapshot())
+        self.assertIn('_secret', self.subscriber.snapshot(access_token='token'))
+
+    def test_read_in_other_process(self) -> None:
+        context = get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=_read_in_other_process, args=(self.name, queue))
+        process.start()
+        result = queue.get(timeout=30)
+        process.join(30)
+        self.assertEqual(result, ('ja', self.publisher.version))
+
+# -------------------------------------------------------------------------- TestSharedSnapshot --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+MocaConfigSnapshot and get_all_config, the deep read-only views of the config.
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig, MocaReadOnlyDict, MocaReadOnlyList
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestSnapshot --------------------------------------------------------------------------
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.config = MocaConfig(uuid4().hex, Path(self._dir.name) / 'config.json', reload_interval=-1)
+        self.config.set('db', {'host': 'localhost', 'ports': [1, 2], 'options': {'ssl': True}})
+
+    def tearDown(self) -> None:
+        self._dir.cleanup()
+
+    def test_nested_dict_is_read_only(self) -> None:
+        data = self.config.get_all_config()
+        with self.assertRaises(TypeError):
+            data['db']['host'] = 'EVIL'
+        with self.assertRaises(TypeError):
+            data['db']['options']['ssl'] = False
+        with self.assertRaises(TypeError):
+            data['new'] = 1
+        self.assertEqual(self.config.get('db')['host'], 'localhost')
+
+    def test_nested_list_is_read_only(self) -> None:
+        ports = self.config.snapshot().data['db']['ports']
+        self.assertIsInstance(ports, MocaReadOnlyList)
+        with self.assertRaises(AttributeError):
+            ports.append(3)
+        with self.assertRaises(TypeError):
+            ports[0] = 3
+        self.assertEqual(list(ports), [1, 2])
+        self.assertEqual(ports, [1, 2])
+
+    def test_snapshot_get_is_read_only(self) -> None:
+        snapshot = self.config.snapshot()
+        self.assertIsInstance(snapshot['db'], MocaReadOnlyDict)
+        self.assertIsInstance(snapshot.get('db'), MocaReadOnlyDict)
+        self.assertEqual(snapshot.get('missing', 'default'), 'default')
+        self.assertEqual(snapshot['db'], {'host': 'localhost', 'ports': [1, 2], 'options': {'ssl': True}})
+
+    def test_copy_is_mutable_and_detached(self) -> None:
+        data = self.config.get_all_config().copy()
+        data['db']['host'] = 'changed'
+        data['db']['ports'].append(3)
+        self.assertEqual(self.config.get('db')['host'], 'localhost')
+        self.assertEqual(self.config.get('db')['ports'], [1, 2])
+
+    def test_snapshot_is_not_changed(self) -> None:
+        snapshot = self.config.snapshot()
+        self.config.set('db', {'host': 'remote'})
+        self.config.set('lang', 'ja')
+        self.assertEqual(snapshot['db']['host'], 'localhost')
+        self.assertNotIn('lang', snapshot)
+        self.assertGreater(self.config.snapshot().version, snapshot.version)
+
+    def test_consistent_reads(self) -> None:
+        self.config.set_many({'a': 0, 'b': 0})
+        errors = []
+
+        def reader():
+            for _ in range(5000):
+                snapshot = self.config.snapshot()
+                if snapshot['a'] != snapshot['b']:
+                    errors.append((snapshot['a'], snapshot['b']))
+
+        threads = [Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for value in range(1, 200):
+            self.config.set_many({'a': value, 'b': value})
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+# -------------------------------------------------------------------------- TestSnapshot --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+The shared polling watcher of the config files. (MocaConfigWatcher)
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import dump
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event, active_count
+from time import monotonic, sleep
+from unittest import TestCase, main
+from uuid import uuid4
+from moca_config import MocaConfig
+from moca_config.MocaConfigWatcher import MocaConfigWatcher
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestWatcher --------------------------------------------------------------------------
+
+
+def wait_for(function, expected, timeout: float = 5.0):
+    deadline = monotonic() + timeout
+    value = function()
+    while (value != expected) and (monotonic() < deadline):
+        sleep(0.01)
+        value = function()
+    return value
+
+
+class Target(object):
+    """A fake target of the watcher."""
+
+    def __init__(self, reload_interval: float, fail: bool = False):
+        self.reload_interval = reload_interval
+        self.fail = fail
+        self.count = 0
+        self.reloaded = Event()
+
+    def reload_config(self) -> None:
+        self.count += 1
+        self.reloaded.set()
+        if self.fail:
+            raise RuntimeError('reload error')
+
+
+class TestWatcher(TestCase):
+
+    def setUp(self) -> None:
+        self.watcher = MocaConfigWatcher()
+
+    def tearDown(self) -> None:
+        for entry in list(self.watcher._entries.values()):
+            self.watcher.unregister(entry[2])
+
+    def test_one_thread_for_all_targets(self) -> None:
+        targets = [Target(0.05) for _ in range(100)]
+        for target in targets:
+            self.watcher.register(target)
+        thread = self.watcher.thread
+        self.assertIsNotNone(thread)
+        self.assertEqual(self.watcher.get_target_count(), 100)
+        self.assertTrue(all(target.reloaded.wait(3.0) for target in targets))
+        self.assertIs(self.watcher.thread, thread)
+
+    def test_thread_stops_without_targets(self) -> None:
+        target = Target(0.05)
+        self.watcher.register(target)
+        thread = self.watcher.thread
+        self.watcher.unregister(target)
+        thread.join(3.0)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.watcher.thread)
+        self.assertEqual(self.watcher.get_target_count(), 0)
+
+    def test_never_reload_is_not_registered(self) -> None:
+        self.watcher.register(Target(-1))
+        self.assertEqual(self.watcher.get_target_count(), 0)
+        self.assertIsNone(self.watcher.thread)
+
+    def test_reschedule_does_not_duplicate(self) -> None:
+        target = Target(0.05)
+        for _ in range(10):
+            self.watcher.register(target)
+        self.assertEqual(self.watcher.get_target_count(), 1)
+        sleep(0.3)
+        self.assertLess(target.count, 10)  # about 6 reloads in 0.3 seconds.
+
+    def test_interval_change_to_never(self) -> None:
+        target = Target(0.02)
+        self.watcher.register(target)
+        self.assertTrue(target.reloaded.wait(3.0))
+        target.reload_interval = -1
+        self.assertEqual(wait_for(self.watcher.get_target_count, 0), 0)
+
+    def test_failed_reload_keeps_watching(self) -> None:
+        target = Target(0.02, fail=True)
+        self.watcher.register(target)
+        self.assertGreaterEqual(wait_for(lambda: min(target.count, 3), 3), 3)
+        self.assertEqual(self.watcher.get_target_count(), 1)
+
+# -------------------------------------------------------------------------- TestWatcher --
+
+# -- TestWatcherWithConfig --------------------------------------------------------------------------
+
+
+class TestWatcherWithConfig(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.dir = Path(self._dir.name)
+        self.configs = []
+
+    def tearDown(self) -> None:
+        for config in self.configs:
+            config.stop_auto_reload()
+        self._dir.cleanup()
+
+    def create(self, name: str, interval: float) -> MocaConfig:
+        config = MocaConfig(uuid4().hex, self.dir / f'{name}.json', reload_interval=interval)
+        self.configs.append(config)
+        return config
+
+    def test_instances_share_one_thread(self) -> None:
+        threads = active_count()
+        for index in range(50):
+            self.create(str(index), 1.0)
+        self.assertLessEqual(active_count(), threads + 1)
+        self.assertGreaterEqual(MocaConfigWatcher.default().get_target_count(), 50)
+
+    def test_file_change_is_reloaded(self) -> None:
+        config = self.create('config', 0.05)
+        config.set('lang', 'ja')
+        with open(str(config.path), mode='w', encoding='utf-8') as config_file:
+            dump({'lang': 'en', '__private__': False}, config_file, indent=2)
+        self.assertEqual(wait_for(lambda: config.get('lang'), 'en'), 'en')
+
+    def test_stop_and_restart(self) -> None:
+        watcher = MocaConfigWatcher.default()
+        config = self.create('config', 0.05)
+        count = watcher.get_target_count()
+        config.stop_auto_reload()
+        self.assertEqual(watcher.get_target_count(), count - 1)
+        config.change_reload_interval(0.05)
+        self.assertEqual(watcher.get_target_count(), count)
+
+# -------------------------------------------------------------------------- TestWatcherWithConfig --
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+The write-behind mode of MocaConfig. (MocaConfig(..., write_behind=True))
+"""
+
+
+# -- Imports --------------------------------------------------------------------------
+
+from json import load
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from time import monotonic, sleep
+from unittest import TestCase, main
+from unittest.mock import patch
+from uuid import uuid4
+from moca_config import MocaConfig
+
+# -------------------------------------------------------------------------- Imports --
+
+# -- TestWriteBehind --------------------------------------------------------------------------
+
+
+def wait_for(function, expected, timeout: float = 5.0):
+    deadline = monotonic() + timeout
+    value = function()
+    while (value != expected) and (monotonic() < deadline):
+        sleep(0.01)
+        value = function()
+    return value
+
+
+class TestWriteBehind(TestCase):
+
+    def setUp(self) -> None:
+        self._dir = TemporaryDirectory()
+        self.path = Path(self._dir.name) / 'config.json'
+        self.errors = []
+        self.failed = Event()
+        self.config = MocaConfig(uuid4().hex, self.path, reload_interval=-1,
+                                 write_behind=True, write_behind_delay=0.05,
+                                 flush_error_handler=self.on_flush_error)
+
+    def tearDown(self) -> None:
+        self.config.flush()
+        self._dir.cleanup()
+
+    def on_flush_error(self, config, status) -> None:
+        self.errors.append((config, status))
+        self.failed.set()
+
+    def read_file(self) -> dict:
+        with open(str(self.path), mode='r', encoding='utf-8') as config_file:
+            return load(config_file)
+
+    def test_set_returns_before_write(self) -> None:
+        self.assertTrue(self.config.set('lang', 'ja'))
+        self.assertEqual(self.config.get('lang'), 'ja')
+        self.assertNotIn('lang', self.read_file())
+
+    def test_writes_are_coalesced(self) -> None:
+        with patch.object(MocaConfig, '_write_file_atomic', wraps=MocaConfig._write_file_atomic) as write:
+            for index in range(20):
+                self.config.set('count', index)
+            self.assertEqual(wait_for(lambda: self.read_file().get('count'), 19), 19)
+        self.assertEqual(write.call_count, 1)
+
+    def test_flush_writes_pending_changes(self) -> None:
+        self.config.set('lang', 'ja')
+        self.config.remove_config('lang')
+        self.config.set('port', 80)
+        self.assertTrue(self.config.flush())
+        data = self.read_file()
+        self.assertEqual(data['port'], 80)
+        self.assertNotIn('lang', data)
+
+    def test_flush_without_changes(self) -> None:
+        self.assertTrue(self.config.flush())
+
+    def test_failed_flush_keeps_changes_and_retries(self) -> None:
+        with patch.object(MocaConfig, '_write_file_atomic', side_effect=OSError('disk full')):
+            self.config.set('lang', 'ja')
+            self.assertTrue(self.failed.wait(3.0))
+            self.assertEqual(self.errors[0], (self.config, MocaConfig.OS_ERROR))
+            self.assertFalse(self.config.flush())
+            self.assertEqual(self.config.status, MocaConfig.OS_ERROR)
+            self.assertEqual(self.config.get('lang'), 'ja')
+            self.assertNotIn('lang', self.read_file())
+        # the background retry writes the changes after the error is gone.
+        self.assertEqual(wait_for(lambda: self.read_file().get('lang'), 'ja'), 'ja')
+        self.assertEqual(self.config.status, MocaConfig.CORRECT)
+
+    def test_error_handler_exception_is_ignored(self) -> None:
+        def broken_handler(config, status):
+            self.failed.set()
+            raise RuntimeError('handler error')
+
+        self.config._flush_error_handler = broken_handler
+        with patch.object(MocaConfig, '_write_file_atomic', side_effect=PermissionError('read only')):
+            self.config.set('lang', 'ja')
+            self.assertTrue(self.failed.wait(3.0))
+        self.assertEqual(wait_for(lambda: self.read_file().get('lang'), 'ja'), 'ja')
+
+    def test_pending_changes_are_not_reloaded_over(self) -> None:
+        self.config.set('lang', 'ja')
+        self.config.reload_config()
+        self.assertEqual(self.config.get('lang'), 'ja')
+
+# -------------------------------------------------------------------------- TestWriteBehind --
+
+
+if __name__ == '__main__':
+    main()